@@ -8,7 +8,31 @@ from campaign data sources.
 __version__ = "0.1.0"
 __author__ = "ArloAI"
 
-from .engine import ReportEngine
-from .widgets import *
+import importlib
 
-__all__ = ["ReportEngine"]
\ No newline at end of file
+# Public names and the submodules defining them; imported on first access
+# so that importing the package stays cheap for CLI and serverless use
+_LAZY_ATTRIBUTES = {
+    "ReportEngine": ".engine",
+    "BaseWidget": ".widgets",
+    "Dataset": ".widgets",
+    "DatasetRegistry": ".widgets",
+    "RenderCache": ".widgets",
+    "WidgetDescriptor": ".widgets",
+    "WidgetRegistry": ".widgets",
+}
+
+__all__ = ["ReportEngine"]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
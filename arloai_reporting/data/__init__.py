@@ -2,6 +2,19 @@
 Data processing modules for ArloAI Reporting Engine.
 """
 
+from .api import ApiConnector, ApiSource
+from .cache import SourceCache
 from .processors import DataProcessor
+from .sql import SqlSource, register_driver
+from .store import FactStore, FactTable
 
-__all__ = ["DataProcessor"]
\ No newline at end of file
+__all__ = [
+    "ApiConnector",
+    "ApiSource",
+    "DataProcessor",
+    "FactStore",
+    "FactTable",
+    "SourceCache",
+    "SqlSource",
+    "register_driver"
+]
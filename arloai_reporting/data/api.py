@@ -0,0 +1,398 @@
+"""
+Asynchronous HTTP API connectors for pulling platform stats.
+
+Ad platform endpoints are slow to answer but cheap to call in parallel.
+An ApiConnector fetches many ApiSources concurrently while capping the
+number of in-flight requests per host. The event loop only schedules the
+requests: each one is a blocking ``urllib`` call run in a thread pool, so
+concurrency comes from the pool's threads, not from non-blocking sockets,
+and no async HTTP client is needed. Failed requests are retried with
+jittered exponential backoff, paginated responses are followed page by
+page, and ETag/Last-Modified validators are replayed so unchanged pages
+come back as cheap ``304 Not Modified`` responses. Records are handed out
+as DataFrame batches as soon as each page arrives.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlencode, urljoin, urlsplit
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import pandas as pd
+
+from .json_stream import RecordBatcher
+from .streaming import DEFAULT_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_PER_HOST = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+
+# Statuses worth retrying; anything else is a permanent failure
+RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+
+def _lookup(payload: Any, path: Optional[str]) -> Any:
+    """Follow a dotted key path into a JSON payload."""
+    if not path:
+        return payload
+    for key in path.split('.'):
+        if not isinstance(payload, dict):
+            return None
+        payload = payload.get(key)
+    return payload
+
+
+class ApiSource:
+    """
+    A paginated JSON endpoint returning campaign records.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        name: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        records_key: Optional[str] = 'data',
+        next_key: Optional[str] = 'next',
+        max_pages: Optional[int] = None
+    ):
+        """
+        Initialize the source.
+
+        Args:
+            url: Endpoint URL
+            name: Name of the table built from the records
+            params: Query parameters of the first request
+            headers: Extra request headers (e.g. authorization)
+            records_key: Dotted path to the record list in each response
+                (None when the response itself is the list)
+            next_key: Dotted path to the next page's URL, absolute or
+                relative to the current one (None disables pagination)
+            max_pages: Stop after this many pages
+        """
+        self.url = url
+        self.name = name
+        self.params = params or {}
+        self.headers = headers or {}
+        self.records_key = records_key
+        self.next_key = next_key
+        self.max_pages = max_pages
+
+    @property
+    def first_url(self) -> str:
+        """URL of the first page."""
+        if not self.params:
+            return self.url
+        separator = '&' if urlsplit(self.url).query else '?'
+        return f"{self.url}{separator}{urlencode(self.params)}"
+
+    def __str__(self) -> str:
+        return self.first_url
+
+    def __repr__(self) -> str:
+        return f"ApiSource(name='{self.name}', url='{self.first_url}')"
+
+
+class HttpCache:
+    """
+    Cache of response bodies with their ETag/Last-Modified validators.
+
+    Entries live in memory and, when a directory is given, on disk so they
+    survive restarts.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for persisted entries (None keeps them in memory)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached entry for a URL.
+
+        Args:
+            url: Request URL
+
+        Returns:
+            Dictionary with ``etag``, ``last_modified`` and ``body``, or None
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None and self.cache_dir is not None and self._path(url).exists():
+            try:
+                entry = json.loads(self._path(url).read_text(encoding='utf-8'))
+            except Exception as e:
+                logger.warning(f"Discarding unreadable HTTP cache entry for {url}: {e}")
+                return None
+            with self._lock:
+                self._entries[url] = entry
+        return entry
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str) -> None:
+        """
+        Store a response body with its validators.
+
+        Args:
+            url: Request URL
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            body: Response body text
+        """
+        entry = {'etag': etag, 'last_modified': last_modified, 'body': body}
+        with self._lock:
+            self._entries[url] = entry
+        if self.cache_dir is not None:
+            self._path(url).write_text(json.dumps(entry), encoding='utf-8')
+
+
+def _request(url: str, headers: Dict[str, str], timeout: float) -> Tuple[int, Any, bytes]:
+    """Perform a blocking GET; HTTP error statuses are returned, not raised."""
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+class ApiConnector:
+    """
+    Fetches ApiSources concurrently with per-host limits, retries and
+    conditional requests.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        timeout: float = 30.0,
+        cache_dir: Optional[Union[str, Path]] = None
+    ):
+        """
+        Initialize the connector.
+
+        Args:
+            max_per_host: Maximum concurrent requests to one host
+            retries: Retries after the first attempt of a request
+            backoff: Base delay in seconds; attempt ``n`` waits a random
+                time up to ``backoff * 2 ** n``
+            max_backoff: Upper bound of a single retry delay
+            timeout: Socket timeout of each request in seconds
+            cache_dir: Directory persisting ETag/Last-Modified responses
+                (None caches in memory for the connector's lifetime)
+        """
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.http_cache = HttpCache(cache_dir)
+
+        self.requests = 0
+        self.retried = 0
+        self.not_modified = 0
+
+    def collect(
+        self,
+        sources: List[ApiSource],
+        on_batch: Callable[[ApiSource, pd.DataFrame], None],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        usecols: Optional[Callable[[Any], bool]] = None
+    ) -> Dict[ApiSource, Dict[str, Any]]:
+        """
+        Fetch all sources concurrently.
+
+        Works from synchronous code and from inside a running event loop
+        (a web framework handler, a notebook); there the fetch runs on its
+        own loop in a worker thread and this call blocks until it is done.
+
+        Args:
+            sources: Endpoints to fetch; a source listed more than once is
+                fetched once
+            on_batch: Called with each DataFrame batch of records, in page
+                order per source, on the thread running the event loop
+            batch_size: Records per batch
+            usecols: Predicate selecting record fields by name
+
+        Returns:
+            Mapping of source to ``pages``, ``records``, ``elapsed`` and
+            ``error`` (None on success)
+        """
+        sources = list(dict.fromkeys(sources))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._collect(sources, on_batch, batch_size, usecols))
+
+        # asyncio.run can't nest inside a running loop
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-loop') as executor:
+            return executor.submit(
+                lambda: asyncio.run(self._collect(sources, on_batch, batch_size, usecols))
+            ).result()
+
+    async def _collect(
+        self,
+        sources: List[ApiSource],
+        on_batch: Callable[[ApiSource, pd.DataFrame], None],
+        batch_size: int,
+        usecols: Optional[Callable[[Any], bool]]
+    ) -> Dict[ApiSource, Dict[str, Any]]:
+        hosts = {urlsplit(source.url).netloc for source in sources}
+        # Hosts reached through pagination links get theirs on first use
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        workers = max(1, self.max_per_host * len(hosts))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api') as executor:
+            outcomes = await asyncio.gather(*[
+                self._fetch_source(source, on_batch, batch_size, usecols, semaphores, executor)
+                for source in sources
+            ])
+        return dict(zip(sources, outcomes))
+
+    async def _fetch_source(
+        self,
+        source: ApiSource,
+        on_batch: Callable[[ApiSource, pd.DataFrame], None],
+        batch_size: int,
+        usecols: Optional[Callable[[Any], bool]],
+        semaphores: Dict[str, asyncio.Semaphore],
+        executor: ThreadPoolExecutor
+    ) -> Dict[str, Any]:
+        """Follow one source's pages, emitting record batches."""
+        start = time.perf_counter()
+        batcher = RecordBatcher(batch_size, usecols)
+        outcome: Dict[str, Any] = {'pages': 0, 'records': 0, 'elapsed': None, 'error': None}
+
+        url: Optional[str] = source.first_url
+        seen = set()
+        try:
+            while url and url not in seen:
+                if source.max_pages is not None and outcome['pages'] >= source.max_pages:
+                    break
+                seen.add(url)
+
+                payload = await self._get_json(url, source.headers, semaphores, executor)
+                records = _lookup(payload, source.records_key) if isinstance(payload, dict) else payload
+                outcome['pages'] += 1
+
+                for record in records or []:
+                    outcome['records'] += 1
+                    batch = batcher.add(record)
+                    if batch is not None:
+                        on_batch(source, batch)
+
+                next_url = _lookup(payload, source.next_key) if source.next_key else None
+                url = urljoin(url, next_url) if next_url else None
+
+            batch = batcher.flush()
+            if batch is not None:
+                on_batch(source, batch)
+        except Exception as e:
+            logger.error(f"Error fetching API source {source}: {e}")
+            outcome['error'] = str(e)
+
+        outcome['elapsed'] = time.perf_counter() - start
+        return outcome
+
+    async def _get_json(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        semaphores: Dict[str, asyncio.Semaphore],
+        executor: ThreadPoolExecutor
+    ) -> Any:
+        """GET a JSON document with conditional headers and retries."""
+        cached = self.http_cache.get(url)
+        request_headers = {'Accept': 'application/json', **headers}
+        if cached is not None:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        loop = asyncio.get_running_loop()
+        semaphore = semaphores.setdefault(urlsplit(url).netloc, asyncio.Semaphore(self.max_per_host))
+
+        for attempt in range(self.retries + 1):
+            status, response_headers, error = None, None, None
+            async with semaphore:
+                self.requests += 1
+                try:
+                    status, response_headers, body = await loop.run_in_executor(
+                        executor, _request, url, request_headers, self.timeout
+                    )
+                except (urllib.error.URLError, OSError) as e:
+                    error = e
+
+            if status == 304 and cached is not None:
+                self.not_modified += 1
+                return json.loads(cached['body'])
+
+            if status is not None and 200 <= status < 300:
+                text = body.decode('utf-8')
+                etag = response_headers.get('ETag')
+                last_modified = response_headers.get('Last-Modified')
+                if etag or last_modified:
+                    self.http_cache.put(url, etag, last_modified, text)
+                return json.loads(text)
+
+            if status is not None and status not in RETRY_STATUSES:
+                raise RuntimeError(f"GET {url} failed with HTTP {status}")
+            if attempt == self.retries:
+                reason = f"HTTP {status}" if status is not None else error
+                raise RuntimeError(f"GET {url} failed after {attempt + 1} attempts: {reason}")
+
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            retry_after = response_headers.get('Retry-After') if response_headers is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = min(self.max_backoff, float(retry_after))
+            self.retried += 1
+            logger.debug(f"Retrying {url} in {delay:.2f}s ({status or error})")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get request statistics.
+
+        Returns:
+            Dictionary with requests, retries and not-modified responses
+        """
+        return {
+            'requests': self.requests,
+            'retried': self.retried,
+            'not_modified': self.not_modified
+        }
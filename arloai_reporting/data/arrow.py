@@ -0,0 +1,131 @@
+"""
+Readers for Arrow IPC/Feather and Parquet warehouse extracts.
+
+Arrow IPC files are memory-mapped and single-chunk, null-free numeric and
+date columns are exposed to the fact store as NumPy views over the mapped
+buffers, so metric computation reads them without copying (timezone-aware
+timestamps are converted so they keep their zone). Parquet reads
+prune columns and (through filters checked against row-group statistics)
+row groups before decoding.
+
+Requires pyarrow (``pip install pyarrow``).
+"""
+
+from typing import Any, Callable, List, Optional, Union
+from pathlib import Path
+import logging
+import numpy as np
+import pandas as pd
+
+from .store import FactTable, to_column
+
+logger = logging.getLogger(__name__)
+
+ARROW_SUFFIXES = ('.arrow', '.feather', '.ipc')
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+
+def _select_columns(names: List[str], usecols: Optional[Callable[[Any], bool]]) -> Optional[List[str]]:
+    if usecols is None:
+        return None
+    return [name for name in names if usecols(name)]
+
+
+def read_arrow_ipc(
+    file_path: Union[str, Path],
+    usecols: Optional[Callable[[Any], bool]] = None
+) -> Any:
+    """
+    Read an Arrow IPC (Feather v2) file through a memory map.
+
+    Args:
+        file_path: Path to the file
+        usecols: Predicate selecting columns by name (all when omitted)
+
+    Returns:
+        pyarrow Table backed by the mapped file
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    source = pa.memory_map(str(file_path), 'r')
+    try:
+        reader = ipc.open_file(source)
+    except pa.ArrowInvalid:
+        # Streaming-format IPC files have no footer
+        source.seek(0)
+        reader = ipc.open_stream(source)
+    table = reader.read_all()
+
+    columns = _select_columns(table.column_names, usecols)
+    return table.select(columns) if columns is not None else table
+
+
+def read_parquet(
+    file_path: Union[str, Path],
+    usecols: Optional[Callable[[Any], bool]] = None,
+    filters: Optional[List[Any]] = None
+) -> Any:
+    """
+    Read a Parquet file, reading only the needed columns and row groups.
+
+    Args:
+        file_path: Path to the file
+        usecols: Predicate selecting columns by name (all when omitted)
+        filters: pyarrow filter expression or DNF list, e.g.
+            ``[('Date', '>=', date(2025, 7, 1))]``; row groups whose
+            statistics rule out a match are skipped entirely
+
+    Returns:
+        pyarrow Table
+    """
+    import pyarrow.parquet as pq
+
+    schema = pq.read_schema(str(file_path))
+    columns = _select_columns(schema.names, usecols)
+    return pq.read_table(str(file_path), columns=columns, filters=filters, memory_map=True)
+
+
+def _to_column(chunked: Any) -> Any:
+    """Convert an Arrow column, sharing buffers where Arrow allows it."""
+    import pyarrow as pa
+    import pyarrow.types as pat
+
+    arrow_type = chunked.type
+    if pat.is_dictionary(arrow_type) or pat.is_string(arrow_type) or pat.is_large_string(arrow_type):
+        encoded = chunked if pat.is_dictionary(arrow_type) else chunked.dictionary_encode()
+        encoded = encoded.combine_chunks() if encoded.num_chunks != 1 else encoded.chunk(0)
+        if not isinstance(encoded, pa.DictionaryArray):
+            encoded = encoded.dictionary_encode()
+        codes = encoded.indices.to_numpy(zero_copy_only=False)
+        codes = np.where(encoded.indices.is_null().to_numpy(zero_copy_only=False), -1, codes)
+        return pd.Categorical.from_codes(codes, categories=encoded.dictionary.to_pylist())
+
+    # A timezone-aware timestamp buffer holds UTC instants; viewing it as
+    # datetime64 would drop the zone, so those go through pandas
+    zero_copy = chunked.num_chunks == 1 and chunked.null_count == 0 and (
+        pat.is_integer(arrow_type) or pat.is_floating(arrow_type)
+        or (pat.is_timestamp(arrow_type) and arrow_type.tz is None) or pat.is_date64(arrow_type)
+    )
+    if zero_copy:
+        return chunked.chunk(0).to_numpy(zero_copy_only=True)
+
+    return to_column(chunked.to_pandas(date_as_object=False))
+
+
+def arrow_to_fact_table(table: Any, name: str) -> FactTable:
+    """
+    Build a FactTable from a pyarrow Table.
+
+    Args:
+        table: pyarrow Table
+        name: Table name
+
+    Returns:
+        FactTable whose numeric columns view the Arrow buffers where possible
+    """
+    # Chunks of a dictionary column may carry different dictionaries, which
+    # combine_chunks can't join; map them onto one dictionary per column
+    table = table.unify_dictionaries()
+    columns = {col: _to_column(table.column(col)) for col in table.column_names}
+    return FactTable(name, columns)
@@ -0,0 +1,349 @@
+"""
+Persistent cache of processed data sources.
+
+Entries are keyed by the SHA-256 of the source file's content plus the
+processor version, so a renamed or re-downloaded workbook still hits and
+any change to the processing code invalidates old entries. A cheap
+mtime+size check avoids re-hashing files that have not changed on disk.
+
+Several processes may share a cache directory: the index is re-read and
+merged under a file lock before every write, so one process never drops
+entries another one added.
+"""
+
+from typing import Dict, Any, Iterator, Optional, Union
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .cache_format import MANIFEST_FILE, entry_size, read_entry, write_entry
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the structure produced by DataProcessor changes
+PROCESSOR_VERSION = "11"
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def file_digest(file_path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 digest of a file's content.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Read size in bytes
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SourceCache:
+    """
+    On-disk cache of processed sources with LRU eviction.
+
+    Each entry is a directory of ``.npy`` column files plus a JSON manifest
+    holding the summaries (see ``cache_format``). Columns load back without
+    re-parsing and nothing in the directory is ever unpickled.
+    """
+
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        version: str = PROCESSOR_VERSION
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_bytes: Maximum total size of cached entries
+            version: Processor/schema version mixed into every key
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.version = version
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._removed = set()
+        with self._index_lock():
+            self._index = self._load_index()
+
+    def get(
+        self,
+        source_path: Union[str, Path],
+        variant: str = "",
+        record_stats: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a processed source from the cache.
+
+        Args:
+            source_path: Path to the source file
+            variant: Extra key component for processing options
+            record_stats: Count the lookup as a hit or miss (off for
+                auxiliary entries such as extracted PDF pages)
+
+        Returns:
+            Processed data dictionary or None on a miss
+        """
+        key = self._key(Path(source_path), variant)
+        with self._lock:
+            entry = self._index['entries'].get(key)
+        if entry is None and (self.cache_dir / key / MANIFEST_FILE).exists():
+            # Written by another process since our index was loaded
+            entry = {'dir': key, 'size': entry_size(self.cache_dir / key), 'last_access': 0.0}
+            with self._lock:
+                entry = self._index['entries'].setdefault(key, entry)
+
+        if entry is not None:
+            try:
+                data = read_entry(self.cache_dir / entry['dir'])
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cache entry for {source_path}: {e}")
+                self._remove(key)
+            else:
+                with self._lock:
+                    # Access times are persisted with the next put or eviction
+                    # rather than rewriting the index on every hit
+                    entry['last_access'] = time.time()
+                    if record_stats:
+                        self.hits += 1
+                logger.debug(f"Cache hit: {source_path}")
+                return data
+
+        if record_stats:
+            with self._lock:
+                self.misses += 1
+        logger.debug(f"Cache miss: {source_path}")
+        return None
+
+    def put(self, source_path: Union[str, Path], data: Dict[str, Any], variant: str = "") -> None:
+        """
+        Store a processed source in the cache.
+
+        Args:
+            source_path: Path to the source file
+            data: Processed data dictionary
+            variant: Extra key component for processing options
+        """
+        key = self._key(Path(source_path), variant)
+        target = self.cache_dir / key
+
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp"))
+        try:
+            write_entry(tmp_dir, data)
+            size = entry_size(tmp_dir)
+            shutil.rmtree(target, ignore_errors=True)
+            os.rename(tmp_dir, target)
+        except Exception as e:
+            logger.warning(f"Could not cache {source_path}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        with self._lock:
+            self._removed.discard(key)
+            self._index['entries'][key] = {
+                'dir': key,
+                'size': size,
+                'last_access': time.time()
+            }
+            self._save_index()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit rate, evictions, entries and bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._index['entries']),
+                'bytes': self._total_bytes(),
+                'max_bytes': self.max_bytes
+            }
+
+    def clear(self) -> None:
+        """Remove all cache entries, including those added by other processes."""
+        with self._lock, self._index_lock():
+            entries = {**self._load_index()['entries'], **self._index['entries']}
+            for entry in entries.values():
+                shutil.rmtree(self.cache_dir / entry['dir'], ignore_errors=True)
+            self._index = {'files': {}, 'entries': {}}
+            self._removed = set()
+            self._write_index()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _key(self, source_path: Path, variant: str) -> str:
+        """Build the cache key for a source file."""
+        digest = self._digest(source_path)
+        suffix = hashlib.sha256(variant.encode()).hexdigest()[:12] if variant else "base"
+        return f"{digest}-v{self.version}-{suffix}"
+
+    def _digest(self, source_path: Path) -> str:
+        """Get the content digest, skipping the hash when mtime and size are unchanged."""
+        stat = source_path.stat()
+        file_key = str(source_path.resolve())
+
+        with self._lock:
+            known = self._index['files'].get(file_key)
+        if known and known['mtime_ns'] == stat.st_mtime_ns and known['size'] == stat.st_size:
+            return known['digest']
+
+        digest = file_digest(source_path)
+        with self._lock:
+            self._index['files'][file_key] = {
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'digest': digest
+            }
+        return digest
+
+    def _remove(self, key: str) -> None:
+        """Drop a single entry."""
+        with self._lock:
+            entry = self._index['entries'].pop(key, None)
+            if entry is not None:
+                shutil.rmtree(self.cache_dir / entry['dir'], ignore_errors=True)
+                self._removed.add(key)
+                self._save_index()
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until the cache fits in max_bytes."""
+        entries = self._index['entries']
+        total = self._total_bytes()
+        for key in sorted(entries, key=lambda k: entries[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            entry = entries.pop(key)
+            shutil.rmtree(self.cache_dir / entry['dir'], ignore_errors=True)
+            total -= entry['size']
+            self.evictions += 1
+            logger.debug(f"Evicted cache entry {key}")
+
+    def _total_bytes(self) -> int:
+        return sum(entry['size'] for entry in self._index['entries'].values())
+
+    @contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        """Hold an exclusive lock on the index across processes."""
+        with open(self.cache_dir / self.LOCK_FILE, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load_index(self) -> Dict[str, Any]:
+        """Read the index file, starting fresh if it is missing or corrupt."""
+        index_path = self.cache_dir / self.INDEX_FILE
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            if isinstance(index.get('files'), dict) and isinstance(index.get('entries'), dict):
+                for key, entry in list(index['entries'].items()):
+                    if 'dir' not in entry:
+                        # Pickle entries from older versions are deleted, never loaded
+                        (self.cache_dir / str(entry.get('file', ''))).unlink(missing_ok=True)
+                        del index['entries'][key]
+                return index
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring corrupt cache index {index_path}: {e}")
+        return {'files': {}, 'entries': {}}
+
+    def _save_index(self) -> None:
+        """
+        Merge the index with the copy on disk, evict, and write it back.
+
+        Entries other processes added since the last write are kept and
+        entries removed here stay removed. File records are pruned to
+        sources that still exist and, unless hashed by this instance,
+        still have a cached entry.
+        """
+        with self._index_lock():
+            disk = self._load_index()
+            entries = disk['entries']
+            for key in self._removed:
+                entries.pop(key, None)
+            for key, entry in self._index['entries'].items():
+                known = entries.get(key)
+                if known is None or entry['last_access'] > known['last_access']:
+                    entries[key] = entry
+            entries = {
+                key: entry for key, entry in entries.items()
+                if (self.cache_dir / entry['dir']).is_dir()
+            }
+
+            # Records hashed by this instance stay while their source exists,
+            # since its entry may not be written yet
+            digests = {key.split('-', 1)[0] for key in entries}
+            files = {
+                path: record for path, record in disk['files'].items()
+                if record['digest'] in digests
+            }
+            files.update(self._index['files'])
+            files = {path: record for path, record in files.items() if os.path.exists(path)}
+
+            self._index = {'files': files, 'entries': entries}
+            self._removed = set()
+            self._evict()
+            self._write_index()
+
+    def _write_index(self) -> None:
+        """Atomically write the index file."""
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_name, self.cache_dir / self.INDEX_FILE)
@@ -0,0 +1,200 @@
+"""
+On-disk format of processed-source cache entries.
+
+An entry is a directory holding one ``.npy`` file per column of every fact
+table (a Categorical as its codes plus its categories) and an
+``entry.json`` manifest with the summaries (metrics, dimensions, metadata
+...) and references to the column files. Nothing is unpickled on load:
+``.npy`` files are read with ``allow_pickle=False`` and the manifest is
+plain JSON, so a cache directory shared with other users can't run code.
+
+Values JSON can't represent directly (timestamps, tuples, dicts with
+non-string keys, NumPy scalars) are written as tagged objects such as
+``{"__timestamp__": "2025-07-07T00:00:00"}``. Anything else makes
+``write_entry`` raise TypeError, and the source is simply not cached.
+"""
+
+from typing import Any, Dict
+from datetime import date, datetime
+from pathlib import Path
+import json
+import numpy as np
+import pandas as pd
+
+from .store import FactTable
+
+MANIFEST_FILE = "entry.json"
+FORMAT_VERSION = 1
+
+
+class _Writer:
+    """Encodes one entry, writing its columns next to the manifest."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.count = 0
+        # A table listed in several sections is written once
+        self._tables: Dict[int, Dict[str, Any]] = {}
+
+    def _array(self, values: np.ndarray) -> Dict[str, Any]:
+        if values.dtype == object:
+            if all(isinstance(value, str) for value in values):
+                # Fixed-width unicode stores without pickling
+                reference = self._array(values.astype(str) if len(values) else np.array([], dtype='U1'))
+                return {'__column__': reference['__column__'], 'object': True}
+            return {'__values__': [self.encode(value) for value in values]}
+        file_name = f"c{self.count}.npy"
+        self.count += 1
+        np.save(self.directory / file_name, np.ascontiguousarray(values), allow_pickle=False)
+        return {'__column__': file_name}
+
+    def _column(self, values: Any) -> Dict[str, Any]:
+        if isinstance(values, pd.Categorical):
+            return {'__categorical__': {
+                'codes': self._array(np.asarray(values.codes)),
+                'categories': self._array(values.categories.to_numpy()),
+                'ordered': bool(values.ordered)
+            }}
+        return self._array(np.asarray(values))
+
+    def encode(self, value: Any) -> Any:
+        """Encode a value as JSON-compatible data."""
+        if value is None or isinstance(value, (bool, str)):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, (np.generic, pd.Timestamp)):
+            return value
+        if isinstance(value, FactTable):
+            if id(value) not in self._tables:
+                self._tables[id(value)] = {'__table__': {
+                    'name': self.encode(value.name),
+                    'date_columns': [self.encode(col) for col in value.date_columns],
+                    'columns': [[self.encode(col), self._column(values)] for col, values in value.columns.items()]
+                }}
+            return self._tables[id(value)]
+        if isinstance(value, (np.ndarray, pd.Categorical)):
+            return self._column(value)
+        if value is pd.NaT:
+            return {'__nat__': True}
+        if isinstance(value, pd.Timestamp):
+            return {'__timestamp__': value.isoformat(), 'tz': str(value.tz) if value.tz is not None else None}
+        if isinstance(value, np.datetime64):
+            return {'__datetime64__': str(value)}
+        if isinstance(value, np.generic):
+            return self.encode(value.item())
+        if isinstance(value, datetime):
+            return {'__datetime__': value.isoformat()}
+        if isinstance(value, date):
+            return {'__date__': value.isoformat()}
+        if isinstance(value, tuple):
+            return {'__tuple__': [self.encode(item) for item in value]}
+        if isinstance(value, list):
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            if all(isinstance(key, str) and not key.startswith('__') for key in value):
+                return {key: self.encode(item) for key, item in value.items()}
+            return {'__dict__': [[self.encode(key), self.encode(item)] for key, item in value.items()]}
+        raise TypeError(f"Can't store {type(value).__name__} values in the cache")
+
+
+class _Reader:
+    """Decodes one entry written by ``_Writer``."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._loaded: Dict[str, np.ndarray] = {}
+
+    def _array(self, reference: Dict[str, Any]) -> np.ndarray:
+        if '__values__' in reference:
+            items = [self.decode(item) for item in reference['__values__']]
+            values = np.empty(len(items), dtype=object)
+            values[:] = items
+            return values
+        file_name = reference['__column__']
+        if file_name not in self._loaded:
+            values = np.load(self.directory / file_name, allow_pickle=False)
+            self._loaded[file_name] = values.astype(object) if reference.get('object') else values
+        return self._loaded[file_name]
+
+    def _column(self, reference: Dict[str, Any]) -> Any:
+        if '__categorical__' in reference:
+            spec = reference['__categorical__']
+            return pd.Categorical.from_codes(
+                self._array(spec['codes']),
+                categories=pd.Index(self._array(spec['categories'])),
+                ordered=spec['ordered']
+            )
+        return self._array(reference)
+
+    def decode(self, value: Any) -> Any:
+        """Decode a value written by ``_Writer.encode``."""
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if '__table__' in value:
+            spec = value['__table__']
+            return FactTable(
+                self.decode(spec['name']),
+                {self.decode(col): self._column(reference) for col, reference in spec['columns']},
+                [self.decode(col) for col in spec['date_columns']]
+            )
+        if '__column__' in value or '__values__' in value or '__categorical__' in value:
+            return self._column(value)
+        if '__nat__' in value:
+            return pd.NaT
+        if '__timestamp__' in value:
+            stamp = pd.Timestamp(value['__timestamp__'])
+            return stamp.tz_convert(value['tz']) if value.get('tz') else stamp
+        if '__datetime64__' in value:
+            return np.datetime64(value['__datetime64__'])
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        if '__date__' in value:
+            return date.fromisoformat(value['__date__'])
+        if '__tuple__' in value:
+            return tuple(self.decode(item) for item in value['__tuple__'])
+        if '__dict__' in value:
+            return {self.decode(key): self.decode(item) for key, item in value['__dict__']}
+        return {key: self.decode(item) for key, item in value.items()}
+
+
+def write_entry(directory: Path, data: Dict[str, Any]) -> None:
+    """
+    Write a processed source into an empty directory.
+
+    Args:
+        directory: Entry directory (created if missing)
+        data: Processed data dictionary
+
+    Raises:
+        TypeError: If the data holds values the format can't store
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {'format': FORMAT_VERSION, 'data': _Writer(directory).encode(data)}
+    with open(directory / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f)
+
+
+def read_entry(directory: Path) -> Dict[str, Any]:
+    """
+    Read a processed source written by ``write_entry``.
+
+    Args:
+        directory: Entry directory
+
+    Returns:
+        Processed data dictionary
+
+    Raises:
+        ValueError: If the entry was written in another format version
+    """
+    with open(directory / MANIFEST_FILE, 'r') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported cache entry format: {manifest.get('format')}")
+    return _Reader(directory).decode(manifest['data'])
+
+
+def entry_size(directory: Path) -> int:
+    """Total bytes of an entry's files."""
+    return sum(path.stat().st_size for path in directory.iterdir())
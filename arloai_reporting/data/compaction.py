@@ -0,0 +1,91 @@
+"""
+Dtype compaction for ingested campaign frames.
+
+Readers produce int64/float64/object columns. Compaction downcasts
+counters to the smallest integer type that holds their range, stores
+ratio columns (CTR, rates, percentages) as float32 when that loses no
+meaningful precision, and turns repetitive string columns (creative,
+placement, device names) into categoricals.
+"""
+
+from typing import Dict, Tuple, Any
+import logging
+import numpy as np
+import pandas as pd
+
+from .store import NON_ADDITIVE_MARKERS
+
+logger = logging.getLogger(__name__)
+
+# String columns with at most this share of distinct values become categoricals
+DEFAULT_CATEGORY_RATIO = 0.5
+
+# Largest relative error accepted when storing ratios as float32
+FLOAT32_RTOL = 1e-6
+
+
+def _is_ratio_column(name: Any) -> bool:
+    lowered = str(name).lower()
+    return any(marker in lowered for marker in NON_ADDITIVE_MARKERS)
+
+
+def _compact_series(series: pd.Series, category_ratio: float) -> pd.Series:
+    """Return the most compact safe representation of a column."""
+    dtype = series.dtype
+
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+        return series
+
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(dtype):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        finite = values[np.isfinite(values)]
+        # Counters that came through as floats (e.g. Excel numbers)
+        if finite.size == values.size and np.array_equal(finite, np.round(finite)):
+            return pd.to_numeric(series.astype('int64'), downcast='integer')
+        if _is_ratio_column(series.name):
+            narrowed = values.astype('float32')
+            if np.allclose(narrowed, values, rtol=FLOAT32_RTOL, atol=0.0, equal_nan=True):
+                return pd.Series(narrowed, index=series.index, name=series.name)
+        return series
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series
+
+    if len(series) and series.nunique(dropna=True) <= category_ratio * len(series):
+        return series.astype('category')
+    return series
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    category_ratio: float = DEFAULT_CATEGORY_RATIO
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Compact the dtypes of a DataFrame.
+
+    Args:
+        df: Frame to compact
+        category_ratio: Maximum distinct/total ratio for string columns to
+            become categoricals
+
+    Returns:
+        Tuple of (compacted frame, byte counts with ``bytes_before``,
+        ``bytes_after`` and ``bytes_saved``)
+    """
+    bytes_before = int(df.memory_usage(index=False, deep=True).sum())
+
+    compacted = pd.DataFrame(
+        {col: _compact_series(df[col], category_ratio) for col in df.columns},
+        index=df.index
+    )
+    compacted.columns = df.columns
+
+    bytes_after = int(compacted.memory_usage(index=False, deep=True).sum())
+    return compacted, {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after
+    }
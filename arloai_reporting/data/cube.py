@@ -0,0 +1,199 @@
+"""
+Pre-aggregated rollup cube shared by all widgets of a report.
+
+Widgets used to run their own ``groupby('Date')`` or ``groupby('Creative')``
+over the raw rows. A RollupCube scans the rows once, aggregating additive
+measures at the finest grain (Date x Creative x Placement x Device, for
+whichever of those columns the table has), and answers every coarser
+rollup from the smallest already-computed level that contains it. Each
+level is computed once and memoized.
+
+Ratios such as CTR are not additive and are not stored; derive them from
+the summed measures of a rollup (e.g. ``Clicks / Impressions``).
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import threading
+import pandas as pd
+
+from .store import FactTable, PROVENANCE_COLUMN, is_additive_measure
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSIONS = ('Date', 'Creative', 'Placement', 'Device')
+ROWS_COLUMN = 'rows'
+
+
+class RollupCube:
+    """
+    Additive measures of one fact table aggregated over a set of dimensions.
+
+    Rollups are returned as DataFrames shared between callers; treat them
+    as read-only. Rollups may be requested from several threads (widgets
+    rendering in a thread pool); each level is still computed once.
+    """
+
+    def __init__(
+        self,
+        table: FactTable,
+        dimensions: Iterable[str] = DEFAULT_DIMENSIONS,
+        spill: Optional[Any] = None
+    ):
+        """
+        Build the finest level of the cube.
+
+        Args:
+            table: Fact table to aggregate
+            dimensions: Dimension names, matched case-insensitively against
+                the table's columns; missing ones are skipped
+            spill: SpillArea levels are admitted to, so large rollups
+                spill to disk under a memory budget
+        """
+        self.table_name = table.name
+        self.spill = spill
+
+        by_name = {str(col).strip().lower(): col for col in table.column_names}
+        self.dimensions: List[Any] = [
+            by_name[name.lower()] for name in dimensions if name.lower() in by_name
+        ]
+        self.measures: List[Any] = [
+            col for col in table.column_names
+            if col not in self.dimensions and col != PROVENANCE_COLUMN
+            and is_additive_measure(col, table.column(col))
+        ]
+
+        self.scans = 0
+        self.rollups = 0
+        self._lock = threading.Lock()
+        self._levels: Dict[Tuple[Any, ...], pd.DataFrame] = {}
+        self._levels[tuple(self.dimensions)] = self._admit(self._aggregate_rows(table))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _aggregate_rows(self, table: FactTable) -> pd.DataFrame:
+        """Aggregate the raw rows to the finest level."""
+        frame = table.to_frame(self.dimensions + self.measures)
+        for col in self.dimensions:
+            if col in table.date_columns and not pd.api.types.is_datetime64_any_dtype(frame[col]):
+                # Text dates from CSV exports; keep them as text if none parse
+                parsed = pd.to_datetime(frame[col].astype(object), errors='coerce')
+                if parsed.notna().any():
+                    frame[col] = parsed
+        frame[ROWS_COLUMN] = 1
+
+        self.scans += 1
+        logger.debug(f"Built rollup cube for {self.table_name} over {self.dimensions}")
+        return self._aggregate(frame, self.dimensions)
+
+    def _aggregate(self, frame: pd.DataFrame, by: List[Any]) -> pd.DataFrame:
+        values = self.measures + [ROWS_COLUMN]
+        if not by:
+            return frame[values].sum(min_count=1).to_frame().T.reset_index(drop=True)
+        return (
+            frame.groupby(by, observed=True, dropna=False, sort=True)[values]
+            .sum(min_count=1)
+            .reset_index()
+        )
+
+    def _admit(self, level: pd.DataFrame) -> pd.DataFrame:
+        return self.spill.admit_frame(level) if self.spill is not None else level
+
+    def _resolve(self, by: Sequence[str]) -> List[Any]:
+        lookup = {str(col).lower(): col for col in self.dimensions}
+        resolved = []
+        for name in by:
+            if str(name).lower() not in lookup:
+                raise ValueError(f"Unknown dimension for {self.table_name} cube: {name}")
+            resolved.append(lookup[str(name).lower()])
+        return resolved
+
+    def has_dimension(self, name: str) -> bool:
+        """Check whether the cube can be rolled up by a dimension."""
+        return any(str(col).lower() == str(name).lower() for col in self.dimensions)
+
+    def rollup(self, by: Sequence[str] = ()) -> pd.DataFrame:
+        """
+        Get measures aggregated by some dimensions.
+
+        Args:
+            by: Dimension names; empty for grand totals
+
+        Returns:
+            DataFrame with the dimension columns (in cube order), the
+            summed measures and a ``rows`` count
+        """
+        resolved = self._resolve(by)
+        key = tuple(col for col in self.dimensions if col in resolved)
+        with self._lock:
+            if key in self._levels:
+                return self._levels[key]
+
+            # Roll up from the smallest computed level that still has every
+            # requested dimension
+            source_key = min(
+                (level for level in self._levels if set(key) <= set(level)),
+                key=lambda level: len(self._levels[level])
+            )
+            level = self._admit(self._aggregate(self._levels[source_key], list(key)))
+            self._levels[key] = level
+            self.rollups += 1
+        logger.debug(f"Rolled up {self.table_name} to {list(key)} from {list(source_key)}")
+        return level
+
+    def totals(self) -> Dict[str, float]:
+        """
+        Grand totals of the measures.
+
+        Returns:
+            Mapping of measure (and ``rows``) to its total
+        """
+        row = self.rollup(()).iloc[0]
+        return {col: float(value) for col, value in row.items()}
+
+    def __repr__(self) -> str:
+        return (
+            f"RollupCube(table='{self.table_name}', dimensions={self.dimensions}, "
+            f"measures={self.measures}, levels={len(self._levels)})"
+        )
+
+
+def build_report_cube(
+    tables: Dict[str, FactTable],
+    dimensions: Iterable[str] = DEFAULT_DIMENSIONS,
+    spill: Optional[Any] = None
+) -> Optional[RollupCube]:
+    """
+    Build the cube of a report's primary fact table.
+
+    The primary table is the largest one that has at least one cube
+    dimension and one additive measure.
+
+    Args:
+        tables: Fact tables keyed by name
+        dimensions: Cube dimension names
+        spill: SpillArea for the cube's levels (None keeps them in memory)
+
+    Returns:
+        RollupCube, or None if no table qualifies
+    """
+    wanted = {name.lower() for name in dimensions}
+    candidates = [
+        table for table in tables.values()
+        if any(str(col).strip().lower() in wanted for col in table.column_names)
+        and any(
+            str(col).strip().lower() not in wanted and col != PROVENANCE_COLUMN
+            and is_additive_measure(col, table.column(col))
+            for col in table.column_names
+        )
+    ]
+    if not candidates:
+        return None
+    return RollupCube(max(candidates, key=lambda table: table.num_rows), dimensions, spill)
@@ -0,0 +1,321 @@
+"""
+Derived metrics compiled from declarative expressions.
+
+Ratio metrics such as CTR must be computed from summed measures
+(``sum(clicks) / sum(impressions)``), not by averaging per-row ratios.
+A DerivedMetrics catalog compiles each definition once into a tree of
+vectorized NumPy operations and evaluates it against any rollup of the
+report: a cube rollup by dimensions or a time-index grain. Results are
+cached per (metric, grain) for the lifetime of the report.
+
+Expressions may use numbers, ``+ - * /``, parentheses, ``sum(<measure>)``,
+``rows()`` (the number of source rows in each bucket) and the names of
+other derived metrics. Measure names are matched ignoring case, spaces and
+underscores, so ``sum(video_views)`` finds a ``Video Views`` column.
+Division by zero yields NaN.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+import ast
+import logging
+import operator
+import threading
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS = {
+    'ctr': 'sum(clicks) / sum(impressions)',
+    'cpm': 'sum(spend) / sum(impressions) * 1000',
+    'cpc': 'sum(spend) / sum(clicks)',
+    'engagement_rate': 'sum(engagements) / sum(impressions)'
+}
+
+ROWS_MEASURE = 'rows'
+
+
+def _normalize(name: Any) -> str:
+    return str(name).strip().lower().replace(' ', '').replace('_', '')
+
+
+def _divide(numerator: Any, denominator: Any) -> Any:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.true_divide(numerator, denominator)
+    return np.where(np.asarray(denominator) == 0, np.nan, result)
+
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: _divide
+}
+
+# Evaluates a compiled expression given measure columns and other metrics
+Evaluator = Callable[[Mapping[str, np.ndarray], Callable[[str], np.ndarray]], Any]
+
+
+class MetricExpression:
+    """
+    A derived metric compiled into vectorized operations.
+    """
+
+    def __init__(self, name: str, expression: str):
+        """
+        Parse and compile an expression.
+
+        Args:
+            name: Metric name
+            expression: Definition, e.g. ``sum(clicks) / sum(impressions)``
+
+        Raises:
+            ValueError: If the expression uses unsupported syntax
+        """
+        self.name = name
+        self.expression = expression
+        self.measures: Set[str] = set()
+        self.dependencies: Set[str] = set()
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression for metric {name}: {expression}") from e
+        self._evaluate = self._compile(tree.body)
+
+    def __reduce__(self):
+        # Compiled closures can't be pickled; recompile from the source
+        return (MetricExpression, (self.name, self.expression))
+
+    def _compile(self, node: ast.AST) -> Evaluator:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            value = float(node.value)
+            return lambda measures, metric: value
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+            op = _OPERATORS[type(node.op)]
+            left, right = self._compile(node.left), self._compile(node.right)
+            return lambda measures, metric: op(left(measures, metric), right(measures, metric))
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.USub):
+                return lambda measures, metric: -operand(measures, metric)
+            return operand
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            function = node.func.id.lower()
+            if function == 'sum' and len(node.args) == 1 and isinstance(node.args[0], ast.Name):
+                measure = _normalize(node.args[0].id)
+                self.measures.add(measure)
+                return lambda measures, metric: measures[measure]
+            if function == ROWS_MEASURE and not node.args:
+                self.measures.add(ROWS_MEASURE)
+                return lambda measures, metric: measures[ROWS_MEASURE]
+
+        if isinstance(node, ast.Name):
+            dependency = node.id.lower()
+            self.dependencies.add(dependency)
+            return lambda measures, metric: metric(dependency)
+
+        raise ValueError(
+            f"Unsupported syntax in metric {self.name}: {ast.get_source_segment(self.expression, node)} "
+            f"(use numbers, + - * /, sum(<measure>), rows() and metric names)"
+        )
+
+    def evaluate(self, measures: Mapping[str, np.ndarray], metric: Callable[[str], np.ndarray]) -> np.ndarray:
+        """
+        Evaluate the expression over summed measures.
+
+        Args:
+            measures: Summed measure columns keyed by normalized name
+            metric: Returns the values of another derived metric
+
+        Returns:
+            Array of metric values, one per bucket
+        """
+        return self._evaluate(measures, metric)
+
+    def __repr__(self) -> str:
+        return f"MetricExpression(name='{self.name}', expression='{self.expression}')"
+
+
+class DerivedMetrics:
+    """
+    Catalog of derived metrics evaluated against a report's rollups.
+    """
+
+    def __init__(
+        self,
+        cube: Optional[Any] = None,
+        time_index: Optional[Any] = None,
+        definitions: Optional[Mapping[str, str]] = None
+    ):
+        """
+        Initialize the catalog.
+
+        Args:
+            cube: RollupCube answering dimension rollups
+            time_index: TimeIndex answering time grains
+            definitions: Metric definitions added to (or overriding)
+                ``DEFAULT_METRICS``
+        """
+        self.cube = cube
+        self.time_index = time_index
+        self._metrics: Dict[str, MetricExpression] = {}
+        self._cache: Dict[Tuple[str, Tuple[Any, ...]], pd.Series] = {}
+        # Reentrant: a metric computes the metrics it depends on
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+        for name, expression in {**DEFAULT_METRICS, **(definitions or {})}.items():
+            self.define(name, expression)
+
+    def define(self, name: str, expression: str) -> MetricExpression:
+        """
+        Add or replace a metric definition.
+
+        Args:
+            name: Metric name (case-insensitive)
+            expression: Definition
+
+        Returns:
+            Compiled expression
+        """
+        compiled = MetricExpression(name.lower(), expression)
+        with self._lock:
+            self._metrics[name.lower()] = compiled
+            # Metrics built on this one are cached too
+            self._cache = {}
+        return compiled
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the defined metrics."""
+        return list(self._metrics)
+
+    def _grain(self, by: Sequence[str], grain: Optional[str]) -> Tuple[Tuple[Any, ...], pd.DataFrame]:
+        """Get the cache key and summed measures of a grain."""
+        if grain is not None:
+            if self.time_index is None:
+                raise ValueError(f"No time index to compute grain {grain}")
+            return ('time', grain), self.time_index.grain(grain)
+        if self.cube is None:
+            raise ValueError("No rollup cube to compute derived metrics")
+        return ('cube',) + tuple(sorted(str(name).lower() for name in by)), self.cube.rollup(by)
+
+    def _missing(self, name: str, frame: pd.DataFrame, seen: Tuple[str, ...] = ()) -> Set[str]:
+        if name not in self._metrics:
+            raise ValueError(f"Unknown derived metric: {name}")
+        if name in seen:
+            raise ValueError(f"Derived metric {name} depends on itself")
+        expression = self._metrics[name]
+        available = {_normalize(col) for col in frame.columns}
+        missing = {measure for measure in expression.measures if measure not in available}
+        for dependency in expression.dependencies:
+            missing |= self._missing(dependency, frame, seen + (name,))
+        return missing
+
+    def available(self, name: str, by: Sequence[str] = (), grain: Optional[str] = None) -> bool:
+        """
+        Check whether the report has the measures a metric needs.
+
+        Args:
+            name: Metric name
+            by: Cube dimensions
+            grain: Time grain (takes precedence over ``by``)
+
+        Returns:
+            True if the metric can be computed
+        """
+        try:
+            _, frame = self._grain(by, grain)
+            return not self._missing(name.lower(), frame)
+        except ValueError:
+            return False
+
+    def compute(self, name: str, by: Sequence[str] = (), grain: Optional[str] = None) -> pd.Series:
+        """
+        Compute a metric at a grain.
+
+        Args:
+            name: Metric name
+            by: Cube dimensions to roll up by (empty for the grand total)
+            grain: Time grain such as 'day' or 'week' (takes precedence
+                over ``by``)
+
+        Returns:
+            Series aligned with the rows of the corresponding rollup
+            (``cube.rollup(by)`` or ``time_index.grain(grain)``)
+
+        Raises:
+            ValueError: If the metric is unknown or its measures are missing
+        """
+        with self._lock:
+            return self._compute(name.lower(), by, grain)
+
+    def _compute(self, name: str, by: Sequence[str], grain: Optional[str]) -> pd.Series:
+        key, frame = self._grain(by, grain)
+        cached = self._cache.get((name, key))
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        missing = self._missing(name, frame)
+        if missing:
+            raise ValueError(f"Derived metric {name} needs measures missing from the data: {sorted(missing)}")
+
+        measures = {
+            _normalize(col): frame[col].to_numpy(dtype='float64', na_value=np.nan)
+            for col in frame.columns
+            if pd.api.types.is_numeric_dtype(frame[col]) and not pd.api.types.is_bool_dtype(frame[col])
+        }
+        values = self._metrics[name].evaluate(
+            measures, lambda dependency: self._compute(dependency, by, grain).to_numpy()
+        )
+        values = np.broadcast_to(np.asarray(values, dtype='float64'), len(frame))
+        result = pd.Series(values, index=frame.index, name=name)
+
+        self.misses += 1
+        self._cache[(name, key)] = result
+        return result
+
+    def frame(self, names: Iterable[str], by: Sequence[str] = (), grain: Optional[str] = None) -> pd.DataFrame:
+        """
+        Get a rollup with derived metric columns appended.
+
+        Args:
+            names: Metric names
+            by: Cube dimensions
+            grain: Time grain (takes precedence over ``by``)
+
+        Returns:
+            New DataFrame; the shared rollup is left untouched
+        """
+        _, base = self._grain(by, grain)
+        columns = {name.lower(): self.compute(name, by, grain) for name in names}
+        return base.assign(**columns)
+
+    def total(self, name: str) -> float:
+        """
+        Compute a metric over all rows.
+
+        Args:
+            name: Metric name
+
+        Returns:
+            Metric value (NaN when undefined, e.g. no impressions)
+        """
+        return float(self.compute(name).iloc[0])
+
+    def __repr__(self) -> str:
+        return f"DerivedMetrics(metrics={self.names}, cached={len(self._cache)})"
@@ -0,0 +1,158 @@
+"""
+Reader for Google Analytics 4 CSV exports.
+
+GA4 exports start with a ``#`` comment banner (property, report name and
+date range), followed by a header row and a "Grand total" row that carries
+an extra trailing cell with the literal text ``Grand total``. The generic
+CSV path chokes on the banner; this reader parses the banner into
+metadata, separates the grand total and infers which columns are
+dimensions (text, dates, IDs) and which are metrics.
+"""
+
+from typing import Dict, List, Tuple, Any, Union
+from pathlib import Path
+import csv
+import logging
+import re
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+GRAND_TOTAL_MARKER = 'Grand total'
+TRAILER_COLUMN = '_trailer'
+
+_DATE_RANGE = re.compile(r'^(\d{8})-(\d{8})$')
+_DATE_FIELD = re.compile(r'^(Start|End) date:\s*(\d{8})$', re.IGNORECASE)
+
+# Banner lines read when sniffing a file
+MAX_BANNER_LINES = 20
+
+# GA4 dimensions whose values look numeric
+_NUMERIC_DIMENSION = re.compile(
+    r'^(date|date \+ hour.*|hour|day|week|month|year|iso week.*|nth .*|.*\bid)$',
+    re.IGNORECASE
+)
+
+
+def is_ga4_export(file_path: Union[str, Path]) -> bool:
+    """
+    Check whether a CSV file starts with a GA4 comment banner.
+
+    GA4 banners are ``#`` comment lines that include the report's date
+    range, either as ``# 20250707-20250710`` or as ``# Start date:`` and
+    ``# End date:`` lines. Other CSVs that merely start with a comment are
+    not GA4 exports.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        True if the file starts with a GA4 banner
+    """
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        for _ in range(MAX_BANNER_LINES):
+            line = f.readline()
+            if not line.startswith('#'):
+                return False
+            field = line[1:].strip()
+            if _DATE_RANGE.match(field) or _DATE_FIELD.match(field):
+                return True
+    return False
+
+
+def parse_banner(lines: List[str]) -> Dict[str, Any]:
+    """
+    Parse GA4 banner lines into metadata.
+
+    Args:
+        lines: Banner lines with the leading ``#`` removed
+
+    Returns:
+        Dictionary with ``property``, ``report_name`` and ``date_range``
+        (when present)
+    """
+    fields = [line.strip() for line in lines if line.strip() and not set(line.strip()) <= {'-'}]
+    metadata: Dict[str, Any] = {}
+
+    for field in fields:
+        match = _DATE_RANGE.match(field)
+        date_field = _DATE_FIELD.match(field)
+        if match:
+            start, end = (pd.to_datetime(value, format='%Y%m%d').date().isoformat() for value in match.groups())
+            metadata['date_range'] = {'start': start, 'end': end}
+        elif date_field:
+            bound = 'start' if date_field.group(1).lower() == 'start' else 'end'
+            value = pd.to_datetime(date_field.group(2), format='%Y%m%d').date().isoformat()
+            metadata.setdefault('date_range', {})[bound] = value
+        elif 'property' not in metadata:
+            metadata['property'] = field
+        elif 'report_name' not in metadata:
+            metadata['report_name'] = field
+        else:
+            metadata.setdefault('notes', []).append(field)
+
+    return metadata
+
+
+def read_ga4_export(file_path: Union[str, Path]) -> Tuple[pd.DataFrame, Dict[str, Any], Dict[str, Any]]:
+    """
+    Read a GA4 CSV export.
+
+    The banner and header are read once, and the rows in a single
+    ``read_csv`` call on the same handle. Numeric-looking GA4 dimensions
+    such as ``Date`` or ``Hour`` are read as text; the parser infers the
+    other columns, and those it reads as numbers are the metrics (as
+    float64). Remaining columns are dimensions kept as text, with ``Date``
+    (``YYYYMMDD``) parsed into datetimes.
+
+    Args:
+        file_path: Path to the export
+
+    Returns:
+        Tuple of (body DataFrame, banner metadata, grand total values)
+    """
+    banner = []
+    header = None
+
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for line in iter(f.readline, ''):
+            if line.startswith('#'):
+                banner.append(line[1:])
+            elif line.strip():
+                header = next(csv.reader([line]))
+                break
+
+        if header is None:
+            raise ValueError(f"No header row found in GA4 export {file_path}")
+
+        dtype = {col: str for col in header if _NUMERIC_DIMENSION.match(str(col).strip())}
+        dtype[TRAILER_COLUMN] = str
+        df = pd.read_csv(
+            f,
+            header=None,
+            names=header + [TRAILER_COLUMN],
+            dtype=dtype,
+            skip_blank_lines=True
+        )
+
+    is_total = (df[TRAILER_COLUMN].str.strip() == GRAND_TOTAL_MARKER).fillna(False).to_numpy(dtype=bool)
+    body = df.loc[~is_total, header].reset_index(drop=True)
+
+    measures = []
+    for col in header:
+        values = body[col]
+        if col not in dtype and pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            body[col] = values.astype('float64')
+            measures.append(col)
+        elif str(col).strip().lower() == 'date':
+            parsed = pd.to_datetime(values, format='%Y%m%d', errors='coerce')
+            body[col] = parsed if parsed.notna().sum() == values.notna().sum() else values.astype(object)
+        else:
+            body[col] = values.astype(object)
+
+    grand_total = {}
+    if is_total.any():
+        total_row = df.loc[is_total, measures].iloc[0]
+        grand_total = {col: float(value) for col, value in total_row.items() if pd.notna(value)}
+
+    return body, parse_banner(banner), grand_total
@@ -0,0 +1,351 @@
+"""
+Streaming readers for JSON and newline-delimited JSON API dumps.
+
+Platform API dumps carry a ``metrics``/``time_series``/``dimensions``/
+``metadata`` document whose ``time_series`` arrays run to hundreds of MB.
+Instead of loading the whole object tree, the reader walks the document as
+a stream of ijson parse events and appends each ``time_series`` record to a
+column batch as soon as it is parsed, so only one batch of Python objects is
+alive at a time. Without ijson the whole document is loaded into memory and
+a warning is logged. Newline-delimited files hold either document fragments
+or flat row records, one per line.
+
+Line parsing uses orjson when installed and falls back to ``json``.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from pathlib import Path
+import json
+import logging
+import pandas as pd
+
+from .store import FactTable, concat_columns, missing_column, to_column
+
+logger = logging.getLogger(__name__)
+
+JSON_SECTIONS = ('metrics', 'time_series', 'dimensions', 'metadata')
+# Sections merged into the processed data as they are; other top-level keys
+# of a document are ignored so they can't replace internal structures
+SUMMARY_SECTIONS = ('metrics', 'dimensions')
+NDJSON_SUFFIXES = ('.ndjson', '.jsonl')
+
+# Column holding a time series entry's ``dates`` array
+DATES_COLUMN = '_dates'
+
+
+def json_loads() -> Callable[[Union[str, bytes]], Any]:
+    """Get the fastest available ``loads`` function."""
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        return json.loads
+
+
+def _nested_to_text(value: Any) -> Any:
+    """Keep a nested record value as JSON text."""
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+class RecordBatcher:
+    """
+    Collects dict records and hands them out as DataFrame batches of a
+    fixed size.
+    """
+
+    def __init__(self, batch_size: int, usecols: Optional[Callable[[Any], bool]] = None):
+        """
+        Initialize the batcher.
+
+        Args:
+            batch_size: Records per batch
+            usecols: Predicate selecting fields by name (all when omitted)
+        """
+        self.batch_size = batch_size
+        self.usecols = usecols
+        self._records: List[Dict[str, Any]] = []
+
+    def add(self, record: Dict[str, Any]) -> Optional[pd.DataFrame]:
+        """
+        Append a record.
+
+        Args:
+            record: Parsed record
+
+        Returns:
+            A full batch, or None if the current batch isn't full yet
+        """
+        self._records.append(record)
+        return self.flush() if len(self._records) >= self.batch_size else None
+
+    def flush(self) -> Optional[pd.DataFrame]:
+        """
+        Hand out the records collected so far.
+
+        Missing fields become missing values and nested values are kept as
+        JSON text.
+
+        Returns:
+            DataFrame batch, or None if there are no pending records
+        """
+        if not self._records:
+            return None
+        batch = pd.DataFrame.from_records(self._records)
+        self._records = []
+
+        if self.usecols is not None:
+            batch = batch[[col for col in batch.columns if self.usecols(col)]]
+        for col in batch.columns:
+            if batch[col].dtype == object and pd.api.types.infer_dtype(batch[col], skipna=True) == 'mixed':
+                batch[col] = batch[col].map(_nested_to_text)
+        return batch
+
+
+class TimeSeriesBuilder:
+    """
+    Builds a fact table for one ``time_series`` entry from its streamed
+    ``dates`` and ``data`` arrays.
+    """
+
+    def __init__(self, name: str, batch_size: int, usecols: Optional[Callable[[Any], bool]] = None):
+        """
+        Initialize the builder.
+
+        Args:
+            name: Time series key
+            batch_size: Records per column batch
+            usecols: Predicate selecting record fields by name
+        """
+        self.name = name
+        self.batch_size = batch_size
+        self._records = RecordBatcher(batch_size, usecols)
+        self._tables: List[FactTable] = []
+        self._dates: List[Any] = []
+        self._date_pieces: List[Any] = []
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        """Append one ``data`` record."""
+        batch = self._records.add(record)
+        if batch is not None:
+            self._tables.append(FactTable.from_dataframe(batch, self.name))
+
+    def add_date(self, value: Any) -> None:
+        """Append one ``dates`` value."""
+        self._dates.append(value)
+        if len(self._dates) >= self.batch_size:
+            self._flush_dates()
+
+    def _flush_dates(self) -> None:
+        if self._dates:
+            self._date_pieces.append(to_column(pd.Series(self._dates)))
+            self._dates = []
+
+    def result(self) -> FactTable:
+        """
+        Build the fact table.
+
+        Returns:
+            FactTable with the record fields plus the dates in
+            ``DATES_COLUMN``; the shorter of the two is padded with missing
+            values
+        """
+        batch = self._records.flush()
+        if batch is not None:
+            self._tables.append(FactTable.from_dataframe(batch, self.name))
+        self._flush_dates()
+
+        columns = {}
+        if self._tables:
+            columns = FactTable.concat(self._tables, self.name).columns
+        rows = len(next(iter(columns.values()))) if columns else 0
+
+        date_columns = []
+        if self._date_pieces:
+            dates = concat_columns(self._date_pieces)
+            if len(dates) < rows:
+                dates = concat_columns([dates, missing_column(dates, rows - len(dates))])
+            elif len(dates) > rows:
+                columns = {
+                    col: concat_columns([values, missing_column(values, len(dates) - rows)])
+                    for col, values in columns.items()
+                }
+            columns = {DATES_COLUMN: dates, **columns}
+            date_columns = [DATES_COLUMN]
+
+        return FactTable(self.name, columns, date_columns)
+
+
+def _build_value(events: Iterator[Tuple[str, Any]], event: str, value: Any) -> Any:
+    """Assemble one complete JSON value from parse events."""
+    if event not in ('start_map', 'start_array'):
+        return value
+
+    from ijson.common import ObjectBuilder
+
+    builder = ObjectBuilder()
+    builder.event(event, value)
+    depth = 1
+    for event, value in events:
+        builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+            if depth == 0:
+                break
+    return builder.value
+
+
+def _iter_records(events: Iterator[Tuple[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Read the objects of an array whose ``start_array`` was consumed."""
+    for event, value in events:
+        if event == 'end_array':
+            return
+        if event != 'start_map':
+            # Not a record; consume and skip it
+            _build_value(events, event, value)
+            continue
+
+        # Records are mostly flat, so assemble them here and only hand
+        # nested values to the (slower) generic builder
+        record = {}
+        for event, key in events:
+            if event == 'end_map':
+                break
+            event, value = next(events)
+            record[key] = _build_value(events, event, value) if event in ('start_map', 'start_array') else value
+        yield record
+
+
+def _stream_time_series(
+    events: Iterator[Tuple[str, Any]],
+    batch_size: int,
+    usecols: Optional[Callable[[Any], bool]]
+) -> Iterator[Tuple[str, Any, Any]]:
+    """Walk the ``time_series`` object, building one entry at a time."""
+    for event, name in events:
+        if event == 'end_map':
+            return
+
+        event, value = next(events)
+        if event != 'start_map':
+            yield ('time_series', name, _build_value(events, event, value))
+            continue
+
+        builder = TimeSeriesBuilder(name, batch_size, usecols)
+        for event, field in events:
+            if event == 'end_map':
+                break
+            event, value = next(events)
+            if field == 'dates' and event == 'start_array':
+                for event, value in events:
+                    if event == 'end_array':
+                        break
+                    builder.add_date(_build_value(events, event, value))
+            elif field == 'data' and event == 'start_array':
+                for record in _iter_records(events):
+                    builder.add_record(record)
+            else:
+                _build_value(events, event, value)
+        yield ('time_series', name, builder.result())
+
+
+def _iter_document_events(
+    file_path: Union[str, Path],
+    batch_size: int,
+    usecols: Optional[Callable[[Any], bool]]
+) -> Iterator[Tuple[str, Any, Any]]:
+    """Stream a single JSON document with ijson."""
+    import ijson
+
+    with open(file_path, 'rb') as f:
+        events = iter(ijson.basic_parse(f, use_float=True))
+        event, _ = next(events)
+        if event != 'start_map':
+            raise ValueError(f"Expected a JSON object at the top of {file_path}")
+
+        for event, key in events:
+            if event == 'end_map':
+                break
+            event, value = next(events)
+            if key == 'time_series' and event == 'start_map':
+                yield from _stream_time_series(events, batch_size, usecols)
+            else:
+                yield ('section', key, _build_value(events, event, value))
+
+
+def _iter_document(
+    document: Dict[str, Any],
+    batch_size: int,
+    usecols: Optional[Callable[[Any], bool]]
+) -> Iterator[Tuple[str, Any, Any]]:
+    """Walk an already parsed document, converting time series to columns."""
+    for key, value in document.items():
+        if key != 'time_series' or not isinstance(value, dict):
+            yield ('section', key, value)
+            continue
+
+        for name in list(value):
+            entry = value.pop(name)
+            if not isinstance(entry, dict):
+                yield ('time_series', name, entry)
+                continue
+            builder = TimeSeriesBuilder(name, batch_size, usecols)
+            for date in entry.get('dates', []):
+                builder.add_date(date)
+            for record in entry.get('data', []):
+                builder.add_record(record)
+            yield ('time_series', name, builder.result())
+
+
+def iter_json_source(
+    file_path: Union[str, Path],
+    batch_size: int,
+    usecols: Optional[Callable[[Any], bool]] = None
+) -> Iterator[Tuple[str, Any, Any]]:
+    """
+    Stream a JSON or newline-delimited JSON source.
+
+    Args:
+        file_path: Path to the file
+        batch_size: Records per column batch
+        usecols: Predicate selecting record fields by name (all when omitted)
+
+    Yields:
+        ``('section', key, value)`` for top-level document values other
+        than ``time_series``; ``('time_series', key, FactTable)`` for each
+        completed time series entry; ``('rows', None, DataFrame)`` for
+        batches of flat NDJSON records
+    """
+    file_path = Path(file_path)
+    loads = json_loads()
+
+    if file_path.suffix.lower() not in NDJSON_SUFFIXES:
+        try:
+            yield from _iter_document_events(file_path, batch_size, usecols)
+            return
+        except ImportError:
+            logger.warning(
+                f"ijson not installed; loading all of {file_path} into memory. Install with: pip install ijson"
+            )
+        with open(file_path, 'rb') as f:
+            document = loads(f.read())
+        yield from _iter_document(document, batch_size, usecols)
+        return
+
+    rows = RecordBatcher(batch_size, usecols)
+    with open(file_path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = loads(line)
+            if any(key in record for key in JSON_SECTIONS):
+                yield from _iter_document(record, batch_size, usecols)
+                continue
+            batch = rows.add(record)
+            if batch is not None:
+                yield ('rows', None, batch)
+
+    batch = rows.flush()
+    if batch is not None:
+        yield ('rows', None, batch)
@@ -0,0 +1,279 @@
+"""
+KPI extraction from insight-report PDFs.
+
+Partner insight reports state their headline figures as ``Label: value``
+pairs (``Total Impressions Delivered: 74,638``, ``Overall CTR: 3.95%``)
+and their breakdowns as rows of ``<number> <measure>`` pairs under a date
+heading (``July 7, 2025: Version 1: 12,795 impressions, 448 clicks, ...``).
+This module pulls both out of the page text.
+
+Page text is extracted only for the requested pages, in a pool of worker
+processes, and the pages read so far are cached as one entry under the
+document's content hash, together with the pages each page-range filter
+resolved to, so a partner PDF that was read before is never opened again.
+Only the process owning the cache writes that entry (``store_pages``); ingestion workers hand their pages back with the
+processed source.
+
+Requires PyPDF2 (``pip install PyPDF2``).
+"""
+
+from typing import Dict, List, Optional, Any, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+import bisect
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+LABEL_COLUMN = 'Label'
+DATE_COLUMN = 'Date'
+
+# Labels are any letters (extracted text keeps ligatures such as "ﬃ")
+_NUMBER = r'\$?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?%?'
+# Extracted text loses most line breaks, so a label/value line starts at a
+# line start, a bullet, a gap of several spaces or a list number ("1.")
+_LINE_START = r'(?:^|(?<=•)|(?<=\s\s)|(?<=\d\.))[ \t]?'
+# A value ends the figure: not a date ("2025-08-01") and not the start of
+# a name or address ("10101 West Innovation Drive")
+_VALUE_END = r'(?![\w.,]*\w|-\d| [A-Z][a-z])'
+_KPI = re.compile(
+    _LINE_START
+    + r"(?P<label>[^\W\d_](?:[^\W\d_]|[&/()' -]){0,48}?)\s*:\s*(?P<value>" + _NUMBER + r")" + _VALUE_END,
+    re.MULTILINE
+)
+_ROW = re.compile(
+    _LINE_START + r'(?P<label>[^\W\d_][\w ]{0,40}?)\s*:\s*'
+    r'(?P<pairs>' + _NUMBER + r'\s+[A-Za-z]+(?:\s*,\s*' + _NUMBER + r'\s+[A-Za-z]+)+)',
+    re.MULTILINE
+)
+_MEASURE = re.compile(r'(?P<value>' + _NUMBER + r')\s+(?P<name>[A-Za-z]+)')
+_DATE = re.compile(
+    r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+    r' \d{1,2}, \d{4}\b'
+)
+
+
+def parse_page_range(page_range: Any, num_pages: int) -> List[int]:
+    """
+    Resolve a page-range filter to zero-based page indices.
+
+    Args:
+        page_range: None for all pages, a string such as ``"1-3,7"``, a
+            ``(first, last)`` tuple, or an iterable of page numbers; page
+            numbers are one-based and inclusive
+        num_pages: Number of pages in the document
+
+    Returns:
+        Sorted zero-based indices of existing pages
+    """
+    if page_range is None:
+        return list(range(num_pages))
+
+    pages = set()
+    if isinstance(page_range, str):
+        for part in page_range.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            first, _, last = part.partition('-')
+            first = int(first) if first.strip() else 1
+            last = (int(last) if last.strip() else num_pages) if _ else first
+            pages.update(range(first, last + 1))
+    elif isinstance(page_range, tuple) and len(page_range) == 2:
+        first, last = page_range
+        pages.update(range(first or 1, (last or num_pages) + 1))
+    else:
+        pages.update(int(page) for page in page_range)
+
+    return sorted(page - 1 for page in pages if 1 <= page <= num_pages)
+
+
+def count_pages(file_path: Union[str, Path]) -> int:
+    """Get the number of pages in a PDF."""
+    import PyPDF2
+
+    return len(PyPDF2.PdfReader(str(file_path)).pages)
+
+
+def extract_page_texts(file_path: Union[str, Path], page_indices: List[int]) -> List[str]:
+    """
+    Extract the text of selected pages.
+
+    Args:
+        file_path: Path to the PDF
+        page_indices: Zero-based page indices
+
+    Returns:
+        Page texts in the order of ``page_indices``
+    """
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(str(file_path))
+    return [reader.pages[index].extract_text() or '' for index in page_indices]
+
+
+# Cache variant of a document's extracted pages
+PAGES_VARIANT = "pdf-pages"
+# Key of a processed source's extracted page texts, stored by the parent
+PAGES_KEY = "pdf_pages"
+
+
+def page_range_key(page_range: Any) -> str:
+    """Describe a page-range filter for the document's page cache entry."""
+    return repr(page_range)
+
+
+def extract_pages(
+    file_path: Union[str, Path],
+    page_range: Any = None,
+    workers: Optional[int] = None,
+    cache: Optional[Any] = None
+) -> Tuple[List[int], Dict[int, str]]:
+    """
+    Extract the texts of a page range, reusing cached pages and splitting
+    the rest across worker processes.
+
+    The document's cache entry records which pages each page-range filter
+    resolved to, so a range read before is served without opening the PDF.
+
+    Args:
+        file_path: Path to the PDF
+        page_range: Page-range filter (see ``parse_page_range``)
+        workers: Number of worker processes (None or 1 extracts in-process)
+        cache: SourceCache holding the document's extracted pages, keyed
+            by document hash; it is only read (lookups don't count towards
+            its statistics), new pages are written with ``store_pages``
+
+    Returns:
+        Tuple of (zero-based page indices, mapping of page index to text)
+    """
+    cached = cache.get(file_path, PAGES_VARIANT, record_stats=False) if cache is not None else None
+    known = cached['pages'] if cached is not None else {}
+    ranges = cached.get('ranges', {}) if cached is not None else {}
+
+    page_indices = ranges.get(page_range_key(page_range))
+    if page_indices is None or any(index not in known for index in page_indices):
+        page_indices = parse_page_range(page_range, count_pages(file_path))
+
+    texts = {index: known[index] for index in page_indices if index in known}
+    missing = [index for index in page_indices if index not in known]
+
+    if missing:
+        if workers and workers > 1 and len(missing) > 1:
+            # Contiguous chunks so each worker parses the document once
+            size = -(-len(missing) // workers)
+            chunks = [missing[start:start + size] for start in range(0, len(missing), size)]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+                extracted = [
+                    text
+                    for chunk_texts in executor.map(extract_page_texts, [file_path] * len(chunks), chunks)
+                    for text in chunk_texts
+                ]
+        else:
+            extracted = extract_page_texts(file_path, missing)
+
+        texts.update(zip(missing, extracted))
+        logger.debug(f"Extracted {len(missing)} of {len(page_indices)} pages from {file_path}")
+
+    return page_indices, texts
+
+
+def store_pages(
+    cache: Any,
+    file_path: Union[str, Path],
+    page_range: Any,
+    page_indices: List[int],
+    pages: Dict[int, str]
+) -> None:
+    """
+    Add extracted page texts and the pages a range resolved to to a
+    document's cache entry.
+
+    Must run in the process owning the cache: a worker's pickled copy of
+    the cache would rewrite its index from a stale view.
+
+    Args:
+        cache: SourceCache holding the document's extracted pages
+        file_path: Path to the PDF
+        page_range: Page-range filter the pages were read for
+        page_indices: Zero-based pages the filter resolved to
+        pages: Mapping of page index to text
+    """
+    cached = cache.get(file_path, PAGES_VARIANT, record_stats=False)
+    known = cached['pages'] if cached is not None else {}
+    ranges = cached.get('ranges', {}) if cached is not None else {}
+    key = page_range_key(page_range)
+    if all(index in known for index in pages) and ranges.get(key) == list(page_indices):
+        return
+    cache.put(
+        file_path,
+        {'pages': {**known, **pages}, 'ranges': {**ranges, key: list(page_indices)}},
+        PAGES_VARIANT
+    )
+
+
+def _to_number(value: str) -> float:
+    return float(value.replace('$', '').replace(',', '').rstrip('%'))
+
+
+def _measure_name(word: str) -> str:
+    return word if word.isupper() else word.capitalize()
+
+
+def extract_rows(text: str) -> List[Dict[str, Any]]:
+    """
+    Extract breakdown rows such as ``Version 1: 12,795 impressions, 448
+    clicks, 3.50% CTR``.
+
+    Each row is tagged with the closest preceding date heading. Rows whose
+    label mentions "total" are subtotals and are skipped.
+
+    Args:
+        text: Document text
+
+    Returns:
+        Rows as dictionaries of label, date (when found) and measures
+    """
+    dates = [(match.end(), match.group(0)) for match in _DATE.finditer(text)]
+    ends = [end for end, _ in dates]
+    rows = []
+
+    for match in _ROW.finditer(text):
+        label = match.group('label').strip()
+        if 'total' in label.lower():
+            continue
+
+        row: Dict[str, Any] = {LABEL_COLUMN: label}
+        heading = bisect.bisect_right(ends, match.start())
+        if heading:
+            row[DATE_COLUMN] = datetime.strptime(dates[heading - 1][1], '%B %d, %Y')
+        for measure in _MEASURE.finditer(match.group('pairs')):
+            row[_measure_name(measure.group('name'))] = _to_number(measure.group('value'))
+        rows.append(row)
+
+    return rows
+
+
+def extract_kpis(text: str) -> Dict[str, float]:
+    """
+    Extract headline ``Label: value`` figures.
+
+    Breakdown rows are removed first so their leading values are not
+    mistaken for headline figures. When a label repeats, the first
+    occurrence wins.
+
+    Args:
+        text: Document text
+
+    Returns:
+        Mapping of label to numeric value
+    """
+    text = _ROW.sub(' ', text)
+    kpis = {}
+    for match in _KPI.finditer(text):
+        label = ' '.join(match.group('label').split())
+        if label and label not in kpis:
+            kpis[label] = _to_number(match.group('value'))
+    return kpis
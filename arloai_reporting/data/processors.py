@@ -2,13 +2,59 @@
 Data processors for handling various input formats.
 """
 
-from typing import Dict, List, Union, Any
+from typing import Dict, List, Union, Any, Optional, Tuple, Iterable
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
 import logging
+import time
 import pandas as pd
 
+from .api import ApiConnector, ApiSource
+from .arrow import ARROW_SUFFIXES, PARQUET_SUFFIXES, arrow_to_fact_table, read_arrow_ipc, read_parquet
+from .cache import SourceCache, DEFAULT_MAX_BYTES
+from .compaction import compact_frame
+from .ga4 import is_ga4_export, read_ga4_export
+from .incremental import CampaignState
+from .json_stream import NDJSON_SUFFIXES, SUMMARY_SECTIONS, iter_json_source
+from .pdf import (
+    LABEL_COLUMN, PAGES_KEY, extract_kpis, extract_pages, extract_rows, store_pages
+)
+from .projection import ColumnProjection
+from .spill import SpillArea
+from .sql import SqlSource
+from .store import FactStore, FactTable, PROVENANCE_COLUMN, is_date_column, merge_tables, source_rows
+from .streaming import BatchAccumulator, iter_csv_batches, iter_excel_batches, DEFAULT_BATCH_SIZE
+from .timeindex import build_time_indexes
+from .validation import validate_tables
+
 logger = logging.getLogger(__name__)
 
+# Natural key of campaign delivery rows, used to drop duplicates across sources
+DEFAULT_MERGE_KEYS = ('Date', 'Creative', 'Placement')
+
+
+def _timed_process_source(
+    processor: "DataProcessor",
+    source_path: Path,
+    projection: Optional[ColumnProjection] = None
+) -> Tuple[Dict[str, Any], float]:
+    """
+    Process a single source and measure how long it took.
+    
+    Module-level so it can be shipped to process pool workers.
+    
+    Args:
+        processor: DataProcessor to process the source with
+        source_path: Path to the source file
+        projection: Columns to read (None reads all)
+        
+    Returns:
+        Tuple of (processed data, elapsed seconds)
+    """
+    start = time.perf_counter()
+    source_data = processor._process_single_source(source_path, projection)
+    return source_data, time.perf_counter() - start
+
 
 class DataProcessor:
     """
@@ -16,8 +62,99 @@ class DataProcessor:
     normalizes them into a standard format for widgets.
     """
     
-    def __init__(self):
-        """Initialize the data processor."""
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        source_timeout: Optional[float] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
+        cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        streaming: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        retain_rows: bool = True,
+        state_dir: Optional[Union[str, Path]] = None,
+        restate_days: int = 1,
+        compact: bool = True,
+        merge_keys: Iterable[str] = DEFAULT_MERGE_KEYS,
+        parquet_filters: Optional[List[Any]] = None,
+        pdf_pages: Any = None,
+        pdf_workers: Optional[int] = None,
+        api_connector: Optional[ApiConnector] = None,
+        timezone: Optional[str] = None,
+        source_timezone: Optional[str] = None,
+        memory_budget: Optional[int] = None,
+        spill_dir: Optional[Union[str, Path]] = None,
+        validate: bool = True,
+        quarantine: bool = False
+    ):
+        """
+        Initialize the data processor.
+        
+        Args:
+            max_workers: Number of worker processes used to parse sources
+                (None or 1 parses sources serially in-process)
+            source_timeout: Seconds to wait for each source in parallel mode
+                before giving up on it (None waits indefinitely)
+            cache_dir: Directory for the persistent processed-source cache
+                (None disables caching)
+            cache_max_bytes: Size cap of the cache before LRU eviction
+            streaming: Read large sources in fixed-size batches and compute
+                summaries incrementally instead of loading them whole
+            batch_size: Rows per batch in streaming mode
+            retain_rows: Keep row-level fact tables in streaming mode. Streaming
+                then bounds parse memory only, as the tables still hold every
+                row; disable to bound memory by batch size and keep only
+                summaries
+            state_dir: Directory for persistent per-campaign aggregates used
+                by incremental ingestion
+            restate_days: Days before a campaign's latest folded date that
+                new sources may restate
+            compact: Downcast counters, store ratios as float32 and turn
+                repetitive strings into categoricals before building tables
+            merge_keys: Natural key columns used to deduplicate rows when the
+                same table (sheet/file name) comes from several sources
+            parquet_filters: pyarrow filters applied when reading Parquet
+                files; row groups that can't match are skipped
+            pdf_pages: One-based, inclusive page range read from PDFs, e.g.
+                "1-3,7" or (2, None); None reads every page
+            pdf_workers: Number of worker processes extracting PDF pages
+                (None or 1 extracts serially)
+            api_connector: Connector fetching API sources (a default one
+                is created when omitted)
+            timezone: Reporting timezone the time indexes bucket dates in
+                (e.g. 'Europe/Berlin'); None keeps dates as they are
+            source_timezone: Timezone of naive source timestamps (defaults
+                to ``timezone``)
+            memory_budget: Bytes of column data to keep in memory per
+                process; beyond it, columns and rollups spill to
+                memory-mapped files (None keeps everything in memory)
+            spill_dir: Parent directory of spill files (defaults to the
+                system temporary directory)
+            validate: Run data-quality checks over the merged tables and
+                report issues in ``metadata['validation']``
+            quarantine: Move rows failing validation out of the tables
+                into ``FactStore.quarantine``
+        """
+        self.max_workers = max_workers
+        self.source_timeout = source_timeout
+        self.streaming = streaming
+        self.batch_size = batch_size
+        self.retain_rows = retain_rows
+        self.state_dir = state_dir
+        self.restate_days = restate_days
+        self.compact = compact
+        self.merge_keys = tuple(merge_keys)
+        self.parquet_filters = parquet_filters
+        self.pdf_pages = pdf_pages
+        self.pdf_workers = pdf_workers
+        self.api_connector = api_connector or ApiConnector()
+        self.timezone = timezone
+        self.source_timezone = source_timezone
+        self.memory_budget = memory_budget
+        self.spill_dir = spill_dir
+        self.validate = validate
+        self.quarantine = quarantine
+        self._spill = None
+        self.cache = SourceCache(cache_dir, max_bytes=cache_max_bytes) if cache_dir else None
         self.processors = {
             '.xlsx': self._process_excel,
             '.xls': self._process_excel,
@@ -25,47 +162,524 @@ class DataProcessor:
             '.pdf': self._process_pdf,
             '.json': self._process_json
         }
+        for suffix in NDJSON_SUFFIXES:
+            self.processors[suffix] = self._process_json
+        for suffix in ARROW_SUFFIXES + PARQUET_SUFFIXES:
+            self.processors[suffix] = self._process_arrow
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes parse without a spill area: their results are
+        # copied back into this process, which admits them one by one
+        state = self.__dict__.copy()
+        state['_spill'] = None
+        return state
     
-    def process_sources(self, sources: List[Union[str, Path]]) -> Dict[str, Any]:
+    def process_sources(
+        self,
+        sources: List[Union[str, Path, SqlSource, ApiSource]],
+        columns: Optional[Iterable[str]] = None,
+        campaign_id: Optional[str] = None
+    ) -> FactStore:
         """
         Process multiple data sources and combine into normalized format.
         
         Args:
-            sources: List of file paths to process
+            sources: List of file paths, SQL sources and API sources to process
+            columns: Only read these columns (matched case-insensitively);
+                None reads every column
+            campaign_id: Fold sources into this campaign's persistent
+                aggregates; sources already folded in are not re-read
             
         Returns:
-            Dictionary with normalized data
+            FactStore with columnar tables and normalized data
         """
         logger.info(f"Processing {len(sources)} data sources")
         
-        combined_data = {
-            'metrics': {},
-            'time_series': {},
-            'dimensions': {},
-            'metadata': {}
-        }
+        combined_data = self._empty_data_structure()
         
+        source_paths = []
+        missing_sources = []
+        sql_sources = []
+        api_sources = []
         for source in sources:
+            if isinstance(source, SqlSource):
+                sql_sources.append(source)
+                continue
+            if isinstance(source, ApiSource):
+                api_sources.append(source)
+                continue
             source_path = Path(source)
             if not source_path.exists():
                 logger.warning(f"Source file not found: {source}")
+                missing_sources.append(str(source))
+                continue
+            source_paths.append(source_path)
+        
+        state = None
+        if campaign_id is not None:
+            if self.state_dir is None:
+                raise ValueError("Incremental ingestion requires a state_dir")
+            state = CampaignState.load(self.state_dir, campaign_id)
+            new_paths = [path for path in source_paths if not state.has_folded(path)]
+            logger.info(
+                f"Campaign {campaign_id}: {len(source_paths) - len(new_paths)} sources already folded, "
+                f"{len(new_paths)} new"
+            )
+            source_paths = new_paths
+        
+        # Spilled columns stay readable as long as the returned store lives
+        self._spill = SpillArea(self.memory_budget, self.spill_dir) if self.memory_budget is not None else None
+        spill = self._spill
+        
+        projection = ColumnProjection(columns) if columns else None
+        results = self._load_sources(source_paths, projection)
+        remote_results = [self._process_sql(source, projection) for source in sql_sources]
+        remote_results += self._process_api(api_sources, projection)
+        for _, source_data, _ in remote_results:
+            self._admit(source_data)
+        
+        # Merge in input order so parallel and serial runs produce the same output
+        source_timings = {}
+        table_parts = {}
+        for source_path, source_data, elapsed in results + remote_results:
+            source_timings[str(source_path)] = elapsed
+            if source_data is not None:
+                for name, table in source_data.get('tables', {}).items():
+                    table_parts.setdefault(name, []).append((str(source_path), table))
+                combined_data = self._merge_data(combined_data, source_data)
+        
+        self._merge_tables(table_parts, combined_data)
+        if self.validate:
+            self._validate(combined_data, results + remote_results, missing_sources, projection)
+        combined_data['metadata']['source_timings'] = source_timings
+        combined_data['metadata']['compaction'] = self._compaction_summary(results + remote_results)
+        
+        # Only file sources can be recognized as already folded on later
+        # runs, so SQL and API sources are left out of the running aggregates
+        if state is not None:
+            self._fold_campaign(state, results, combined_data)
+        
+        # Bucket every dated table once so widgets read any time grain
+        # without re-scanning rows
+        combined_data['time_indexes'] = build_time_indexes(
+            combined_data['tables'], self.timezone, self.source_timezone, spill
+        )
+        
+        self._spill = None
+        if spill is not None:
+            combined_data['metadata']['memory'] = spill.stats()
+        
+        store = FactStore.from_data(combined_data)
+        store.spill = spill
+        return store
+    
+    def _admit(self, source_data: Optional[Dict[str, Any]]) -> None:
+        """Put a processed source's tables under the memory budget, if any."""
+        if self._spill is None or source_data is None:
+            return
+        for table in source_data.get('tables', {}).values():
+            self._spill.track(table)
+        self._spill.enforce()
+    
+    def _merge_tables(
+        self,
+        table_parts: Dict[str, List[Tuple[str, FactTable]]],
+        combined_data: Dict[str, Any]
+    ) -> None:
+        """
+        Combine same-named tables from all sources instead of letting the
+        last source overwrite the others.
+        
+        Tables are concatenated with a provenance column and deduplicated on
+        the natural key; metrics and dimensions of tables built from several
+        sources are recomputed from the merged rows.
+        
+        Args:
+            table_parts: Mapping of table name to (source, table) in source order
+            combined_data: Combined data dictionary to update
+        """
+        merge_summary = {}
+        for name, parts in table_parts.items():
+            allocate = self._spill.allocate if self._spill is not None else None
+            merged, key_columns, dropped = merge_tables(parts, self.merge_keys, allocate)
+            combined_data['tables'][name] = merged
+            if self._spill is not None:
+                self._spill.track(merged)
+                self._spill.enforce()
+            
+            if len(parts) < 2:
+                continue
+            
+            self._resummarize(name, merged, combined_data)
+            
+            merge_summary[name] = {
+                'sources': [source for source, _ in parts],
+                'keys': key_columns,
+                'rows': merged.num_rows,
+                'duplicates_dropped': dropped
+            }
+            logger.debug(f"Merged {len(parts)} sources into {name}, dropped {dropped} duplicate rows")
+        
+        combined_data['metadata']['merge'] = merge_summary
+    
+    def _resummarize(self, name: str, table: FactTable, combined_data: Dict[str, Any]) -> None:
+        """Recompute a table's metrics and dimensions after its rows changed."""
+        columns = [col for col in table.column_names if col != PROVENANCE_COLUMN]
+        for col in columns:
+            combined_data['dimensions'].pop(f'{name}_{col}', None)
+        metrics, dimensions = self._summarize_dataframe(table.to_frame(columns), name, table.date_columns)
+        if metrics:
+            combined_data['metrics'][name] = metrics
+        combined_data['dimensions'].update(dimensions)
+    
+    def _validate(
+        self,
+        combined_data: Dict[str, Any],
+        results: List[Tuple[Any, Optional[Dict[str, Any]], Optional[float]]],
+        missing_sources: List[str],
+        projection: Optional[ColumnProjection] = None
+    ) -> None:
+        """
+        Check the merged tables and record the issues in the metadata.
+        
+        With quarantining enabled, failing rows are replaced by clean tables
+        whose summaries are recomputed, and kept aside in
+        ``combined_data['quarantine']``.
+        
+        Args:
+            combined_data: Combined data dictionary to update
+            results: Processed sources, to report the ones that failed
+            missing_sources: Source files that were not found
+            projection: Columns read from the sources; duplicates aren't
+                checked when dimensions may have been left unread
+        """
+        start = time.perf_counter()
+        summary, cleaned, quarantined = validate_tables(
+            combined_data['tables'], self.quarantine, check_duplicates=projection is None
+        )
+        summary['failed_sources'] = [str(source) for source, source_data, _ in results if source_data is None]
+        summary['missing_sources'] = missing_sources
+        
+        for name, table in cleaned.items():
+            combined_data['tables'][name] = table
+            self._resummarize(name, table, combined_data)
+            if self._spill is not None:
+                self._spill.track(table)
+        combined_data['quarantine'] = quarantined
+        
+        summary['elapsed'] = time.perf_counter() - start
+        combined_data['metadata']['validation'] = summary
+    
+    def _compaction_summary(
+        self,
+        results: List[Tuple[Path, Optional[Dict[str, Any]], Optional[float]]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Summarize bytes saved by dtype compaction per source.
+        
+        Args:
+            results: Processed sources
+            
+        Returns:
+            Mapping of source path to byte totals and per-table breakdown
+        """
+        summary = {}
+        for source_path, source_data, _ in results:
+            tables = (source_data or {}).get('compaction', {})
+            if not tables:
+                continue
+            totals = {
+                key: sum(stats[key] for stats in tables.values())
+                for key in ['bytes_before', 'bytes_after', 'bytes_saved']
+            }
+            summary[str(source_path)] = {**totals, 'tables': tables}
+            logger.debug(f"Compaction saved {totals['bytes_saved']} bytes for {source_path}")
+        return summary
+    
+    def _fold_campaign(
+        self,
+        state: CampaignState,
+        results: List[Tuple[Path, Optional[Dict[str, Any]], Optional[float]]],
+        combined_data: Dict[str, Any]
+    ) -> None:
+        """
+        Fold newly processed sources into a campaign's aggregates and add
+        the campaign-to-date rollups to the combined data.
+        
+        Each source contributes its rows of the validated tables, so
+        quarantined rows never reach the aggregates. Sources that failed or
+        produced no tables aren't marked folded and are retried next run.
+        
+        Args:
+            state: Campaign state to update
+            results: Processed sources from this run
+            combined_data: Combined data dictionary (after validation) to extend
+        """
+        # Fold sources one at a time in source order, exactly as separate
+        # runs would, so a later cumulative export replaces the keys an
+        # earlier one in the same batch restated instead of adding to them
+        folded_rows = 0
+        for source_path, source_data, _ in results:
+            names = [name for name in (source_data or {}).get('tables', {}) if name in combined_data['tables']]
+            if not names:
                 continue
+            tables = [source_rows(combined_data['tables'][name], str(source_path)) for name in names]
+            folded_rows += state.fold(tables, self.restate_days)
+            state.mark_folded(source_path)
+        state.save(self.state_dir)
+        
+        combined_data['tables'].update(state.to_tables())
+        combined_data['metrics'][f'{state.campaign_id}_totals'] = state.totals()
+        combined_data['metadata']['incremental'] = {
+            'campaign_id': state.campaign_id,
+            'folded_rows': folded_rows,
+            'watermark': state.watermark.isoformat() if state.watermark is not None else None,
+            'sources_folded': len(state.folded_sources)
+        }
+    
+    def _load_sources(
+        self,
+        source_paths: List[Path],
+        projection: Optional[ColumnProjection] = None
+    ) -> List[Tuple[Path, Optional[Dict[str, Any]], Optional[float]]]:
+        """
+        Load sources from the cache where possible and parse the rest.
+        
+        Args:
+            source_paths: Existing source file paths
+            projection: Columns to read (None reads all)
+            
+        Returns:
+            List of (path, processed data or None, elapsed seconds) in input order
+        """
+        results = [None] * len(source_paths)
+        pending = []
+        
+        for index, source_path in enumerate(source_paths):
+            if self.cache is not None:
+                start = time.perf_counter()
+                source_data = self.cache.get(source_path, self._cache_variant(projection))
+                if source_data is not None:
+                    self._admit(source_data)
+                    results[index] = (source_path, source_data, time.perf_counter() - start)
+                    continue
+            pending.append(index)
+        
+        pending_paths = [source_paths[index] for index in pending]
+        if self.max_workers and self.max_workers > 1 and len(pending_paths) > 1:
+            parsed = self._process_parallel(pending_paths, projection)
+        else:
+            parsed = self._process_serial(pending_paths, projection)
+        
+        for index, result in zip(pending, parsed):
+            results[index] = result
+            source_path, source_data, _ = result
+            # PDF pages come back from the workers; only this process writes the cache
+            pages = source_data.pop(PAGES_KEY, None) if source_data is not None else None
+            if self.cache is not None and pages:
+                store_pages(self.cache, source_path, pages['range'], pages['indices'], pages['texts'])
+            if self.cache is not None and self._is_cacheable(source_data):
+                self.cache.put(source_path, source_data, self._cache_variant(projection))
+        
+        return results
+    
+    def _cache_variant(self, projection: Optional[ColumnProjection] = None) -> str:
+        """Describe the options that change processed output, for cache keys."""
+        parts = []
+        if not self.compact:
+            parts.append("compact=False")
+        if self.streaming:
+            parts.append(f"streaming:retain_rows={self.retain_rows}")
+        if self.parquet_filters:
+            parts.append(f"parquet_filters={self.parquet_filters!r}")
+        if self.pdf_pages is not None:
+            parts.append(f"pdf_pages={self.pdf_pages!r}")
+        if projection is not None:
+            parts.append(projection.cache_key())
+        return ";".join(parts)
+    
+    def _is_cacheable(self, source_data: Optional[Dict[str, Any]]) -> bool:
+        """Only cache sources that produced data; failures are retried next run."""
+        if source_data is None:
+            return False
+        return any(source_data.get(key) for key in ['metrics', 'tables', 'time_series', 'dimensions'])
+    
+    def _process_serial(
+        self,
+        source_paths: List[Path],
+        projection: Optional[ColumnProjection] = None
+    ) -> List[Tuple[Path, Optional[Dict[str, Any]], Optional[float]]]:
+        """
+        Process sources one after another in the current process.
+        
+        Args:
+            source_paths: Existing source file paths
+            projection: Columns to read (None reads all)
             
+        Returns:
+            List of (path, processed data or None, elapsed seconds) in input order
+        """
+        results = []
+        for source_path in source_paths:
             try:
-                source_data = self._process_single_source(source_path)
-                combined_data = self._merge_data(combined_data, source_data)
-                logger.debug(f"Processed source: {source}")
+                source_data, elapsed = _timed_process_source(self, source_path, projection)
+                logger.debug(f"Processed source: {source_path} in {elapsed:.3f}s")
+                self._admit(source_data)
+                results.append((source_path, source_data, elapsed))
             except Exception as e:
-                logger.error(f"Error processing {source}: {e}")
+                logger.error(f"Error processing {source_path}: {e}")
+                results.append((source_path, None, None))
+        return results
+    
+    def _process_parallel(
+        self,
+        source_paths: List[Path],
+        projection: Optional[ColumnProjection] = None
+    ) -> List[Tuple[Path, Optional[Dict[str, Any]], Optional[float]]]:
+        """
+        Process sources in a pool of worker processes.
+        
+        Args:
+            source_paths: Existing source file paths
+            projection: Columns to read (None reads all)
+            
+        Returns:
+            List of (path, processed data or None, elapsed seconds) in input order
+        """
+        logger.info(f"Processing {len(source_paths)} sources with {self.max_workers} workers")
+        
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, len(source_paths)))
+        futures = [
+            executor.submit(_timed_process_source, self, source_path, projection)
+            for source_path in source_paths
+        ]
+        
+        results = []
+        timed_out = False
+        try:
+            for source_path, future in zip(source_paths, futures):
+                try:
+                    source_data, elapsed = future.result(timeout=self.source_timeout)
+                    logger.debug(f"Processed source: {source_path} in {elapsed:.3f}s")
+                    self._admit(source_data)
+                    results.append((source_path, source_data, elapsed))
+                except FutureTimeoutError:
+                    logger.error(f"Timed out processing {source_path} after {self.source_timeout}s")
+                    future.cancel()
+                    timed_out = True
+                    results.append((source_path, None, None))
+                except Exception as e:
+                    logger.error(f"Error processing {source_path}: {e}")
+                    results.append((source_path, None, None))
+        finally:
+            # Don't block on workers still stuck in a timed-out source
+            executor.shutdown(wait=not timed_out)
         
-        return combined_data
+        return results
     
-    def _process_single_source(self, source_path: Path) -> Dict[str, Any]:
+    def _process_sql(
+        self,
+        source: SqlSource,
+        projection: Optional[ColumnProjection] = None
+    ) -> Tuple[SqlSource, Optional[Dict[str, Any]], Optional[float]]:
+        """
+        Read a SQL source's per-day and per-creative aggregates.
+        
+        The aggregation runs in the database; SQL sources are read in this
+        process through the shared connection pool and are not cached.
+        
+        Args:
+            source: SQL source
+            projection: Columns to read (None reads all measures)
+            
+        Returns:
+            Tuple of (source, processed data or None, elapsed seconds)
+        """
+        measures = source.measures
+        if projection is not None:
+            measures = [measure for measure in measures if projection(measure)]
+        
+        start = time.perf_counter()
+        try:
+            frames = source.read_aggregates(measures)
+        except Exception as e:
+            logger.error(f"Error reading SQL source {source}: {e}")
+            return source, None, None
+        
+        processed_data = self._empty_data_structure()
+        for name, df in frames.items():
+            processed_data = self._merge_data(processed_data, self._process_dataframe(df, name))
+        processed_data['metadata'] = {
+            'source_type': 'sql',
+            'driver': source.driver,
+            'table': source.table,
+            'campaign_id': source.campaign_id,
+            'date_range': {'start': source.start_date, 'end': source.end_date}
+        }
+        
+        elapsed = time.perf_counter() - start
+        logger.debug(f"Processed SQL source: {source} in {elapsed:.3f}s")
+        return source, processed_data, elapsed
+    
+    def _process_api(
+        self,
+        sources: List[ApiSource],
+        projection: Optional[ColumnProjection] = None
+    ) -> List[Tuple[ApiSource, Optional[Dict[str, Any]], Optional[float]]]:
+        """
+        Fetch API sources concurrently and summarize their record batches.
+        
+        Args:
+            sources: API sources
+            projection: Columns to read (None reads all)
+            
+        Returns:
+            List of (source, processed data or None, elapsed seconds) in
+            input order, once per distinct source
+        """
+        if not sources:
+            return []
+        # One object listed twice must not feed its accumulator twice
+        sources = list(dict.fromkeys(sources))
+        
+        accumulators = {
+            source: BatchAccumulator(source.name, self.retain_rows, self.compact, self._spill)
+            for source in sources
+        }
+        outcomes = self.api_connector.collect(
+            sources,
+            lambda source, batch: accumulators[source].add(batch),
+            batch_size=self.batch_size,
+            usecols=projection
+        )
+        
+        results = []
+        for source in sources:
+            outcome = outcomes[source]
+            if outcome['error'] is not None:
+                results.append((source, None, None))
+                continue
+            source_data = accumulators[source].result()
+            source_data['metadata'].update({
+                'source_type': 'api',
+                'url': source.first_url,
+                'pages': outcome['pages']
+            })
+            logger.debug(f"Fetched API source: {source} ({outcome['pages']} pages) in {outcome['elapsed']:.3f}s")
+            results.append((source, source_data, outcome['elapsed']))
+        return results
+    
+    def _process_single_source(
+        self,
+        source_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
         """
         Process a single data source file.
         
         Args:
             source_path: Path to the source file
+            projection: Columns to read (None reads all)
             
         Returns:
             Dictionary with processed data
@@ -76,25 +690,33 @@ class DataProcessor:
         if not processor:
             raise ValueError(f"Unsupported file format: {suffix}")
         
-        return processor(source_path)
+        return processor(source_path, projection)
     
-    def _process_excel(self, file_path: Path) -> Dict[str, Any]:
+    def _process_excel(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
         """Process Excel files (.xlsx, .xls)."""
         logger.debug(f"Processing Excel file: {file_path}")
         
+        # openpyxl's row iterator only reads the xlsx format
+        if self.streaming and file_path.suffix.lower() == '.xlsx':
+            return self._process_excel_streaming(file_path, projection)
+        
         try:
             # Read all sheets
-            excel_data = pd.read_excel(file_path, sheet_name=None)
-            
-            processed_data = {
-                'metrics': {},
-                'time_series': {},
-                'dimensions': {},
-                'metadata': {
-                    'source_file': str(file_path),
-                    'source_type': 'excel',
-                    'sheets': list(excel_data.keys())
-                }
+            excel_data = pd.read_excel(file_path, sheet_name=None, usecols=projection)
+            
+            # Sheets without any projected column carry nothing the widgets use
+            if projection is not None:
+                excel_data = {name: df for name, df in excel_data.items() if len(df.columns) > 0}
+            
+            processed_data = self._empty_data_structure()
+            processed_data['metadata'] = {
+                'source_file': str(file_path),
+                'source_type': 'excel',
+                'sheets': list(excel_data.keys())
             }
             
             # Process each sheet
@@ -108,51 +730,208 @@ class DataProcessor:
             logger.error(f"Error processing Excel file {file_path}: {e}")
             return self._empty_data_structure()
     
-    def _process_csv(self, file_path: Path) -> Dict[str, Any]:
+    def _process_excel_streaming(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
+        """Process an xlsx workbook in fixed-size row batches."""
+        logger.debug(f"Streaming Excel file: {file_path} (batch size {self.batch_size})")
+        
+        try:
+            accumulators = {}
+            for sheet_name, batch in iter_excel_batches(file_path, self.batch_size, usecols=projection):
+                if sheet_name not in accumulators:
+                    accumulators[sheet_name] = BatchAccumulator(sheet_name, self.retain_rows, self.compact, self._spill)
+                accumulators[sheet_name].add(batch)
+            
+            processed_data = self._empty_data_structure()
+            processed_data['metadata'] = {
+                'source_file': str(file_path),
+                'source_type': 'excel',
+                'sheets': list(accumulators.keys())
+            }
+            
+            for accumulator in accumulators.values():
+                processed_data = self._merge_data(processed_data, accumulator.result())
+            
+            return processed_data
+            
+        except Exception as e:
+            logger.error(f"Error streaming Excel file {file_path}: {e}")
+            return self._empty_data_structure()
+    
+    def _process_csv(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
         """Process CSV files."""
         logger.debug(f"Processing CSV file: {file_path}")
         
         try:
-            df = pd.read_csv(file_path)
+            if is_ga4_export(file_path):
+                return self._process_ga4_csv(file_path, projection)
+            
+            if self.streaming:
+                return self._process_csv_streaming(file_path, projection)
+            
+            df = pd.read_csv(file_path, usecols=projection)
             return self._process_dataframe(df, file_path.stem)
         except Exception as e:
             logger.error(f"Error processing CSV file {file_path}: {e}")
             return self._empty_data_structure()
     
-    def process_pdf(self, file_path: str) -> Dict[str, Any]:
+    def _process_ga4_csv(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
+        """Process a GA4 export with a comment banner and grand-total row."""
+        logger.debug(f"Processing GA4 export: {file_path}")
+        
+        try:
+            df, banner, grand_total = read_ga4_export(file_path)
+            if projection is not None:
+                df = df[[col for col in df.columns if projection(col)]]
+                grand_total = {col: value for col, value in grand_total.items() if projection(col)}
+            
+            processed_data = self._process_dataframe(df, file_path.stem)
+            if grand_total:
+                processed_data['metrics'][f'{file_path.stem}_grand_total'] = {
+                    col: {'total': value} for col, value in grand_total.items()
+                }
+            processed_data['metadata'].update({
+                'source_file': str(file_path),
+                'source_type': 'ga4',
+                **banner,
+                'grand_total': grand_total
+            })
+            return processed_data
+        except Exception as e:
+            logger.error(f"Error processing GA4 export {file_path}: {e}")
+            return self._empty_data_structure()
+    
+    def _process_csv_streaming(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
+        """Process a CSV file in fixed-size chunks with one-pass statistics."""
+        logger.debug(f"Streaming CSV file: {file_path} (batch size {self.batch_size})")
+        
+        try:
+            accumulator = BatchAccumulator(file_path.stem, self.retain_rows, self.compact, self._spill)
+            for batch in iter_csv_batches(file_path, self.batch_size, usecols=projection):
+                accumulator.add(batch)
+            return accumulator.result()
+        except Exception as e:
+            logger.error(f"Error streaming CSV file {file_path}: {e}")
+            return self._empty_data_structure()
+    
+    def _process_arrow(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
+        """Process Arrow IPC/Feather (memory-mapped) and Parquet files."""
+        logger.debug(f"Processing Arrow/Parquet file: {file_path}")
+        
+        try:
+            if file_path.suffix.lower() in PARQUET_SUFFIXES:
+                arrow_table = read_parquet(file_path, usecols=projection, filters=self.parquet_filters)
+                source_type = 'parquet'
+            else:
+                arrow_table = read_arrow_ipc(file_path, usecols=projection)
+                source_type = 'arrow'
+            
+            # Columns already carry warehouse types, so skip compaction and
+            # summarize straight from the (possibly memory-mapped) buffers
+            table = arrow_to_fact_table(arrow_table, file_path.stem)
+            processed_data = self._empty_data_structure()
+            processed_data['tables'][table.name] = table
+            metrics, dimensions = self._summarize_dataframe(table.to_frame(), table.name, table.date_columns)
+            if metrics:
+                processed_data['metrics'][table.name] = metrics
+            processed_data['dimensions'].update(dimensions)
+            processed_data['metadata'] = {
+                'source_file': str(file_path),
+                'source_type': source_type,
+                'source_name': table.name,
+                'rows': table.num_rows,
+                'columns': table.column_names
+            }
+            return processed_data
+            
+        except ImportError:
+            logger.error("pyarrow not installed. Install with: pip install pyarrow")
+            return self._empty_data_structure()
+        except Exception as e:
+            logger.error(f"Error processing Arrow/Parquet file {file_path}: {e}")
+            return self._empty_data_structure()
+    
+    def process_pdf(self, file_path: str, page_range: Any = None) -> Dict[str, Any]:
         """
         Public method to process PDF file and extract text content.
         
         Args:
             file_path: Path to PDF file
+            page_range: One-based, inclusive pages to read (None reads all)
             
         Returns:
             Dictionary with extracted text and metadata
         """
-        return self._process_pdf_content(file_path)
+        return self._process_pdf_content(file_path, page_range)
     
-    def _process_pdf(self, file_path: Path) -> Dict[str, Any]:
-        """Process PDF files (placeholder implementation)."""
+    def _process_pdf(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
+        """Extract headline KPIs and breakdown rows from insight-report PDFs."""
         logger.debug(f"Processing PDF file: {file_path}")
         
-        # Placeholder - in practice, this would extract data from PDF
-        return {
-            'metrics': {},
-            'time_series': {},
-            'dimensions': {},
-            'metadata': {
+        try:
+            page_indices, texts = extract_pages(file_path, self.pdf_pages, self.pdf_workers, self.cache)
+            text = '\n'.join(texts[index] for index in page_indices)
+            
+            name = file_path.stem
+            kpis = extract_kpis(text)
+            rows = extract_rows(text)
+            
+            processed_data = self._empty_data_structure()
+            if rows:
+                df = pd.DataFrame(rows)
+                if projection is not None:
+                    df = df[[col for col in df.columns if col == LABEL_COLUMN or projection(col)]]
+                processed_data = self._process_dataframe(df, name)
+            if kpis:
+                processed_data['metrics'][f'{name}_kpis'] = {
+                    label: {'value': value} for label, value in kpis.items()
+                }
+            
+            processed_data['metadata'].update({
                 'source_file': str(file_path),
                 'source_type': 'pdf',
-                'note': 'PDF processing not yet implemented'
-            }
-        }
+                'pages': [index + 1 for index in page_indices]
+            })
+            processed_data[PAGES_KEY] = {'range': self.pdf_pages, 'indices': page_indices, 'texts': texts}
+            return processed_data
+            
+        except ImportError:
+            logger.error("PyPDF2 not installed. Install with: pip install PyPDF2")
+            return self._empty_data_structure()
+        except Exception as e:
+            logger.error(f"Error processing PDF {file_path}: {e}")
+            return self._empty_data_structure()
     
-    def _process_pdf_content(self, file_path: str) -> Dict[str, Any]:
+    def _process_pdf_content(self, file_path: str, page_range: Any = None) -> Dict[str, Any]:
         """
         Process PDF file and extract text content.
         
         Args:
             file_path: Path to PDF file
+            page_range: One-based, inclusive pages to read (None reads all)
             
         Returns:
             Dictionary with extracted text and metadata
@@ -160,23 +939,22 @@ class DataProcessor:
         try:
             import PyPDF2
             
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                pages = []
-                for page_num, page in enumerate(pdf_reader.pages):
-                    text = page.extract_text()
-                    pages.append({
-                        'page_number': page_num + 1,
-                        'text': text
-                    })
-                
-                return {
-                    'type': 'pdf',
-                    'pages': pages,
-                    'total_pages': len(pdf_reader.pages),
-                    'metadata': pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else {}
-                }
+            pdf_reader = PyPDF2.PdfReader(str(file_path))
+            page_indices, texts = extract_pages(file_path, page_range, self.pdf_workers, self.cache)
+            if self.cache is not None:
+                store_pages(self.cache, file_path, page_range, page_indices, texts)
+            
+            pages = [
+                {'page_number': index + 1, 'text': texts[index]}
+                for index in page_indices
+            ]
+            
+            return {
+                'type': 'pdf',
+                'pages': pages,
+                'total_pages': len(pdf_reader.pages),
+                'metadata': pdf_reader.metadata if hasattr(pdf_reader, 'metadata') else {}
+            }
                 
         except ImportError:
             logger.error("PyPDF2 not installed. Install with: pip install PyPDF2")
@@ -185,25 +963,50 @@ class DataProcessor:
             logger.error(f"Error processing PDF {file_path}: {e}")
             return {'type': 'pdf', 'error': str(e)}
     
-    def _process_json(self, file_path: Path) -> Dict[str, Any]:
-        """Process JSON files."""
-        logger.debug(f"Processing JSON file: {file_path}")
+    def _process_json(
+        self,
+        file_path: Path,
+        projection: Optional[ColumnProjection] = None
+    ) -> Dict[str, Any]:
+        """Process JSON and newline-delimited JSON files as a stream."""
+        logger.debug(f"Processing JSON file: {file_path} (batch size {self.batch_size})")
         
         try:
-            import json
-            with open(file_path, 'r') as f:
-                json_data = json.load(f)
+            processed_data = self._empty_data_structure()
+            metadata = {}
+            rows = None
             
-            return {
-                'metrics': json_data.get('metrics', {}),
-                'time_series': json_data.get('time_series', {}),
-                'dimensions': json_data.get('dimensions', {}),
-                'metadata': {
-                    'source_file': str(file_path),
-                    'source_type': 'json',
-                    **json_data.get('metadata', {})
-                }
-            }
+            for kind, key, value in iter_json_source(file_path, self.batch_size, usecols=projection):
+                if kind == 'rows':
+                    if rows is None:
+                        rows = BatchAccumulator(file_path.stem, self.retain_rows, self.compact, self._spill)
+                    rows.add(value)
+                elif kind == 'time_series':
+                    # NDJSON fragments may continue an entry started on an earlier line
+                    existing = processed_data['time_series'].get(key)
+                    if isinstance(existing, FactTable) and isinstance(value, FactTable):
+                        value = FactTable.concat([existing, value], key)
+                    processed_data['time_series'][key] = value
+                elif key == 'metadata' and isinstance(value, dict):
+                    metadata.update(value)
+                elif key in SUMMARY_SECTIONS and isinstance(value, dict):
+                    processed_data[key].update(value)
+                else:
+                    logger.debug(f"Ignoring section {key} of {file_path}")
+            
+            if rows is not None:
+                processed_data = self._merge_data(processed_data, rows.result())
+            # Columnar time series are tables like any other, so validation,
+            # time indexes and the cube see them; the view keeps their key
+            for key, value in processed_data['time_series'].items():
+                if isinstance(value, FactTable):
+                    processed_data['tables'][key] = value
+            processed_data['metadata'].update({
+                'source_file': str(file_path),
+                'source_type': 'json',
+                **metadata
+            })
+            return processed_data
         except Exception as e:
             logger.error(f"Error processing JSON file {file_path}: {e}")
             return self._empty_data_structure()
@@ -219,44 +1022,67 @@ class DataProcessor:
         Returns:
             Dictionary with normalized data
         """
-        processed_data = {
-            'metrics': {},
-            'time_series': {},
-            'dimensions': {},
-            'metadata': {
-                'source_name': source_name,
-                'rows': len(df),
-                'columns': list(df.columns)
-            }
+        processed_data = self._empty_data_structure()
+        processed_data['metadata'] = {
+            'source_name': source_name,
+            'rows': len(df),
+            'columns': list(df.columns)
         }
         
         # Detect time series data (columns with date-like names or datetime types)
-        date_columns = []
-        for col in df.columns:
-            if df[col].dtype == 'datetime64[ns]' or 'date' in col.lower():
-                date_columns.append(col)
-        
-        if date_columns:
-            # Process as time series data
-            for date_col in date_columns:
-                processed_data['time_series'][f'{source_name}_{date_col}'] = {
-                    'dates': df[date_col].tolist(),
-                    'data': df.drop(columns=date_columns).to_dict('records')
-                }
+        date_columns = [col for col in df.columns if is_date_column(col, df[col])]
+        
+        # Store rows column-wise; the legacy per-date-column record lists
+        # are produced on demand by FactStore's time_series view
+        table_df = df
+        if self.compact:
+            table_df, processed_data['compaction'][source_name] = compact_frame(df)
+        processed_data['tables'][source_name] = FactTable.from_dataframe(
+            table_df, source_name, date_columns=date_columns
+        )
+        
+        metrics, dimensions = self._summarize_dataframe(df, source_name, date_columns)
+        if metrics:
+            processed_data['metrics'][source_name] = metrics
+        processed_data['dimensions'].update(dimensions)
+        
+        return processed_data
+    
+    def _summarize_dataframe(
+        self,
+        df: pd.DataFrame,
+        source_name: str,
+        date_columns: List[Any]
+    ) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Compute metric summaries and dimension counts for a DataFrame.
+        
+        Args:
+            df: DataFrame to summarize
+            source_name: Name/identifier for the data source
+            date_columns: Date columns, excluded from dimensions
+            
+        Returns:
+            Tuple of (metrics or None, dimensions keyed by '<source>_<column>')
+        """
+        metrics = None
+        dimensions = {}
         
         # Extract numeric metrics
         numeric_columns = df.select_dtypes(include=['number']).columns
         if len(numeric_columns) > 0:
-            processed_data['metrics'][source_name] = df[numeric_columns].describe().to_dict()
+            metrics = df[numeric_columns].describe().to_dict()
         
         # Extract categorical dimensions
         categorical_columns = df.select_dtypes(include=['object', 'category']).columns
         if len(categorical_columns) > 0:
             for col in categorical_columns:
                 if col not in date_columns:
-                    processed_data['dimensions'][f'{source_name}_{col}'] = df[col].value_counts().to_dict()
+                    counts = df[col].value_counts()
+                    # Categoricals also report categories with no rows
+                    dimensions[f'{source_name}_{col}'] = counts[counts > 0].to_dict()
         
-        return processed_data
+        return metrics, dimensions
     
     def _merge_data(self, target: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -269,7 +1095,7 @@ class DataProcessor:
         Returns:
             Merged data dictionary
         """
-        for key in ['metrics', 'time_series', 'dimensions', 'metadata']:
+        for key in ['metrics', 'tables', 'time_series', 'dimensions', 'compaction', 'metadata']:
             if key in source:
                 target[key].update(source[key])
         
@@ -279,7 +1105,9 @@ class DataProcessor:
         """Return empty data structure."""
         return {
             'metrics': {},
+            'tables': {},
             'time_series': {},
             'dimensions': {},
+            'compaction': {},
             'metadata': {}
         }
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""
+Column projection for pushing widget column needs down into readers.
+"""
+
+from typing import Any, Iterable, List
+
+
+class ColumnProjection:
+    """
+    Set of columns to read from each source.
+
+    Instances are callables usable directly as a pandas ``usecols``
+    argument. Names are matched case-insensitively, ignoring surrounding
+    whitespace, since export headers are not consistent about either.
+    """
+
+    def __init__(self, columns: Iterable[Any]):
+        """
+        Initialize the projection.
+
+        Args:
+            columns: Column names to keep
+        """
+        self._normalized = sorted({self._normalize(col) for col in columns})
+        self._lookup = set(self._normalized)
+
+    @staticmethod
+    def _normalize(column: Any) -> str:
+        return str(column).strip().lower()
+
+    @property
+    def columns(self) -> List[str]:
+        """Normalized column names in sorted order."""
+        return list(self._normalized)
+
+    def __call__(self, column: Any) -> bool:
+        """
+        Check whether a column should be read.
+
+        Args:
+            column: Column name from the source header
+
+        Returns:
+            True if the column is part of the projection
+        """
+        return self._normalize(column) in self._lookup
+
+    def cache_key(self) -> str:
+        """Stable description of the projection for cache keys."""
+        return "columns=" + ",".join(self._normalized)
+
+    def __repr__(self) -> str:
+        return f"ColumnProjection({self._normalized})"
@@ -0,0 +1,321 @@
+"""
+Memory budget for ingestion, with spill-to-disk.
+
+A SpillArea tracks the fact tables built while processing a batch of
+sources. Whenever the bytes they keep resident exceed the budget, the
+largest in-memory columns are written to memory-mapped files in a
+temporary directory and replaced by read-only maps of those files, so the
+operating system pages them back in lazily when a widget reads them.
+Large intermediate results (concatenated batches, deduplicated merges,
+cube rollups, time index row orders) are allocated straight in the spill area once the budget is
+exhausted instead of being built in memory first.
+
+The spill directory is removed when the SpillArea is garbage collected or
+``cleanup()`` is called.
+"""
+
+from typing import Any, Dict, List, Optional, Union
+from pathlib import Path
+import itertools
+import logging
+import mmap
+import shutil
+import tempfile
+import weakref
+import numpy as np
+import pandas as pd
+
+from .store import FactTable, column_nbytes
+
+logger = logging.getLogger(__name__)
+
+
+def _detached() -> None:
+    """Unpickle a SpillArea in another process as no spill area at all."""
+    return None
+
+
+def is_spilled(values: Any) -> bool:
+    """
+    Check whether a column is backed by a memory-mapped file.
+
+    Args:
+        values: NumPy array or pandas Categorical
+
+    Returns:
+        True if the column's data (a Categorical's codes) lives in a map
+    """
+    array = values.codes if isinstance(values, pd.Categorical) else values
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        if isinstance(array, np.memmap) and getattr(array, '_mmap', None) is not None:
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def _backing_array(values: Any) -> np.ndarray:
+    """
+    Return the array that holds a column's data.
+
+    ``Categorical.codes`` hands out a fresh read-only view on every access,
+    so its id can be recycled by an unrelated column as soon as the view is
+    dropped; the view's base, the Categorical's own codes, is stable for
+    its lifetime. Callers key columns by the returned array's id and keep
+    it referenced while they do.
+    """
+    if isinstance(values, pd.Categorical):
+        codes = values.codes
+        return codes.base if isinstance(codes.base, np.ndarray) else codes
+    return values
+
+
+def resident_nbytes(values: Any) -> int:
+    """Return the bytes of a column held in process memory."""
+    if not is_spilled(values):
+        return column_nbytes(values)
+    if isinstance(values, pd.Categorical):
+        return int(values.categories.memory_usage(deep=True))
+    return 0
+
+
+class SpillArea:
+    """
+    Keeps tracked fact tables under a memory budget by spilling columns.
+    """
+
+    def __init__(self, budget: int, directory: Optional[Union[str, Path]] = None):
+        """
+        Initialize the spill area.
+
+        Args:
+            budget: Bytes tracked tables may keep in memory
+            directory: Parent directory for spill files (defaults to the
+                system temporary directory)
+        """
+        self.budget = budget
+        if directory is not None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix='arloai-spill-', dir=directory))
+        self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.directory), True)
+        self._tables: List[weakref.ReferenceType] = []
+        self._frames: List[weakref.ReferenceType] = []
+        self._arrays: List[weakref.ReferenceType] = []
+        self._counter = itertools.count()
+
+        self.spilled_bytes = 0
+        self.spilled_columns = 0
+
+    def __reduce__(self):
+        # Spill files belong to this process; pickled columns carry their
+        # data, so copies elsewhere (e.g. widget render workers) need none
+        return (_detached, ())
+
+    def _new_map(self, dtype: np.dtype, length: int) -> np.ndarray:
+        path = self.directory / f"{next(self._counter)}.bin"
+        if length == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='w+', shape=(length,))
+
+    def _track_frame(self, frame: pd.DataFrame) -> None:
+        try:
+            self._frames.append(weakref.ref(frame))
+        except TypeError:
+            pass
+
+    def track(self, table: FactTable) -> None:
+        """
+        Put a table's columns under the budget.
+
+        Args:
+            table: Fact table to track (held weakly)
+        """
+        self._tables.append(weakref.ref(table))
+
+    def _live_tables(self) -> List[FactTable]:
+        self._tables = [ref for ref in self._tables if ref() is not None]
+        return [ref() for ref in self._tables]
+
+    def _live_frames(self) -> List[pd.DataFrame]:
+        self._frames = [ref for ref in self._frames if ref() is not None]
+        return [ref() for ref in self._frames]
+
+    def _live_arrays(self) -> List[np.ndarray]:
+        self._arrays = [ref for ref in self._arrays if ref() is not None]
+        return [ref() for ref in self._arrays]
+
+    def resident_bytes(self) -> int:
+        """Bytes tracked tables and admitted frames and arrays keep in memory."""
+        total = 0
+        # Hold every array counted so its id can't be reused meanwhile
+        seen: Dict[int, Any] = {}
+        for table in self._live_tables():
+            for values in table.columns.values():
+                array = _backing_array(values)
+                if id(array) not in seen:
+                    seen[id(array)] = array
+                    total += resident_nbytes(values)
+        for frame in self._live_frames():
+            total += int(sum(
+                frame[col].memory_usage(index=False, deep=False)
+                for col in frame.columns
+                if not is_spilled(frame[col].to_numpy(copy=False))
+            ))
+        for array in self._live_arrays():
+            if id(array) not in seen:
+                seen[id(array)] = array
+                total += resident_nbytes(array)
+        return total
+
+    def spill_array(self, values: Any) -> Any:
+        """
+        Write a column to a memory-mapped file.
+
+        Args:
+            values: NumPy array or pandas Categorical (object arrays are
+                returned unchanged, they can't be mapped)
+
+        Returns:
+            Read-only column backed by the spill file
+        """
+        if is_spilled(values):
+            return values
+        if isinstance(values, pd.Categorical):
+            return pd.Categorical.from_codes(self.spill_array(values.codes), dtype=values.dtype)
+        if values.dtype == object:
+            return values
+
+        mapped = self._new_map(values.dtype, len(values))
+        mapped[:] = values
+        if isinstance(mapped, np.memmap):
+            mapped.flush()
+            mapped = np.memmap(mapped.filename, dtype=values.dtype, mode='r', shape=(len(values),))
+        self.spilled_bytes += int(values.nbytes)
+        self.spilled_columns += 1
+        return mapped
+
+    def enforce(self) -> int:
+        """
+        Spill the largest resident columns until tracked tables fit the budget.
+
+        Returns:
+            Number of bytes spilled
+        """
+        resident = self.resident_bytes()
+        if resident <= self.budget:
+            return 0
+
+        # The same array can back columns of several tables (a source's
+        # table and the merged table built from it); spill it once and
+        # repoint every holder. Candidates keep a strong reference to each
+        # keyed array, so no id is reused while the holders are collected
+        holders: Dict[int, List[Any]] = {}
+        candidates: Dict[int, Any] = {}
+        for table in self._live_tables():
+            for col, values in table.columns.items():
+                if is_spilled(values):
+                    continue
+                if not isinstance(values, pd.Categorical) and values.dtype == object:
+                    continue
+                array = _backing_array(values)
+                holders.setdefault(id(array), []).append((table, col))
+                candidates[id(array)] = (array.nbytes, values, array)
+
+        spilled = 0
+        ordered = sorted(candidates.items(), key=lambda item: item[1][0], reverse=True)
+        for key, (size, values, _) in ordered:
+            if resident - spilled <= self.budget:
+                break
+            mapped = self.spill_array(values)
+            for table, col in holders[key]:
+                table.columns[col] = mapped
+            spilled += size
+
+        logger.debug(
+            f"Spilled {spilled} bytes to {self.directory} "
+            f"({resident - spilled} of {self.budget} budget bytes resident)"
+        )
+        return spilled
+
+    def allocate(self, dtype: Any, length: int) -> np.ndarray:
+        """
+        Allocate an output column, in the spill area if it doesn't fit.
+
+        Args:
+            dtype: NumPy dtype
+            length: Number of elements
+
+        Returns:
+            Writable array (a memory map once the budget is exhausted)
+        """
+        dtype = np.dtype(dtype)
+        if self.resident_bytes() + dtype.itemsize * length <= self.budget:
+            return np.empty(length, dtype=dtype)
+        self.spilled_bytes += dtype.itemsize * length
+        self.spilled_columns += 1
+        return self._new_map(dtype, length)
+
+    def admit_frame(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Keep a derived DataFrame (e.g. a rollup) under the budget.
+
+        Args:
+            frame: DataFrame to admit
+
+        Returns:
+            The frame itself if it fits, otherwise a copy whose numeric
+            columns are memory-mapped
+        """
+        size = int(frame.memory_usage(index=False, deep=False).sum())
+        if self.resident_bytes() + size <= self.budget:
+            self._track_frame(frame)
+            return frame
+
+        columns = {}
+        for col in frame.columns:
+            values = frame[col].to_numpy(copy=False)
+            if isinstance(frame[col].dtype, pd.CategoricalDtype):
+                values = frame[col].array
+            columns[col] = self.spill_array(values) if isinstance(values, (np.ndarray, pd.Categorical)) else values
+        spilled = pd.DataFrame(columns, index=frame.index, copy=False)
+        self._track_frame(spilled)
+        return spilled
+
+    def admit_array(self, values: np.ndarray) -> np.ndarray:
+        """
+        Keep a derived array (e.g. a time index's row order) under the budget.
+
+        Args:
+            values: NumPy array to admit
+
+        Returns:
+            The array itself if it fits, otherwise a read-only memory map
+            of it
+        """
+        if self.resident_bytes() + int(values.nbytes) > self.budget:
+            values = self.spill_array(values)
+        self._arrays.append(weakref.ref(values))
+        return values
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get spill statistics.
+
+        Returns:
+            Dictionary with the budget, resident and spilled bytes, and
+            the number of spilled columns
+        """
+        return {
+            'budget': self.budget,
+            'resident_bytes': self.resident_bytes(),
+            'spilled_bytes': self.spilled_bytes,
+            'spilled_columns': self.spilled_columns
+        }
+
+    def cleanup(self) -> None:
+        """Remove the spill files; spilled columns must not be read afterwards."""
+        self._finalizer()
+
+    def __repr__(self) -> str:
+        return f"SpillArea(budget={self.budget}, directory='{self.directory}')"
@@ -0,0 +1,380 @@
+"""
+SQL data sources with aggregate pushdown and pooled connections.
+
+A SqlSource names a campaign and date range in a table of daily delivery
+rows. Instead of pulling raw rows into pandas, the per-day and
+per-creative rollups widgets need are computed by the database with
+``GROUP BY`` queries, so only the aggregates cross the connection.
+
+Drivers are plain DB-API 2.0 modules registered under a name, together
+with their paramstyle and identifier quoting (ANSI double quotes by
+default, backticks for MySQL-style drivers); SQLite is registered out of
+the box. Connections are pooled per (driver, dsn) for the life of the
+process, so a batch of reports reuses them instead of reconnecting for
+every report.
+"""
+
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from contextlib import contextmanager
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TABLE = 'campaign_stats'
+DEFAULT_MEASURES = ('Impressions', 'Clicks', 'Spend')
+DEFAULT_POOL_SIZE = 4
+
+ROWS_COLUMN = 'rows'
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_ ]*$')
+
+
+def ansi_quote(identifier: str) -> str:
+    """Quote an identifier with ANSI double quotes (SQLite, PostgreSQL)."""
+    return f'"{identifier}"'
+
+
+def backtick_quote(identifier: str) -> str:
+    """Quote an identifier with backticks (MySQL, MariaDB)."""
+    return f'`{identifier}`'
+
+
+class SqlDriver:
+    """
+    A DB-API 2.0 driver registration.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        connect: Callable[[str], Any],
+        paramstyle: str = 'qmark',
+        quote: Callable[[str], str] = ansi_quote
+    ):
+        """
+        Initialize the driver.
+
+        Args:
+            name: Driver name used by SqlSource
+            connect: Callable opening a connection from a DSN
+            paramstyle: DB-API paramstyle of the driver ('qmark', 'format',
+                'pyformat', 'numeric' or 'named')
+            quote: Callable quoting a validated identifier
+        """
+        self.name = name
+        self.connect = connect
+        self.paramstyle = paramstyle
+        self.quote_identifier = quote
+
+    def quote(self, identifier: str) -> str:
+        """Validate and quote a table or column name, part by part if schema-qualified."""
+        parts = identifier.split('.')
+        if not all(_IDENTIFIER.match(part) for part in parts):
+            raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+        return '.'.join(self.quote_identifier(part) for part in parts)
+
+    def placeholders(self, count: int) -> List[str]:
+        """Get bind placeholders for positional parameters."""
+        if self.paramstyle == 'qmark':
+            return ['?'] * count
+        if self.paramstyle in ('format', 'pyformat'):
+            return ['%s'] * count
+        if self.paramstyle == 'numeric':
+            return [f':{index + 1}' for index in range(count)]
+        if self.paramstyle == 'named':
+            return [f':p{index}' for index in range(count)]
+        raise ValueError(f"Unsupported paramstyle: {self.paramstyle}")
+
+    def bind(self, params: Sequence[Any]) -> Any:
+        """Shape positional parameters for ``cursor.execute``."""
+        if self.paramstyle == 'named':
+            return {f'p{index}': value for index, value in enumerate(params)}
+        return tuple(params)
+
+
+def _connect_sqlite(dsn: str) -> sqlite3.Connection:
+    # Pooled connections are handed between threads, never used concurrently
+    return sqlite3.connect(dsn, check_same_thread=False)
+
+
+_drivers: Dict[str, SqlDriver] = {
+    'sqlite': SqlDriver('sqlite', _connect_sqlite, sqlite3.paramstyle)
+}
+
+
+def register_driver(
+    name: str,
+    connect: Callable[[str], Any],
+    paramstyle: str = 'qmark',
+    quote: Callable[[str], str] = ansi_quote
+) -> None:
+    """
+    Register a DB-API driver.
+
+    Args:
+        name: Driver name used by SqlSource
+        connect: Callable opening a connection from a DSN, e.g.
+            ``lambda dsn: psycopg2.connect(dsn)``
+        paramstyle: DB-API paramstyle of the driver
+        quote: Identifier quoting of the database, e.g. ``backtick_quote``
+            for MySQL
+    """
+    _drivers[name] = SqlDriver(name, connect, paramstyle, quote)
+
+
+def get_driver(name: str) -> SqlDriver:
+    """
+    Get a registered driver.
+
+    Args:
+        name: Driver name
+
+    Returns:
+        SqlDriver
+    """
+    if name not in _drivers:
+        raise ValueError(f"Unknown SQL driver: {name}")
+    return _drivers[name]
+
+
+class ConnectionPool:
+    """
+    Bounded pool of reusable DB-API connections.
+    """
+
+    def __init__(self, driver: SqlDriver, dsn: str, max_size: int = DEFAULT_POOL_SIZE):
+        """
+        Initialize the pool.
+
+        Args:
+            driver: Driver opening connections
+            dsn: Connection string passed to the driver
+            max_size: Maximum number of open connections
+        """
+        self.driver = driver
+        self.dsn = dsn
+        self.max_size = max_size
+        self.connects = 0
+
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """
+        Borrow a connection, opening one only if none is idle.
+
+        Returned connections are rolled back so no open transaction leaks
+        to the next borrower; connections that raise, or can't be rolled
+        back, are closed instead of returned to the pool.
+
+        Yields:
+            DB-API connection
+        """
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self.driver.connect(self.dsn)
+                with self._lock:
+                    self.connects += 1
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            try:
+                conn.rollback()
+            except Exception as e:
+                logger.warning(f"Closing pooled connection that failed to roll back: {e}")
+                conn.close()
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools: Dict[Tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(driver: str, dsn: str, max_size: int = DEFAULT_POOL_SIZE) -> ConnectionPool:
+    """
+    Get the process-wide pool for a database, creating it on first use.
+
+    Args:
+        driver: Driver name
+        dsn: Connection string
+        max_size: Maximum open connections (used when creating the pool)
+
+    Returns:
+        ConnectionPool
+    """
+    key = (driver, dsn)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(get_driver(driver), dsn, max_size)
+        return _pools[key]
+
+
+def close_pools() -> None:
+    """Close and forget all pools."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+class SqlSource:
+    """
+    A campaign's delivery rows in a SQL table.
+
+    The table holds one row per day and creative (more granular rows are
+    fine); the measures are summed per day and per creative in SQL.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        campaign_id: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        table: str = DEFAULT_TABLE,
+        driver: str = 'sqlite',
+        measures: Sequence[str] = DEFAULT_MEASURES,
+        date_column: str = 'Date',
+        creative_column: str = 'Creative',
+        campaign_column: str = 'campaign_id',
+        pool_size: int = DEFAULT_POOL_SIZE
+    ):
+        """
+        Initialize the source.
+
+        Args:
+            dsn: Connection string (the database path for SQLite)
+            campaign_id: Campaign to read
+            start_date: First day to include (ISO date, inclusive)
+            end_date: Last day to include (ISO date, inclusive)
+            table: Table holding the delivery rows, optionally
+                schema-qualified (e.g. ``analytics.daily_delivery``)
+            driver: Registered driver name
+            measures: Additive measure columns to sum
+            date_column: Column holding the day
+            creative_column: Column holding the creative
+            campaign_column: Column holding the campaign id
+            pool_size: Maximum pooled connections for this database
+        """
+        self.dsn = dsn
+        self.campaign_id = campaign_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.table = table
+        self.driver = driver
+        self.measures = list(measures)
+        self.date_column = date_column
+        self.creative_column = creative_column
+        self.campaign_column = campaign_column
+        self.pool_size = pool_size
+
+    @property
+    def name(self) -> str:
+        """
+        Prefix of the tables produced from this source.
+
+        Distinct from the ``<campaign>_daily`` tables of incremental
+        ingestion, so a report reading both keeps them apart.
+        """
+        return f'{self.campaign_id}_sql'
+
+    def aggregate_query(self, group_by: str, measures: Sequence[str]) -> Tuple[str, List[Any]]:
+        """
+        Build a query summing measures per value of one column.
+
+        Args:
+            group_by: Column to group by
+            measures: Measure columns to sum
+
+        Returns:
+            Tuple of (SQL text, positional parameters)
+        """
+        conditions = [self.campaign_column]
+        params: List[Any] = [self.campaign_id]
+        operators = ['=']
+        if self.start_date is not None:
+            conditions.append(self.date_column)
+            operators.append('>=')
+            params.append(self.start_date)
+        if self.end_date is not None:
+            conditions.append(self.date_column)
+            operators.append('<=')
+            params.append(self.end_date)
+
+        driver = get_driver(self.driver)
+        quote = driver.quote
+        placeholders = driver.placeholders(len(params))
+        where = ' AND '.join(
+            f'{quote(column)} {operator} {placeholder}'
+            for column, operator, placeholder in zip(conditions, operators, placeholders)
+        )
+        select = ', '.join(
+            [f'{quote(group_by)} AS {quote(group_by)}']
+            + [f'SUM({quote(measure)}) AS {quote(measure)}' for measure in measures]
+            + [f'COUNT(*) AS {quote(ROWS_COLUMN)}']
+        )
+        sql = (
+            f'SELECT {select} FROM {quote(self.table)} WHERE {where} '
+            f'GROUP BY {quote(group_by)} ORDER BY {quote(group_by)}'
+        )
+        return sql, params
+
+    def read_aggregates(self, measures: Optional[Sequence[str]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Run the per-day and per-creative aggregate queries.
+
+        Args:
+            measures: Measures to sum (defaults to the source's measures)
+
+        Returns:
+            Frames keyed ``<campaign>_sql_daily`` and ``<campaign>_sql_by_creative``
+        """
+        measures = self.measures if measures is None else list(measures)
+        driver = get_driver(self.driver)
+        pool = get_pool(self.driver, self.dsn, self.pool_size)
+
+        frames = {}
+        with pool.connection() as conn:
+            for suffix, group_by in [('daily', self.date_column), ('by_creative', self.creative_column)]:
+                sql, params = self.aggregate_query(group_by, measures)
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(sql, driver.bind(params))
+                    columns = [description[0] for description in cursor.description]
+                    frames[f'{self.name}_{suffix}'] = pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+                finally:
+                    cursor.close()
+
+        daily = frames[f'{self.name}_daily']
+        daily[self.date_column] = pd.to_datetime(daily[self.date_column], errors='coerce')
+        return frames
+
+    def __str__(self) -> str:
+        date_range = f"{self.start_date or ''}..{self.end_date or ''}"
+        return f"{self.driver}:{self.table}?campaign={self.campaign_id}&dates={date_range}"
+
+    def __repr__(self) -> str:
+        return f"SqlSource({self})"
@@ -0,0 +1,647 @@
+"""
+Columnar fact store for processed campaign data.
+
+Sources are held as typed NumPy columns (integer counters, float measures,
+datetime64 dates and categorical dimensions) instead of lists of Python
+dicts. Widgets and templates read column slices straight from the store;
+the legacy ``time_series`` payload is still available as a lazy view.
+"""
+
+from typing import Callable, Dict, List, Optional, Any, Iterator, Iterable, Tuple
+from collections.abc import Mapping
+import logging
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+logger = logging.getLogger(__name__)
+
+# Column added to merged tables recording which source each row came from
+PROVENANCE_COLUMN = '_source'
+
+
+def is_date_column(name: Any, values: Any) -> bool:
+    """
+    Check whether a column holds dates.
+
+    Args:
+        name: Column name
+        values: Column values (Series, array or Categorical)
+
+    Returns:
+        True if the column has a datetime dtype or a date-like name
+    """
+    return pd.api.types.is_datetime64_any_dtype(values) or 'date' in str(name).lower()
+
+
+# Name fragments of numeric columns that hold ratios or averages and
+# therefore can't be summed across rows
+NON_ADDITIVE_MARKERS = ('ctr', 'rate', 'cpm', 'cpc', 'cpa', 'avg', 'average', 'per ', '%', 'ratio')
+
+
+def is_additive_measure(name: Any, values: Any) -> bool:
+    """
+    Check whether a column is a measure that can be summed across rows.
+
+    Args:
+        name: Column name
+        values: Column values
+
+    Returns:
+        True for numeric, non-ratio columns
+    """
+    if isinstance(values, pd.Categorical) or not pd.api.types.is_numeric_dtype(values):
+        return False
+    if pd.api.types.is_bool_dtype(values):
+        return False
+    lowered = str(name).lower()
+    return not lowered.startswith('unnamed') and not any(marker in lowered for marker in NON_ADDITIVE_MARKERS)
+
+
+def to_column(series: pd.Series) -> Any:
+    """
+    Convert a pandas Series into a typed column.
+
+    Args:
+        series: Series to convert
+
+    Returns:
+        NumPy array for numeric, boolean and datetime data, or a
+        pandas Categorical for string/object data
+    """
+    dtype = series.dtype
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        return series.array
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+        return series.to_numpy()
+    if pd.api.types.is_integer_dtype(dtype):
+        if series.hasnans:
+            return series.to_numpy(dtype='float64', na_value=np.nan)
+        # Keep compacted widths; nullable extension types become int64
+        return series.to_numpy(dtype=dtype if isinstance(dtype, np.dtype) else 'int64')
+    if pd.api.types.is_float_dtype(dtype):
+        return series.to_numpy(dtype=dtype if isinstance(dtype, np.dtype) else 'float64', na_value=np.nan)
+
+    return pd.Categorical(series)
+
+
+def missing_column(like: Any, length: int) -> Any:
+    """
+    Build an all-missing column matching the type of another column.
+
+    Args:
+        like: Column whose type to mimic
+        length: Number of rows
+
+    Returns:
+        Column of NaN/NaT/missing categories
+    """
+    if isinstance(like, pd.Categorical):
+        return pd.Categorical.from_codes(np.full(length, -1, dtype=np.int8), dtype=like.dtype)
+    if like.dtype.kind == 'M':
+        return np.full(length, np.datetime64('NaT'), dtype=like.dtype)
+    return np.full(length, np.nan)
+
+
+def concat_columns(pieces: List[Any], allocate: Optional[Callable[[Any, int], np.ndarray]] = None) -> Any:
+    """
+    Concatenate column pieces into one column.
+
+    Categorical pieces are unioned without decoding to Python objects;
+    incompatible pieces fall back to an object-backed Categorical.
+
+    Args:
+        pieces: Arrays and/or Categoricals
+        allocate: Called with (dtype, length) to get the output array of
+            numeric columns (e.g. a spill area's allocator)
+
+    Returns:
+        Concatenated column
+    """
+    if len(pieces) == 1:
+        return pieces[0]
+
+    if any(isinstance(piece, pd.Categorical) or piece.dtype == object for piece in pieces):
+        categoricals = [
+            piece if isinstance(piece, pd.Categorical) else pd.Categorical(piece)
+            for piece in pieces
+        ]
+        try:
+            return union_categoricals(categoricals)
+        except TypeError:
+            return pd.Categorical(np.concatenate([np.asarray(piece, dtype=object) for piece in categoricals]))
+
+    try:
+        if allocate is None:
+            return np.concatenate(pieces)
+        out = allocate(np.result_type(*pieces), sum(len(piece) for piece in pieces))
+        return np.concatenate(pieces, out=out)
+    except (TypeError, ValueError):
+        return pd.Categorical(np.concatenate([np.asarray(piece, dtype=object) for piece in pieces]))
+
+
+def column_nbytes(column: Any) -> int:
+    """Return the memory footprint of a column in bytes."""
+    if isinstance(column, pd.Categorical):
+        return int(column.codes.nbytes + column.categories.memory_usage(deep=True))
+    return int(column.nbytes)
+
+
+class FactTable:
+    """
+    Columnar table of campaign facts.
+
+    Columns are stored in insertion order as NumPy arrays or pandas
+    Categoricals. Accessors return the stored objects without copying.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Dict[Any, Any],
+        date_columns: Optional[List[Any]] = None
+    ):
+        """
+        Initialize the table.
+
+        Args:
+            name: Table name (sheet or file stem)
+            columns: Mapping of column name to array/Categorical
+            date_columns: Names of columns holding dates
+        """
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Columns of table {name} have different lengths: {sorted(lengths)}")
+
+        self.name = name
+        self.columns = dict(columns)
+        self.date_columns = list(date_columns) if date_columns is not None else [
+            col for col, values in self.columns.items() if is_date_column(col, values)
+        ]
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        df: pd.DataFrame,
+        name: str,
+        date_columns: Optional[List[Any]] = None
+    ) -> "FactTable":
+        """
+        Build a table from a DataFrame.
+
+        Args:
+            df: Source DataFrame
+            name: Table name
+            date_columns: Names of date columns (detected when omitted)
+
+        Returns:
+            FactTable with typed columns
+        """
+        columns = {col: to_column(df[col]) for col in df.columns}
+        return cls(name, columns, date_columns)
+
+    @classmethod
+    def concat(
+        cls,
+        tables: List["FactTable"],
+        name: Optional[str] = None,
+        allocate: Optional[Callable[[Any, int], np.ndarray]] = None
+    ) -> "FactTable":
+        """
+        Stack tables row-wise.
+
+        Columns missing from some tables are filled with missing values.
+
+        Args:
+            tables: Tables to concatenate, in order
+            name: Name of the result (defaults to the first table's name)
+            allocate: Allocator for numeric output columns (see
+                ``concat_columns``)
+
+        Returns:
+            Concatenated FactTable
+        """
+        if not tables:
+            raise ValueError("No tables to concatenate")
+
+        column_names = []
+        date_columns = []
+        for table in tables:
+            column_names.extend(col for col in table.columns if col not in column_names)
+            date_columns.extend(col for col in table.date_columns if col not in date_columns)
+
+        columns = {}
+        for col in column_names:
+            like = next(table.columns[col] for table in tables if col in table.columns)
+            pieces = [
+                table.columns[col] if col in table.columns else missing_column(like, table.num_rows)
+                for table in tables
+            ]
+            columns[col] = concat_columns(pieces, allocate)
+
+        return cls(name or tables[0].name, columns, date_columns)
+
+    @property
+    def num_rows(self) -> int:
+        """Number of rows in the table."""
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def column_names(self) -> List[Any]:
+        """Column names in table order."""
+        return list(self.columns.keys())
+
+    @property
+    def nbytes(self) -> int:
+        """Total memory held by the table's columns."""
+        return sum(column_nbytes(values) for values in self.columns.values())
+
+    def column(self, name: Any) -> Any:
+        """
+        Get a column without copying it.
+
+        Args:
+            name: Column name
+
+        Returns:
+            NumPy array or pandas Categorical
+        """
+        return self.columns[name]
+
+    def to_frame(self, columns: Optional[Iterable[Any]] = None) -> pd.DataFrame:
+        """
+        Wrap the table (or a subset of columns) in a DataFrame.
+
+        Args:
+            columns: Columns to include (all when omitted)
+
+        Returns:
+            DataFrame sharing memory with the table where pandas allows
+        """
+        names = self.column_names if columns is None else list(columns)
+        return pd.DataFrame({name: self.columns[name] for name in names}, copy=False)
+
+    def records(self, exclude: Iterable[Any] = ()) -> List[Dict[Any, Any]]:
+        """
+        Materialize rows as a list of dicts.
+
+        Args:
+            exclude: Columns to leave out
+
+        Returns:
+            List of row dictionaries
+        """
+        excluded = set(exclude)
+        return self.to_frame([col for col in self.columns if col not in excluded]).to_dict('records')
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self.columns
+
+    def __repr__(self) -> str:
+        return f"FactTable(name='{self.name}', rows={self.num_rows}, columns={len(self.columns)})"
+
+
+def key_codes(columns: List[Any]) -> np.ndarray:
+    """
+    Encode the rows of several key columns as one int64 code per row.
+
+    Each column is factorized (missing values get their own code) and the
+    codes are combined column by column, re-factorizing after every step so
+    the combined codes never overflow.
+
+    Args:
+        columns: Key columns of equal length
+
+    Returns:
+        Array of row key codes; equal rows share a code
+    """
+    combined = None
+    for values in columns:
+        if isinstance(values, pd.Categorical):
+            # Categorical codes already are a factorization; shift -1 (missing) to 0
+            codes = values.codes.astype(np.int64) + 1
+            cardinality = len(values.categories) + 1
+        else:
+            codes, uniques = pd.factorize(values, use_na_sentinel=False)
+            codes = codes.astype(np.int64)
+            cardinality = max(len(uniques), 1)
+        if combined is None:
+            combined = codes
+        else:
+            combined, _ = pd.factorize(combined * cardinality + codes)
+            combined = combined.astype(np.int64)
+    return combined
+
+
+def latest_source_mask(codes: np.ndarray, source_index: np.ndarray) -> np.ndarray:
+    """
+    Keep, for every key, only the rows from the last source that has it.
+
+    Rows sharing a key within one source are all kept; a key seen again in
+    a later source replaces every earlier row with that key.
+
+    Args:
+        codes: Row key codes (dense, starting at 0)
+        source_index: Position of each row's source in source order
+
+    Returns:
+        Boolean mask of rows to keep, preserving row order
+    """
+    latest = np.full(int(codes.max()) + 1, -1, dtype=np.int64)
+    np.maximum.at(latest, codes, source_index)
+    return source_index == latest[codes]
+
+
+def select_rows(values: Any, keep: np.ndarray, allocate: Optional[Callable[[Any, int], np.ndarray]] = None) -> Any:
+    """
+    Filter a column by a boolean mask.
+
+    Args:
+        values: NumPy array or pandas Categorical
+        keep: Boolean mask of rows to keep
+        allocate: Allocator for the output array (see ``concat_columns``)
+
+    Returns:
+        Filtered column
+    """
+    if isinstance(values, pd.Categorical):
+        return pd.Categorical.from_codes(select_rows(values.codes, keep, allocate), dtype=values.dtype)
+    if allocate is None or values.dtype == object:
+        return values[keep]
+    out = allocate(values.dtype, int(keep.sum()))
+    return np.compress(keep, values, out=out)
+
+
+def merge_tables(
+    parts: List[Any],
+    keys: Iterable[Any] = (),
+    allocate: Optional[Callable[[Any, int], np.ndarray]] = None
+) -> Tuple["FactTable", List[Any], int]:
+    """
+    Concatenate the same table from several sources and drop duplicate rows.
+
+    Rows are deduplicated on the natural key columns present in the table
+    (matched case-insensitively); tables with none of the key columns are
+    deduplicated on all their columns. When a key appears in several
+    sources the later source's rows replace the earlier ones, and each row
+    records its source in the provenance column.
+
+    Args:
+        parts: List of (source name, FactTable) in source order
+        keys: Natural key column names, e.g. ('Date', 'Creative', 'Placement')
+        allocate: Allocator for numeric output columns (see ``concat_columns``)
+
+    Returns:
+        Tuple of (merged FactTable, key columns used, number of rows dropped)
+    """
+    tables = []
+    for source, table in parts:
+        columns = dict(table.columns)
+        columns[PROVENANCE_COLUMN] = pd.Categorical.from_codes(
+            np.zeros(table.num_rows, dtype=np.int8), categories=[str(source)]
+        )
+        tables.append(FactTable(table.name, columns, table.date_columns))
+
+    merged = FactTable.concat(tables, allocate=allocate)
+
+    wanted = {str(key).strip().lower() for key in keys}
+    key_columns = [col for col in merged.column_names if str(col).strip().lower() in wanted]
+    if not key_columns:
+        key_columns = [col for col in merged.column_names if col != PROVENANCE_COLUMN]
+
+    if len(parts) < 2 or not key_columns or merged.num_rows == 0:
+        return merged, key_columns, 0
+
+    source_index = np.repeat(np.arange(len(parts), dtype=np.int64), [table.num_rows for table in tables])
+    keep = latest_source_mask(key_codes([merged.column(col) for col in key_columns]), source_index)
+    dropped = int(merged.num_rows - keep.sum())
+    if dropped:
+        merged = FactTable(
+            merged.name,
+            {col: select_rows(values, keep, allocate) for col, values in merged.columns.items()},
+            merged.date_columns
+        )
+    return merged, key_columns, dropped
+
+
+def source_rows(table: "FactTable", source: str) -> "FactTable":
+    """
+    Get the rows of a merged table that came from one source.
+
+    Args:
+        table: Table built by ``merge_tables``
+        source: Source name recorded in the provenance column
+
+    Returns:
+        FactTable of the source's rows (the table itself if it has no
+        provenance column)
+    """
+    if PROVENANCE_COLUMN not in table.columns:
+        return table
+    keep = np.asarray(table.column(PROVENANCE_COLUMN) == source, dtype=bool)
+    return FactTable(
+        table.name,
+        {col: select_rows(values, keep) for col, values in table.columns.items()},
+        table.date_columns
+    )
+
+
+class TimeSeriesView(Mapping):
+    """
+    Read-only view exposing fact tables in the legacy ``time_series`` shape.
+
+    Each date column of each table appears as
+    ``{'<table>_<date_col>': {'dates': [...], 'data': [records]}}``.
+    Entries are materialized on access and not retained.
+    """
+
+    def __init__(self, tables: Dict[str, FactTable], extra: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the view.
+
+        Args:
+            tables: Fact tables keyed by name
+            extra: Time series entries not derived from ``tables`` (e.g.
+                from JSON sources), either in the legacy shape or as fact
+                tables whose first date column holds the dates. A fact
+                table also registered in ``tables`` under the same key is
+                listed once, under that key
+        """
+        self._tables = tables
+        self._extra = extra if extra is not None else {}
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        """Time series entries not derived from the tables."""
+        return self._extra
+
+    def _entries(self) -> Dict[str, Any]:
+        entries = {}
+        for name, table in self._tables.items():
+            if isinstance(self._extra.get(name), FactTable):
+                # Listed under its own key below
+                continue
+            for date_col in table.date_columns:
+                entries[f'{table.name}_{date_col}'] = (table, date_col)
+        return entries
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._extra:
+            entry = self._extra[key]
+            if not isinstance(entry, FactTable):
+                return entry
+            # Merging and validation may have replaced the registered table
+            entry = self._tables.get(key, entry)
+            dates = pd.Series(entry.column(entry.date_columns[0]), copy=False).tolist() if entry.date_columns else []
+            return {'dates': dates, 'data': entry.records(exclude=entry.date_columns + [PROVENANCE_COLUMN])}
+
+        table, date_col = self._entries()[key]
+        return {
+            'dates': pd.Series(table.column(date_col), copy=False).tolist(),
+            'data': table.records(exclude=table.date_columns + [PROVENANCE_COLUMN])
+        }
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._extra
+        for key in self._entries():
+            if key not in self._extra:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"TimeSeriesView(keys={list(self)})"
+
+
+class FactStore(dict):
+    """
+    Processed report data backed by columnar fact tables.
+
+    Behaves like the normalized data dictionary (``metrics``,
+    ``time_series``, ``dimensions``, ``metadata``) so existing widgets and
+    templates keep working, while ``tables`` gives direct column access.
+    ``cube`` holds the report's shared RollupCube once the engine has built
+    it, and ``time_indexes`` the per-table TimeIndex built at ingestion.
+    ``spill`` is the SpillArea backing spilled columns when ingestion ran
+    under a memory budget; the store keeps it (and its files) alive.
+    ``quarantine`` holds rows that failed validation, keyed by table name,
+    and ``derived`` the report's DerivedMetrics catalog once the engine has
+    built it. While widgets render, ``datasets`` gives access to the
+    shared intermediate datasets they declared.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[Dict[str, FactTable]] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        dimensions: Optional[Dict[str, Any]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        time_series: Optional[Dict[str, Any]] = None,
+        time_indexes: Optional[Dict[str, Any]] = None,
+        quarantine: Optional[Dict[str, FactTable]] = None
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            tables: Fact tables keyed by name
+            metrics: Summary metrics keyed by source
+            dimensions: Dimension value counts
+            metadata: Source metadata
+            time_series: Pre-built time series entries not backed by a table
+            time_indexes: TimeIndex objects keyed by table name
+            quarantine: Rows that failed validation, keyed by table name
+        """
+        self.tables = tables if tables is not None else {}
+        self.time_indexes = time_indexes if time_indexes is not None else {}
+        self.quarantine = quarantine if quarantine is not None else {}
+        self.cube = None
+        self.spill = None
+        self.derived = None
+        self.datasets = None
+        super().__init__(
+            metrics=metrics if metrics is not None else {},
+            time_series=TimeSeriesView(self.tables, time_series),
+            dimensions=dimensions if dimensions is not None else {},
+            metadata=metadata if metadata is not None else {}
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The render graph is bound to this process's report run
+        state = self.__dict__.copy()
+        state['datasets'] = None
+        return state
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "FactStore":
+        """
+        Build a store from a processed data dictionary.
+
+        Args:
+            data: Dictionary with ``tables``, ``metrics``, ``dimensions``,
+                ``metadata``, raw ``time_series`` entries, ``time_indexes``
+                and ``quarantine``
+
+        Returns:
+            FactStore wrapping the same objects
+        """
+        return cls(
+            tables=data.get('tables', {}),
+            metrics=data.get('metrics', {}),
+            dimensions=data.get('dimensions', {}),
+            metadata=data.get('metadata', {}),
+            time_series=dict(data.get('time_series', {})),
+            time_indexes=data.get('time_indexes', {}),
+            quarantine=data.get('quarantine', {})
+        )
+
+    def table(self, name: str) -> Optional[FactTable]:
+        """
+        Get a fact table by name.
+
+        Args:
+            name: Table name
+
+        Returns:
+            FactTable or None if not found
+        """
+        return self.tables.get(name)
+
+    def time_index(self, table: Optional[str] = None) -> Any:
+        """
+        Get the time index of a table.
+
+        Args:
+            table: Table name; None picks the largest indexed table
+
+        Returns:
+            TimeIndex or None if the table has no dates to index
+        """
+        if table is not None:
+            return self.time_indexes.get(table)
+        if not self.time_indexes:
+            return None
+        return self.time_indexes[max(self.time_indexes, key=lambda name: self.tables[name].num_rows)]
+
+    def column(self, table: str, column: Any) -> Any:
+        """
+        Get a column slice without copying.
+
+        Args:
+            table: Table name
+            column: Column name
+
+        Returns:
+            NumPy array or pandas Categorical
+        """
+        return self.tables[table].column(column)
+
+    @property
+    def nbytes(self) -> int:
+        """Total memory held by all fact tables."""
+        return sum(table.nbytes for table in self.tables.values())
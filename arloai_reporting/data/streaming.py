@@ -0,0 +1,376 @@
+"""
+Streaming ingestion for sources too large to load in one piece.
+
+Readers yield fixed-size DataFrame batches; a BatchAccumulator folds each
+batch into running metric summaries, dimension counters and (optionally)
+compact columnar fact tables, so peak memory is bounded by the batch size
+rather than the size of the source.
+"""
+
+from typing import Dict, List, Optional, Any, Iterator, Tuple, Union, Callable
+from collections import Counter
+from pathlib import Path
+import logging
+import math
+import numpy as np
+import pandas as pd
+
+from .compaction import compact_frame
+from .store import FactTable, is_date_column
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# Values kept per column to estimate quartiles
+QUANTILE_SAMPLE_SIZE = 10_000
+
+
+class RunningStats:
+    """
+    One-pass count/mean/std/min/max accumulator with approximate quartiles.
+
+    Batches are combined with the parallel form of Welford's algorithm
+    (Chan et al.), so results match a single pass over all values.
+    Quartiles come from a uniform sample of at most
+    ``QUANTILE_SAMPLE_SIZE`` values (each value draws a random key and the
+    smallest keys are kept), so they are exact up to that many values.
+    """
+
+    def __init__(self):
+        """Initialize an empty accumulator."""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._sample = np.empty(0, dtype='float64')
+        self._keys = np.empty(0, dtype='float64')
+
+    def update(self, values: Any) -> None:
+        """
+        Fold a batch of values into the accumulator.
+
+        Args:
+            values: Array-like of numbers; NaNs are ignored
+        """
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        count = values.size
+        if count == 0:
+            return
+
+        # Keys are seeded by position so repeated runs report the same quartiles
+        keys = np.random.default_rng([self.count, count]).random(count)
+        self._keep(values, keys)
+
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        self._combine(count, mean, m2, float(values.min()), float(values.max()))
+
+    def merge(self, other: "RunningStats") -> None:
+        """
+        Merge another accumulator into this one.
+
+        Args:
+            other: Accumulator built over a disjoint set of values
+        """
+        if other.count:
+            self._keep(other._sample, other._keys)
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+
+    def _keep(self, values: np.ndarray, keys: np.ndarray) -> None:
+        """Add values to the quartile sample, keeping the smallest keys."""
+        values = np.concatenate([self._sample, values])
+        keys = np.concatenate([self._keys, keys])
+        if keys.size > QUANTILE_SAMPLE_SIZE:
+            kept = np.argpartition(keys, QUANTILE_SAMPLE_SIZE)[:QUANTILE_SAMPLE_SIZE]
+            values, keys = values[kept], keys[kept]
+        self._sample, self._keys = values, keys
+
+    def _combine(self, count: int, mean: float, m2: float, minimum: float, maximum: float) -> None:
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Get the summary in ``DataFrame.describe()`` key order.
+
+        Returns:
+            Dictionary with count, mean, std, min, 25%, 50%, 75% and max;
+            quartiles are estimated once more than
+            ``QUANTILE_SAMPLE_SIZE`` values were seen
+        """
+        if self.count == 0:
+            return {
+                'count': 0.0, 'mean': math.nan, 'std': math.nan, 'min': math.nan,
+                '25%': math.nan, '50%': math.nan, '75%': math.nan, 'max': math.nan
+            }
+
+        std = math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else math.nan
+        quartiles = np.percentile(self._sample, [25, 50, 75])
+        return {
+            'count': float(self.count),
+            'mean': self.mean,
+            'std': std,
+            'min': self.min,
+            '25%': float(quartiles[0]),
+            '50%': float(quartiles[1]),
+            '75%': float(quartiles[2]),
+            'max': self.max
+        }
+
+
+class BatchAccumulator:
+    """
+    Builds the normalized data structure for one source from DataFrame batches.
+
+    Produces the same ``metrics``/``dimensions``/``tables`` layout as
+    ``DataProcessor._process_dataframe``; quartiles of large sources are
+    estimated (see ``RunningStats``).
+
+    Only parsing is bounded by the batch size while rows are retained: the
+    fact table still grows with the source. Pass ``retain_rows=False`` to
+    keep just the summaries.
+    """
+
+    def __init__(
+        self,
+        source_name: str,
+        retain_rows: bool = True,
+        compact: bool = True,
+        spill: Optional[Any] = None
+    ):
+        """
+        Initialize the accumulator.
+
+        Args:
+            source_name: Name/identifier for the data source
+            retain_rows: Keep row-level data as a compact fact table; disable
+                to hold only summaries and bound memory by batch size
+            compact: Compact the dtypes of retained batches
+            spill: SpillArea keeping retained batches under a memory budget
+        """
+        self.source_name = source_name
+        self.retain_rows = retain_rows
+        self.compact = compact
+        self.spill = spill
+
+        self.rows = 0
+        self.columns: List[Any] = []
+        self.date_columns: List[Any] = []
+        self.stats: Dict[Any, RunningStats] = {}
+        self.counts: Dict[Any, Counter] = {}
+        self._tables: List[FactTable] = []
+        self._compaction = {'bytes_before': 0, 'bytes_after': 0, 'bytes_saved': 0}
+
+    def add(self, df: pd.DataFrame) -> None:
+        """
+        Fold one batch into the running state.
+
+        Args:
+            df: Batch of rows
+        """
+        if not self.columns:
+            self.columns = list(df.columns)
+        for col in df.columns:
+            if col not in self.date_columns and is_date_column(col, df[col]):
+                self.date_columns.append(col)
+
+        self.rows += len(df)
+
+        # A column's role is fixed by the first batch where it has values, so
+        # mixed-type columns aren't split between metrics and dimensions
+        numeric = set(df.select_dtypes(include=['number']).columns)
+        for col in df.columns:
+            if col in self.stats or col in self.counts or col in self.date_columns:
+                continue
+            if col in numeric:
+                self.stats[col] = RunningStats()
+            elif df[col].notna().any():
+                self.counts[col] = Counter()
+
+        for col in df.columns:
+            if col in self.stats:
+                values = df[col] if col in numeric else pd.to_numeric(df[col], errors='coerce')
+                self.stats[col].update(values.to_numpy(dtype='float64', na_value=np.nan))
+            elif col in self.counts:
+                self.counts[col].update(df[col].value_counts().to_dict())
+
+        if self.retain_rows:
+            if self.compact:
+                df, stats = compact_frame(df)
+                for key, value in stats.items():
+                    self._compaction[key] += value
+            table = FactTable.from_dataframe(df, self.source_name, date_columns=[
+                col for col in self.date_columns if col in df.columns
+            ])
+            self._tables.append(table)
+            if self.spill is not None:
+                self.spill.track(table)
+                self.spill.enforce()
+
+    def result(self) -> Dict[str, Any]:
+        """
+        Get the accumulated data.
+
+        Returns:
+            Dictionary with normalized data
+        """
+        data = {
+            'metrics': {},
+            'tables': {},
+            'time_series': {},
+            'dimensions': {},
+            'compaction': {},
+            'metadata': {
+                'source_name': self.source_name,
+                'rows': self.rows,
+                'columns': self.columns,
+                'streamed': True
+            }
+        }
+
+        if self.stats:
+            data['metrics'][self.source_name] = {
+                col: stats.to_dict() for col, stats in self.stats.items()
+            }
+
+        for col, counter in self.counts.items():
+            data['dimensions'][f'{self.source_name}_{col}'] = dict(counter.most_common())
+
+        if self._tables:
+            allocate = self.spill.allocate if self.spill is not None else None
+            table = FactTable.concat(self._tables, self.source_name, allocate)
+            # Release the batches; the concatenated table replaces them
+            self._tables = [table]
+            table.date_columns = [col for col in self.date_columns if col in table.columns]
+            data['tables'][self.source_name] = table
+            if self.compact:
+                data['compaction'][self.source_name] = dict(self._compaction)
+
+        return data
+
+
+def _unique_headers(header: Tuple[Any, ...]) -> List[Any]:
+    """Name blank and duplicate header cells the way pandas does."""
+    names = []
+    seen: Dict[Any, int] = {}
+    for index, value in enumerate(header):
+        name = f"Unnamed: {index}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _trim_row(row: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """Drop trailing empty cells from a worksheet row."""
+    end = len(row)
+    while end and row[end - 1] is None:
+        end -= 1
+    return tuple(row[:end])
+
+
+def _batch_frame(
+    batch: List[Tuple[Any, ...]],
+    header: Tuple[Any, ...],
+    width: int,
+    usecols: Optional[Callable[[Any], bool]] = None
+) -> pd.DataFrame:
+    """Build a batch DataFrame, padding short rows and unnamed header cells."""
+    columns = _unique_headers(header + (None,) * (width - len(header)))
+    if usecols is None:
+        rows = [row + (None,) * (width - len(row)) for row in batch]
+        return pd.DataFrame.from_records(rows, columns=columns)
+
+    keep = [index for index, name in enumerate(columns) if usecols(name)]
+    rows = [tuple(row[index] if index < len(row) else None for index in keep) for row in batch]
+    return pd.DataFrame.from_records(rows, columns=[columns[index] for index in keep])
+
+
+def iter_excel_batches(
+    file_path: Union[str, Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    sheet_names: Optional[List[str]] = None,
+    usecols: Optional[Callable[[Any], bool]] = None
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    Stream an Excel workbook as DataFrame batches using openpyxl's read-only mode.
+
+    The first row of each sheet is used as the header.
+
+    Args:
+        file_path: Path to the workbook
+        batch_size: Maximum rows per batch
+        sheet_names: Sheets to read (all when omitted)
+        usecols: Predicate selecting columns by header name (all when omitted);
+            sheets with no selected column are skipped
+
+    Yields:
+        Tuples of (sheet name, batch DataFrame)
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in workbook.sheetnames:
+            if sheet_names is not None and sheet_name not in sheet_names:
+                continue
+
+            rows = workbook[sheet_name].iter_rows(values_only=True)
+            header = _trim_row(next(rows, None) or ())
+            width = len(header)
+            if usecols is not None and not any(usecols(name) for name in _unique_headers(header)):
+                continue
+
+            # Like pandas, drop trailing empty cells and rows; interior blank
+            # rows are kept, so count them until a non-empty row follows
+            batch = []
+            blank_rows = 0
+            for row in rows:
+                row = _trim_row(row)
+                if not row:
+                    blank_rows += 1
+                    continue
+                batch.extend([()] * blank_rows)
+                blank_rows = 0
+                batch.append(row)
+                width = max(width, len(row))
+                if len(batch) >= batch_size:
+                    yield sheet_name, _batch_frame(batch, header, width, usecols)
+                    batch = []
+
+            if batch:
+                yield sheet_name, _batch_frame(batch, header, width, usecols)
+    finally:
+        workbook.close()
+
+
+def iter_csv_batches(
+    file_path: Union[str, Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    **read_options: Any
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a CSV file as DataFrame batches.
+
+    Args:
+        file_path: Path to the CSV file
+        batch_size: Maximum rows per batch
+        **read_options: Extra keyword arguments for ``pd.read_csv``
+
+    Yields:
+        Batch DataFrames
+    """
+    with pd.read_csv(file_path, chunksize=batch_size, **read_options) as reader:
+        for chunk in reader:
+            yield chunk
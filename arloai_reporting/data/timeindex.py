@@ -0,0 +1,282 @@
+"""
+Multi-grain time index over a fact table.
+
+Built once at ingestion: the table's dates are parsed, converted to the
+reporting timezone and sorted, and additive measures are summed into hour
+buckets in one pass over the rows. Day, ISO-week and month buckets are then
+rolled up from the finer buckets, and day-of-week and hour-of-day profiles
+from the day and hour buckets, so every grain costs O(buckets) to read
+instead of O(rows) per widget.
+
+Bucket labels are local wall-clock times in the index's timezone (tz-naive).
+When naive source times are localized, times in a DST fall-back hour are
+resolved from their order (as pandas' ``ambiguous='infer'``), or taken as
+the first, daylight-saving occurrence when the order doesn't tell; times in
+a spring-forward gap are shifted forward. Either way the rows are kept, and
+the repeated local hour shares one bucket.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from functools import cached_property
+import logging
+import numpy as np
+import pandas as pd
+
+from .store import FactTable, PROVENANCE_COLUMN, is_additive_measure
+
+logger = logging.getLogger(__name__)
+
+GRAINS = ('hour', 'day', 'week', 'month', 'day_of_week', 'hour_of_day')
+BUCKET_COLUMN = 'bucket'
+ROWS_COLUMN = 'rows'
+
+try:
+    # pandas 2.x localizes through pytz, whose ambiguous/nonexistent time
+    # errors aren't ValueErrors
+    from pytz.exceptions import InvalidTimeError as _PytzInvalidTimeError
+    _LOCALIZE_ERRORS: Tuple[type, ...] = (ValueError, _PytzInvalidTimeError)
+except ImportError:
+    _LOCALIZE_ERRORS = (ValueError,)
+
+_HOUR_NS = 3600 * 10**9
+_DAY_NS = 24 * _HOUR_NS
+
+
+def _reduce_sorted(
+    keys: np.ndarray,
+    values: np.ndarray,
+    counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum runs of equal keys in sorted key order."""
+    if not len(keys):
+        return keys, values, counts
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[starts], np.add.reduceat(values, starts, axis=0), np.add.reduceat(counts, starts)
+
+
+def _reduce_cyclic(
+    keys: np.ndarray,
+    size: int,
+    values: np.ndarray,
+    counts: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum values by a small integer key (e.g. weekday)."""
+    sums = np.zeros((size, values.shape[1]))
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(sums, keys, values)
+    np.add.at(totals, keys, counts)
+    return np.arange(size), sums, totals
+
+
+def _bounds(times: np.ndarray, start: Any, end: Any) -> Tuple[int, int]:
+    """Get the slice of sorted times between two inclusive bounds."""
+    lo = 0 if start is None else np.searchsorted(times, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+    hi = len(times) if end is None else np.searchsorted(times, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+    return int(lo), int(hi)
+
+
+class TimeIndex:
+    """
+    Sorted datetime index of a fact table with pre-aggregated grains.
+    """
+
+    def __init__(
+        self,
+        table: FactTable,
+        date_column: Optional[Any] = None,
+        timezone: Optional[str] = None,
+        source_timezone: Optional[str] = None,
+        spill: Optional[Any] = None
+    ):
+        """
+        Build the index and all grains.
+
+        Args:
+            table: Fact table to index
+            date_column: Column holding dates or timestamps (defaults to
+                the table's first date column)
+            timezone: Reporting timezone buckets are cut in (e.g.
+                'America/New_York'); None keeps timestamps as they are
+            source_timezone: Timezone of naive timestamps in the source
+                (defaults to ``timezone``, i.e. already local)
+            spill: SpillArea the row order and times are admitted to, so
+                they spill to disk under a memory budget
+        """
+        if date_column is None:
+            if not table.date_columns:
+                raise ValueError(f"Table {table.name} has no date column to index")
+            date_column = table.date_columns[0]
+
+        self.table_name = table.name
+        self.date_column = date_column
+        self.timezone = timezone
+        self.measures: List[Any] = [
+            col for col in table.column_names
+            if col not in table.date_columns and col != PROVENANCE_COLUMN
+            and is_additive_measure(col, table.column(col))
+        ]
+        self._integer_measures = {
+            col for col in self.measures if np.issubdtype(np.asarray(table.column(col)).dtype, np.integer)
+        }
+
+        local = self._local_times(table.column(date_column), timezone, source_timezone)
+        valid = np.flatnonzero(~np.isnat(local))
+        self.dropped = len(local) - len(valid)
+
+        # Sorted row positions and their local wall-clock times
+        order = valid[np.argsort(local[valid], kind='stable')]
+        times = local[order]
+        del local, valid
+        self.order = spill.admit_array(order) if spill is not None else order
+        self.times = spill.admit_array(times) if spill is not None else times
+
+        values = np.column_stack([
+            np.nan_to_num(np.asarray(table.column(col), dtype='float64')[self.order])
+            for col in self.measures
+        ]) if self.measures else np.zeros((len(self.order), 0))
+
+        self._grains: Dict[str, pd.DataFrame] = {}
+        self._build(values)
+        logger.debug(
+            f"Built time index for {self.table_name}.{date_column}: {len(self.order)} rows, "
+            f"{len(self._grains['day'])} days, {self.dropped} undated rows"
+        )
+
+    @cached_property
+    def intraday(self) -> bool:
+        """Whether any timestamp has a time of day, i.e. hourly grains are meaningful."""
+        return bool((self.times != self.times.astype('datetime64[D]')).any())
+
+    @staticmethod
+    def _local_times(values: Any, timezone: Optional[str], source_timezone: Optional[str]) -> np.ndarray:
+        """Parse dates and convert them to naive local wall-clock datetime64[ns]."""
+        if isinstance(values, pd.Categorical) or np.asarray(values).dtype == object:
+            values = np.asarray(values, dtype=object)
+        stamps = pd.DatetimeIndex(pd.to_datetime(values, errors='coerce'))
+
+        if timezone is not None:
+            if stamps.tz is None:
+                zone = source_timezone or timezone
+                try:
+                    stamps = stamps.tz_localize(zone, ambiguous='infer', nonexistent='shift_forward')
+                except _LOCALIZE_ERRORS:
+                    stamps = stamps.tz_localize(
+                        zone, ambiguous=np.ones(len(stamps), dtype=bool), nonexistent='shift_forward'
+                    )
+            stamps = stamps.tz_convert(timezone)
+        if stamps.tz is not None:
+            stamps = stamps.tz_localize(None)
+        return stamps.as_unit('ns').to_numpy()
+
+    def _build(self, values: np.ndarray) -> None:
+        ns = self.times.view('int64')
+        counts = np.ones(len(ns), dtype=np.int64)
+
+        hours, hour_values, hour_counts = _reduce_sorted(ns - ns % _HOUR_NS, values, counts)
+        days, day_values, day_counts = _reduce_sorted(hours - hours % _DAY_NS, hour_values, hour_counts)
+
+        day_numbers = days // _DAY_NS
+        # 1970-01-01 was a Thursday; ISO weeks start on Monday
+        weekdays = (day_numbers + 3) % 7
+        weeks, week_values, week_counts = _reduce_sorted(days - weekdays * _DAY_NS, day_values, day_counts)
+
+        months_since_epoch = days.astype('datetime64[ns]').astype('datetime64[M]')
+        months, month_values, month_counts = _reduce_sorted(
+            months_since_epoch.astype('datetime64[ns]').view('int64'), day_values, day_counts
+        )
+
+        self._grains['hour'] = self._frame(hours.astype('datetime64[ns]'), hour_values, hour_counts)
+        self._grains['day'] = self._frame(days.astype('datetime64[ns]'), day_values, day_counts)
+        self._grains['week'] = self._frame(weeks.astype('datetime64[ns]'), week_values, week_counts)
+        self._grains['month'] = self._frame(months.astype('datetime64[ns]'), month_values, month_counts)
+        self._grains['day_of_week'] = self._frame(*_reduce_cyclic(weekdays, 7, day_values, day_counts))
+        self._grains['hour_of_day'] = self._frame(
+            *_reduce_cyclic((hours // _HOUR_NS) % 24, 24, hour_values, hour_counts)
+        )
+
+    def _frame(self, buckets: np.ndarray, values: np.ndarray, counts: np.ndarray) -> pd.DataFrame:
+        columns: Dict[Any, Any] = {BUCKET_COLUMN: buckets}
+        for position, col in enumerate(self.measures):
+            sums = values[:, position]
+            columns[col] = np.rint(sums).astype('int64') if col in self._integer_measures else sums
+        columns[ROWS_COLUMN] = counts
+        return pd.DataFrame(columns)
+
+    def grain(self, name: str, start: Any = None, end: Any = None) -> pd.DataFrame:
+        """
+        Get the aggregates at one grain.
+
+        Args:
+            name: One of 'hour', 'day', 'week' (ISO weeks, labelled by their
+                Monday), 'month', 'day_of_week' (0 = Monday) or
+                'hour_of_day' (0-23)
+            start: First bucket to include (time grains only)
+            end: Last bucket to include (time grains only)
+
+        Returns:
+            DataFrame with a ``bucket`` column, the summed measures and a
+            ``rows`` count; shared between callers, so treat as read-only
+        """
+        if name not in self._grains:
+            raise ValueError(f"Unknown grain: {name} (expected one of {', '.join(GRAINS)})")
+        frame = self._grains[name]
+        if start is None and end is None:
+            return frame
+        if name in ('day_of_week', 'hour_of_day'):
+            raise ValueError(f"Grain {name} has no time range")
+
+        lo, hi = _bounds(frame[BUCKET_COLUMN].to_numpy(), start, end)
+        return frame.iloc[lo:hi]
+
+    def rows_between(self, start: Any = None, end: Any = None) -> np.ndarray:
+        """
+        Get the positions of table rows in a time range, in time order.
+
+        Args:
+            start: First local time to include
+            end: Last local time to include
+
+        Returns:
+            Row positions into the indexed table
+        """
+        lo, hi = _bounds(self.times, start, end)
+        return self.order[lo:hi]
+
+    def __repr__(self) -> str:
+        return (
+            f"TimeIndex(table='{self.table_name}', column='{self.date_column}', "
+            f"timezone={self.timezone!r}, rows={len(self.order)})"
+        )
+
+
+def build_time_indexes(
+    tables: Dict[str, FactTable],
+    timezone: Optional[str] = None,
+    source_timezone: Optional[str] = None,
+    spill: Optional[Any] = None
+) -> Dict[str, TimeIndex]:
+    """
+    Build a time index for every table with dates and additive measures.
+
+    Args:
+        tables: Fact tables keyed by name
+        timezone: Reporting timezone
+        source_timezone: Timezone of naive source timestamps
+        spill: SpillArea for the indexes' row arrays (None keeps them in
+            memory)
+
+    Returns:
+        Time indexes keyed by table name
+    """
+    indexes = {}
+    for name, table in tables.items():
+        if not table.date_columns or not table.num_rows:
+            continue
+        try:
+            index = TimeIndex(table, timezone=timezone, source_timezone=source_timezone, spill=spill)
+        except Exception as e:
+            logger.warning(f"Could not build time index for {name}: {e}")
+            continue
+        if len(index.order) and index.measures:
+            indexes[name] = index
+    return indexes
@@ -0,0 +1,218 @@
+"""
+Vectorized data-quality checks over fact tables.
+
+Each check evaluates a whole column (or pair of columns) with NumPy and
+yields a boolean mask of offending rows, so validating a multi-million-row
+table costs a handful of array passes. Results are condensed into a small
+summary (counts, affected columns and a few sample row positions per
+check) that is attached to the report metadata; the offending rows can
+optionally be moved out of the tables into a quarantine.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import numpy as np
+import pandas as pd
+
+from .store import FactTable, PROVENANCE_COLUMN, is_additive_measure, key_codes, select_rows
+
+logger = logging.getLogger(__name__)
+
+CHECKS = (
+    'negative_values',
+    'clicks_exceed_impressions',
+    'ctr_mismatch',
+    'duplicate_dates',
+    'invalid_dates'
+)
+
+# Column holding the failed checks of each quarantined row
+ISSUES_COLUMN = '_issues'
+
+SAMPLE_ROWS = 5
+DEFAULT_CTR_TOLERANCE = 0.01
+
+
+def _find_column(table: FactTable, name: str) -> Optional[Any]:
+    """Find a column by name, case-insensitively."""
+    for col in table.column_names:
+        if str(col).strip().lower() == name:
+            return col
+    return None
+
+
+def _as_float(values: Any) -> np.ndarray:
+    """View a column as float64, coercing text to NaN where needed."""
+    if isinstance(values, pd.Categorical) or values.dtype == object:
+        return pd.to_numeric(pd.Series(np.asarray(values, dtype=object)), errors='coerce').to_numpy(dtype='float64')
+    return np.asarray(values, dtype='float64')
+
+
+def _is_dimension(values: Any) -> bool:
+    return isinstance(values, pd.Categorical) or values.dtype == object or values.dtype.kind in 'bU'
+
+
+def check_table(
+    table: FactTable,
+    ctr_tolerance: float = DEFAULT_CTR_TOLERANCE,
+    check_duplicates: bool = True
+) -> Dict[str, Tuple[np.ndarray, List[Any]]]:
+    """
+    Run every check over a table.
+
+    A row is a duplicate when an earlier row has the same date and the same
+    values in every dimension (text) column. That only holds when the table
+    has all of its source's dimensions: rows that differ in a column left
+    out by a column projection would look like duplicates, so the check is
+    disabled for projected tables.
+
+    Args:
+        table: Fact table to check
+        ctr_tolerance: Relative difference allowed between a CTR column
+            and Clicks / Impressions
+        check_duplicates: Run the ``duplicate_dates`` check
+
+    Returns:
+        Mapping of check name to (offending-row mask, columns involved);
+        checks that don't apply to the table are left out
+    """
+    results: Dict[str, Tuple[np.ndarray, List[Any]]] = {}
+    rows = table.num_rows
+
+    measures = [
+        col for col in table.column_names
+        if col != PROVENANCE_COLUMN and col not in table.date_columns
+        and is_additive_measure(col, table.column(col))
+    ]
+    if measures:
+        negative = np.zeros(rows, dtype=bool)
+        columns = []
+        for col in measures:
+            mask = np.asarray(table.column(col)) < 0
+            if mask.any():
+                negative |= mask
+                columns.append(col)
+        results['negative_values'] = (negative, columns)
+
+    clicks_col = _find_column(table, 'clicks')
+    impressions_col = _find_column(table, 'impressions')
+    if clicks_col is not None and impressions_col is not None:
+        clicks = _as_float(table.column(clicks_col))
+        impressions = _as_float(table.column(impressions_col))
+        results['clicks_exceed_impressions'] = (clicks > impressions, [clicks_col, impressions_col])
+
+        ctr_col = _find_column(table, 'ctr')
+        if ctr_col is not None:
+            ctr = _as_float(table.column(ctr_col))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ratio = clicks / impressions
+            # CTR may be stored as a ratio or as a percentage
+            checked = np.isfinite(ratio) & np.isfinite(ctr) & (impressions > 0)
+            as_ratio = np.abs(ctr - ratio) <= ctr_tolerance * np.maximum(ratio, 1e-4)
+            as_percent = np.abs(ctr - 100 * ratio) <= ctr_tolerance * np.maximum(100 * ratio, 1e-2)
+            results['ctr_mismatch'] = (checked & ~as_ratio & ~as_percent, [ctr_col, clicks_col, impressions_col])
+
+    if table.date_columns and rows:
+        date_col = table.date_columns[0]
+        dates = table.column(date_col)
+        if isinstance(dates, pd.Categorical) or np.asarray(dates).dtype.kind != 'M':
+            parsed = pd.to_datetime(pd.Series(np.asarray(dates, dtype=object)), errors='coerce').to_numpy()
+        else:
+            parsed = np.asarray(dates)
+        results['invalid_dates'] = (np.isnat(parsed), [date_col])
+
+    if check_duplicates and table.date_columns and rows:
+        date_col = table.date_columns[0]
+        key_columns = [date_col] + [
+            col for col in table.column_names
+            if col not in table.date_columns and col != PROVENANCE_COLUMN
+            and _is_dimension(table.column(col))
+        ]
+        codes = key_codes([table.column(col) for col in key_columns])
+        # Every occurrence of a key after its first is a duplicate
+        _, first = np.unique(codes, return_index=True)
+        duplicate = np.ones(rows, dtype=bool)
+        duplicate[first] = False
+        results['duplicate_dates'] = (duplicate, key_columns)
+
+    return results
+
+
+def validate_tables(
+    tables: Dict[str, FactTable],
+    quarantine: bool = False,
+    ctr_tolerance: float = DEFAULT_CTR_TOLERANCE,
+    check_duplicates: bool = True
+) -> Tuple[Dict[str, Any], Dict[str, FactTable], Dict[str, FactTable]]:
+    """
+    Validate tables and optionally split off offending rows.
+
+    Args:
+        tables: Fact tables keyed by name
+        quarantine: Move offending rows into quarantine tables
+        ctr_tolerance: Relative CTR tolerance
+        check_duplicates: Run the ``duplicate_dates`` check (disable it
+            when dimension columns may have been projected away)
+
+    Returns:
+        Tuple of (issue summary, tables with offending rows removed when
+        quarantining, quarantined rows keyed by table name with an
+        ``_issues`` column listing the failed checks)
+    """
+    summary: Dict[str, Any] = {
+        'tables': {},
+        'rows_flagged': 0,
+        'rows_quarantined': 0,
+        'skipped_checks': [] if check_duplicates else ['duplicate_dates']
+    }
+    cleaned: Dict[str, FactTable] = {}
+    quarantined: Dict[str, FactTable] = {}
+
+    for name, table in tables.items():
+        checks = check_table(table, ctr_tolerance, check_duplicates)
+        flagged = np.zeros(table.num_rows, dtype=bool)
+        issues = {}
+        for check, (mask, columns) in checks.items():
+            count = int(np.count_nonzero(mask))
+            if not count:
+                continue
+            flagged |= mask
+            issues[check] = {
+                'count': count,
+                'columns': [str(col) for col in columns],
+                'sample_rows': np.flatnonzero(mask)[:SAMPLE_ROWS].tolist()
+            }
+
+        flagged_rows = int(np.count_nonzero(flagged))
+        summary['tables'][name] = {'rows': table.num_rows, 'rows_flagged': flagged_rows, 'issues': issues}
+        summary['rows_flagged'] += flagged_rows
+        if flagged_rows:
+            counts = ', '.join(f"{check}={info['count']}" for check, info in issues.items())
+            logger.warning(f"Table {name}: {flagged_rows} of {table.num_rows} rows failed validation ({counts})")
+
+        if not quarantine or not flagged_rows:
+            continue
+
+        # Encode each row's failed checks as a bit set, then label the few
+        # distinct combinations
+        failed = list(issues)
+        bits = np.zeros(flagged_rows, dtype=np.int64)
+        for position, check in enumerate(failed):
+            bits |= checks[check][0][flagged].astype(np.int64) << position
+        combinations, codes = np.unique(bits, return_inverse=True)
+        labels = [
+            ','.join(check for position, check in enumerate(failed) if combination >> position & 1)
+            for combination in combinations
+        ]
+
+        bad = {col: select_rows(values, flagged) for col, values in table.columns.items()}
+        bad[ISSUES_COLUMN] = pd.Categorical.from_codes(codes.astype(np.int32), categories=labels)
+        quarantined[name] = FactTable(name, bad, table.date_columns)
+        cleaned[name] = FactTable(
+            name,
+            {col: select_rows(values, ~flagged) for col, values in table.columns.items()},
+            table.date_columns
+        )
+        summary['rows_quarantined'] += flagged_rows
+
+    return summary, cleaned, quarantined
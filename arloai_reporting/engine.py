@@ -5,17 +5,68 @@ This module contains the main ReportEngine class that orchestrates
 report generation from data sources to final HTML/PDF output.
 """
 
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Set, Union, Any, Tuple
 from pathlib import Path
+from concurrent.futures import (
+    FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
 import logging
+import time
 from jinja2 import Environment, FileSystemLoader
 
 from .data.processors import DataProcessor
+from .data.api import ApiSource
+from .data.cube import build_report_cube
+from .data.derived import DerivedMetrics
+from .data.sql import SqlSource
+from .data.streaming import DEFAULT_BATCH_SIZE
+from .widgets.base import BaseWidget
+from .widgets.cache import DataDigest, RenderCache
+from .widgets.datasets import DatasetRegistry, RenderGraph
+from .widgets.placeholders import render_fallback_card
 from .widgets.registry import WidgetRegistry
 from .utils.exporters import HTMLExporter, PDFExporter
 
 logger = logging.getLogger(__name__)
 
+RENDER_EXECUTORS = ('serial', 'thread', 'process')
+
+# Seconds between checks for widgets handed to a worker while others render
+_DISPATCH_POLL = 0.05
+
+# Report data of the current report in a process pool worker
+_worker_data: Any = None
+
+
+def _set_worker_data(data: Any) -> None:
+    """Process pool initializer shipping the report data once per worker."""
+    global _worker_data
+    _worker_data = data
+
+
+def _worker_ready() -> None:
+    """No-op task run once per process worker before widgets are submitted."""
+
+
+def _render_widget(widget: BaseWidget, datasets: Dict[str, Any], data: Any = None) -> str:
+    """
+    Render a widget in a process pool worker.
+    
+    Module-level so it can be shipped to process pool workers.
+    
+    Args:
+        widget: Widget to render
+        datasets: Values of the widget's declared datasets, computed in the
+            parent process
+        data: Report data (defaults to the data set by the pool initializer)
+        
+    Returns:
+        Rendered HTML
+    """
+    data = data if data is not None else _worker_data
+    data.datasets = datasets
+    return widget.render(data)
+
 
 class ReportEngine:
     """
@@ -23,65 +74,174 @@ class ReportEngine:
     and report generation.
     """
     
-    def __init__(self, template_dir: Optional[str] = None):
+    def __init__(
+        self,
+        template_dir: Optional[str] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
+        state_dir: Optional[Union[str, Path]] = None,
+        timezone: Optional[str] = None,
+        memory_budget: Optional[int] = None,
+        streaming: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        retain_rows: bool = True,
+        metrics: Optional[Dict[str, str]] = None,
+        render_executor: Union[str, Executor] = 'serial',
+        render_workers: Optional[int] = None,
+        widget_timeout: Optional[float] = None,
+        render_cache: bool = False,
+        render_cache_dir: Optional[Union[str, Path]] = None,
+        widget_manifest: Optional[Union[str, Path]] = None
+    ):
         """
         Initialize the reporting engine.
         
         Args:
             template_dir: Directory containing Jinja2 templates
+            cache_dir: Directory for the parsed-source cache (None disables it)
+            state_dir: Directory for persistent per-campaign aggregates
+            timezone: Reporting timezone for hourly, daily, weekly and
+                monthly buckets
+            memory_budget: Bytes of report data to keep in memory; the rest
+                spills to memory-mapped temporary files
+            streaming: Read large sources in batches of ``batch_size`` rows
+            batch_size: Rows per batch in streaming mode
+            retain_rows: Keep row-level tables in streaming mode (parse
+                memory is bounded either way; disable to also bound the
+                tables and report from summaries only)
+            metrics: Derived metric definitions (e.g. ``{'vtr': 'sum(views)
+                / sum(impressions)'}``) added to the built-in CTR, CPM, CPC
+                and engagement rate
+            render_executor: How widgets are rendered: 'serial', 'thread'
+                (I/O-bound widgets), 'process' (CPU-bound chart building)
+                or an Executor instance to submit them to
+            render_workers: Worker count of the thread or process pool
+            widget_timeout: Seconds each widget may run once a pool worker
+                picks it up before a fallback card is shown instead (None
+                waits indefinitely)
+            render_cache: Serve widgets whose configuration and data are
+                unchanged from an in-process cache of rendered HTML
+            render_cache_dir: Directory persisting rendered widgets across
+                runs (implies render_cache)
+            widget_manifest: JSON manifest of additional widgets, imported
+                when a report first uses them
         """
+        if isinstance(render_executor, str) and render_executor not in RENDER_EXECUTORS:
+            raise ValueError(
+                f"Unknown render executor: {render_executor} (expected one of {', '.join(RENDER_EXECUTORS)})"
+            )
         self.template_dir = template_dir or str(Path(__file__).parent / "templates")
         self.jinja_env = Environment(
             loader=FileSystemLoader(self.template_dir),
             autoescape=True
         )
         
-        self.data_processor = DataProcessor()
-        self.widget_registry = WidgetRegistry()
+        self.data_processor = DataProcessor(
+            cache_dir=cache_dir,
+            state_dir=state_dir,
+            timezone=timezone,
+            memory_budget=memory_budget,
+            streaming=streaming,
+            batch_size=batch_size,
+            retain_rows=retain_rows
+        )
+        self.metric_definitions = dict(metrics or {})
+        self.render_executor = render_executor
+        self.render_workers = render_workers
+        self.widget_timeout = widget_timeout
+        self.render_cache = RenderCache(render_cache_dir) if render_cache or render_cache_dir else None
+        self.widget_registry = WidgetRegistry(manifest=widget_manifest)
+        self.dataset_registry = DatasetRegistry()
         self.html_exporter = HTMLExporter()
         self.pdf_exporter = PDFExporter()
         
         logger.info("ReportEngine initialized")
     
+    @property
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics of the parsed-source cache (empty when disabled)."""
+        cache = self.data_processor.cache
+        return cache.stats() if cache is not None else {}
+    
+    @property
+    def render_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics of the widget render cache across reports (empty when disabled)."""
+        return self.render_cache.stats() if self.render_cache is not None else {}
+    
     def generate_report(
         self,
         report_type: str,
-        data_sources: List[Union[str, Path]],
+        data_sources: List[Union[str, Path, SqlSource, ApiSource]],
         template: str = "default",
         widgets: Optional[List[str]] = None,
-        output_format: str = "html"
+        output_format: str = "html",
+        campaign_id: Optional[str] = None
     ) -> "Report":
         """
         Generate a report from data sources.
         
         Args:
             report_type: Type of report ('initial', 'mid_campaign', 'final')
-            data_sources: List of data source file paths
+            data_sources: List of data source file paths, SQL sources and
+                API sources
             template: Template name to use
             widgets: List of widget names to include (None for auto-selection)
             output_format: Output format ('html', 'pdf', 'both')
+            campaign_id: Fold sources into this campaign's running
+                aggregates (requires the engine's state_dir)
             
         Returns:
             Report object with generated content
         """
         logger.info(f"Generating {report_type} report with {len(data_sources)} data sources")
         
+        # Select widgets before ingestion so the columns they consume can be
+        # pushed down into the readers
+        if widgets is None:
+            widgets = self._select_widgets_for_report_type(report_type)
+        
         # Process data sources
-        processed_data = self.data_processor.process_sources(data_sources)
+        processed_data = self.data_processor.process_sources(
+            data_sources,
+            columns=self._collect_widget_columns(widgets),
+            campaign_id=campaign_id
+        )
         
-        # Select widgets based on report type and available data
-        if widgets is None:
-            widgets = self._select_widgets_for_report_type(report_type, processed_data)
+        # One shared rollup cube per report; widgets query it instead of
+        # grouping the raw rows themselves
+        processed_data.cube = build_report_cube(processed_data.tables, spill=processed_data.spill)
+        cube_table = processed_data.cube.table_name if processed_data.cube is not None else None
+        processed_data.derived = DerivedMetrics(
+            processed_data.cube,
+            processed_data.time_index(cube_table),
+            self.metric_definitions
+        )
+        
+        # Intermediate datasets are computed once on first use and released
+        # after the last widget that declared them has rendered
+        widget_objects = [self.widget_registry.get_widget(name) for name in widgets]
+        graph = RenderGraph(self.dataset_registry, [widget for widget in widget_objects if widget])
+        processed_data.datasets = graph.bind(processed_data)
         
         # Render widgets
-        rendered_widgets = {}
-        for widget_name in widgets:
-            widget = self.widget_registry.get_widget(widget_name)
-            if widget and widget.can_render(processed_data):
-                rendered_widgets[widget_name] = widget.render(processed_data)
-                logger.debug(f"Rendered widget: {widget_name}")
+        compatible = set(self.widget_registry.get_widgets_for_data(processed_data, names=widgets))
+        renderable = []
+        for widget_name, widget in zip(widgets, widget_objects):
+            if widget_name in compatible:
+                renderable.append((widget_name, widget))
             else:
                 logger.warning(f"Skipping widget {widget_name} - cannot render with available data")
+                graph.finish(widget_name)
+        cached, cache_keys, render_cache_stats = self._lookup_rendered(renderable, processed_data, graph)
+        rendered = self._render_widgets(
+            [(widget_name, widget) for widget_name, widget in renderable if widget_name not in cached],
+            processed_data,
+            graph,
+            cache_keys
+        )
+        rendered_widgets = {
+            widget_name: cached[widget_name] if widget_name in cached else rendered[widget_name]
+            for widget_name, _ in renderable
+        }
         
         # Load and render template
         template_obj = self.jinja_env.get_template(f"{template}.html")
@@ -97,23 +257,249 @@ class ReportEngine:
             content=html_content,
             report_type=report_type,
             data_sources=data_sources,
-            widgets=list(rendered_widgets.keys())
+            widgets=list(rendered_widgets.keys()),
+            render_cache_stats=render_cache_stats
         )
         
         logger.info(f"Report generated successfully with {len(rendered_widgets)} widgets")
         return report
     
+    def _lookup_rendered(
+        self,
+        renderable: List[Tuple[str, BaseWidget]],
+        processed_data: Any,
+        graph: RenderGraph
+    ) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Any]]:
+        """
+        Serve widgets from the render cache.
+        
+        Args:
+            renderable: (name, widget) pairs in report order
+            processed_data: Report data
+            graph: Dataset graph of the report
+            
+        Returns:
+            Tuple of (HTML of the widgets served from the cache, cache keys
+            of the widgets still to render, this report's cache statistics)
+        """
+        if self.render_cache is None:
+            return {}, {}, {}
+        
+        cached = {}
+        cache_keys = {}
+        stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'uncacheable': 0}
+        digest = DataDigest(processed_data, self._render_context())
+        for widget_name, widget in renderable:
+            if not widget.cacheable:
+                stats['uncacheable'] += 1
+                continue
+            columns = widget.get_required_columns() + widget.get_optional_columns()
+            datasets = {name: graph[name] for name in widget.get_required_datasets()}
+            key = RenderCache.key(widget, digest.digest(columns or None, datasets))
+            
+            memory_hits, disk_hits = self.render_cache.memory_hits, self.render_cache.disk_hits
+            html = self.render_cache.get(key)
+            if html is None:
+                stats['misses'] += 1
+                cache_keys[widget_name] = key
+                continue
+            if self.render_cache.memory_hits > memory_hits:
+                stats['memory_hits'] += 1
+            elif self.render_cache.disk_hits > disk_hits:
+                stats['disk_hits'] += 1
+            cached[widget_name] = html
+            graph.finish(widget_name)
+            logger.debug(f"Served widget from render cache: {widget_name}")
+        
+        lookups = len(cached) + stats['misses']
+        stats['hits'] = len(cached)
+        stats['hit_rate'] = len(cached) / lookups if lookups else 0.0
+        return cached, cache_keys, stats
+    
+    def _render_context(self) -> str:
+        """Describe the engine options that change rendered output, for cache keys."""
+        processor = self.data_processor
+        metrics = sorted(self.metric_definitions.items())
+        return f"timezone={processor.timezone}|source_timezone={processor.source_timezone}|metrics={metrics}"
+    
+    def _render_widgets(
+        self,
+        renderable: List[Tuple[str, BaseWidget]],
+        processed_data: Any,
+        graph: RenderGraph,
+        cache_keys: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Render widgets with the configured executor.
+        
+        A widget that raises or exceeds the timeout is replaced by a
+        fallback card. Results keep the order of ``renderable``.
+        
+        Args:
+            renderable: (name, widget) pairs in report order
+            processed_data: Report data
+            graph: Dataset graph of the report
+            cache_keys: Render cache keys of the widgets to store once
+                rendered (fallback cards are never cached)
+            
+        Returns:
+            Mapping of widget name to HTML, in report order
+        """
+        cache_keys = cache_keys or {}
+        rendered_widgets = {}
+        if self.render_executor == 'serial' or len(renderable) < 2:
+            for widget_name, widget in renderable:
+                try:
+                    rendered_widgets[widget_name] = widget.render(processed_data)
+                    if widget_name in cache_keys:
+                        self.render_cache.put(cache_keys[widget_name], rendered_widgets[widget_name])
+                    logger.debug(f"Rendered widget: {widget_name}")
+                except Exception as e:
+                    logger.error(f"Error rendering widget {widget_name}: {e}")
+                    rendered_widgets[widget_name] = render_fallback_card(widget_name, "rendering failed")
+                finally:
+                    graph.finish(widget_name)
+            return rendered_widgets
+        
+        executor, owned = self._widget_executor(processed_data, len(renderable))
+        in_process = not isinstance(executor, ProcessPoolExecutor)
+        futures = []
+        for widget_name, widget in renderable:
+            if in_process:
+                futures.append(executor.submit(widget.render, processed_data))
+                continue
+            # Workers can't reach the graph; ship the declared datasets
+            datasets = {name: graph[name] for name in widget.get_required_datasets()}
+            if owned:
+                futures.append(executor.submit(_render_widget, widget, datasets))
+            else:
+                futures.append(executor.submit(_render_widget, widget, datasets, processed_data))
+        
+        expired: Set[Future] = set()
+        try:
+            expired = self._expired_renders(futures)
+            for (widget_name, widget), future in zip(renderable, futures):
+                if future in expired:
+                    logger.error(f"Timed out rendering widget {widget_name} after {self.widget_timeout}s")
+                    rendered_widgets[widget_name] = render_fallback_card(widget_name, "rendering timed out")
+                    graph.finish(widget_name)
+                    continue
+                try:
+                    rendered_widgets[widget_name] = future.result()
+                    if widget_name in cache_keys:
+                        self.render_cache.put(cache_keys[widget_name], rendered_widgets[widget_name])
+                    logger.debug(f"Rendered widget: {widget_name}")
+                except Exception as e:
+                    logger.error(f"Error rendering widget {widget_name}: {e}")
+                    rendered_widgets[widget_name] = render_fallback_card(widget_name, "rendering failed")
+                finally:
+                    graph.finish(widget_name)
+        finally:
+            if owned:
+                # Don't block on widgets still stuck past their timeout
+                if expired:
+                    for future in futures:
+                        future.cancel()
+                executor.shutdown(wait=not expired)
+        
+        return rendered_widgets
+    
+    def _expired_renders(self, futures: List[Future]) -> Set[Future]:
+        """
+        Wait for submitted widgets, each under its own timeout.
+        
+        A widget's clock starts when the executor hands it to a worker (its
+        future turns running), so time spent queued behind other widgets
+        doesn't count against it.
+        
+        Args:
+            futures: Futures of the submitted widgets
+            
+        Returns:
+            Futures still running past the timeout
+        """
+        if self.widget_timeout is None:
+            return set()
+        started: Dict[Future, float] = {}
+        expired: Set[Future] = set()
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            for future in pending:
+                if future not in started and (future.running() or future.done()):
+                    started[future] = now
+            late = {
+                future for future in pending
+                if future in started and not future.done() and now - started[future] >= self.widget_timeout
+            }
+            expired |= late
+            pending -= late
+            deadlines = [started[future] + self.widget_timeout - now for future in pending if future in started]
+            done, _ = wait(pending, timeout=max(0.0, min([_DISPATCH_POLL] + deadlines)), return_when=FIRST_COMPLETED)
+            pending -= done
+        return expired
+    
+    def _widget_executor(self, processed_data: Any, count: int) -> Tuple[Executor, bool]:
+        """
+        Get the executor widgets are submitted to.
+        
+        Args:
+            processed_data: Report data, shipped once to each process worker
+            count: Number of widgets to render
+            
+        Returns:
+            Tuple of (executor, whether the engine owns and must shut it down)
+        """
+        if isinstance(self.render_executor, Executor):
+            return self.render_executor, False
+        workers = min(self.render_workers or count, count)
+        if self.render_executor == 'process':
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_set_worker_data,
+                initargs=(processed_data,)
+            )
+            # Start the workers and ship them the report data before any
+            # widget's timeout starts counting
+            wait([executor.submit(_worker_ready) for _ in range(workers)])
+            return executor, True
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='widget'), True
+    
+    def _collect_widget_columns(self, widget_names: List[str]) -> Optional[List[str]]:
+        """
+        Collect the source columns consumed by a set of widgets.
+        
+        Args:
+            widget_names: Names of the widgets to render
+            
+        Returns:
+            Union of declared columns, or None if any widget hasn't declared
+            its columns (in which case every column is read)
+        """
+        columns = []
+        for widget_name in widget_names:
+            widget = self.widget_registry.get_widget(widget_name)
+            if widget is None:
+                continue
+            
+            widget_columns = widget.get_required_columns() + widget.get_optional_columns()
+            if not widget_columns:
+                return None
+            columns.extend(col for col in widget_columns if col not in columns)
+        
+        return columns or None
+    
     def _select_widgets_for_report_type(
         self, 
         report_type: str, 
-        data: Dict[str, Any]
+        data: Optional[Dict[str, Any]] = None
     ) -> List[str]:
         """
         Auto-select appropriate widgets based on report type and available data.
         
         Args:
             report_type: Type of report
-            data: Processed data dictionary
+            data: Processed data dictionary, if already available
             
         Returns:
             List of widget names to include
@@ -144,7 +530,7 @@ class ReportEngine:
     def _generate_metadata(
         self, 
         report_type: str, 
-        data_sources: List[Union[str, Path]]
+        data_sources: List[Union[str, Path, SqlSource, ApiSource]]
     ) -> Dict[str, Any]:
         """Generate metadata for the report."""
         from datetime import datetime
@@ -166,13 +552,15 @@ class Report:
         self,
         content: str,
         report_type: str,
-        data_sources: List[Union[str, Path]],
-        widgets: List[str]
+        data_sources: List[Union[str, Path, SqlSource, ApiSource]],
+        widgets: List[str],
+        render_cache_stats: Optional[Dict[str, Any]] = None
     ):
         self.content = content
         self.report_type = report_type
         self.data_sources = data_sources
         self.widgets = widgets
+        self.render_cache_stats = render_cache_stats or {}
         self.html_exporter = HTMLExporter()
         self.pdf_exporter = PDFExporter()
     
@@ -5,7 +5,30 @@ This module contains the widget architecture for creating modular,
 reusable report components.
 """
 
-from .base import BaseWidget
-from .registry import WidgetRegistry
+import importlib
 
-__all__ = ["BaseWidget", "WidgetRegistry"]
\ No newline at end of file
+# Exported names and the submodules defining them; imported on first access
+# so widget plugins can import ``arloai_reporting.widgets.base`` cheaply
+_LAZY_ATTRIBUTES = {
+    "BaseWidget": ".base",
+    "Dataset": ".datasets",
+    "DatasetRegistry": ".datasets",
+    "RenderCache": ".cache",
+    "WidgetDescriptor": ".plugins",
+    "WidgetRegistry": ".registry",
+}
+
+__all__ = ["BaseWidget", "Dataset", "DatasetRegistry", "RenderCache", "WidgetDescriptor", "WidgetRegistry"]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -16,8 +16,16 @@ class BaseWidget(ABC):
     - Accept normalized data input
     - Return styled HTML blocks
     - Can be injected into template slots
+    
+    ``version`` is part of the widget's render cache fingerprint: bump it
+    whenever a change to render() alters the HTML for the same data.
+    Widgets whose output depends on anything but their data and
+    configuration (the clock, external services) set ``cacheable`` to False.
     """
     
+    version = "1"
+    cacheable = True
+    
     def __init__(self, name: str, description: str = ""):
         """
         Initialize the widget.
@@ -73,6 +81,86 @@ class BaseWidget(ABC):
         """
         return []
     
+    def get_required_columns(self) -> List[str]:
+        """
+        Get list of source columns this widget cannot render without.
+        
+        Together with get_optional_columns, this lets the engine read only
+        the columns its widgets consume. Widgets that declare no columns
+        are assumed to need all of them.
+        
+        Returns:
+            List of column names (e.g. 'Date', 'Impressions')
+        """
+        return []
+    
+    def get_optional_columns(self) -> List[str]:
+        """
+        Get list of source columns this widget uses when present.
+        
+        Returns:
+            List of column names
+        """
+        return []
+    
+    def get_required_datasets(self) -> List[str]:
+        """
+        Get list of shared intermediate datasets this widget reads.
+        
+        The engine computes each declared dataset once per report and
+        exposes it to render() as ``data.datasets[name]``.
+        
+        Returns:
+            List of dataset names (e.g. 'daily_totals')
+        """
+        return []
+    
+    def get_required_measures(self) -> List[str]:
+        """
+        Get list of additive measures this widget needs (e.g. 'Clicks').
+        
+        Measures, dimensions and grains are a widget's structured data
+        requirements. Widgets declaring any of them are selected by the
+        registry's capability index from the report schema alone, without
+        calling can_render(); widgets declaring none are probed with
+        can_render() as before.
+        
+        Returns:
+            List of measure column names
+        """
+        return []
+    
+    def get_required_dimensions(self) -> List[str]:
+        """
+        Get list of dimension columns this widget needs (e.g. 'Creative').
+        
+        Returns:
+            List of dimension column names
+        """
+        return []
+    
+    def get_required_grains(self) -> List[str]:
+        """
+        Get list of time grains this widget needs (e.g. 'day', 'hour_of_day').
+        
+        Returns:
+            List of grain names from ``data.timeindex.GRAINS``
+        """
+        return []
+    
+    def get_config(self) -> Dict[str, Any]:
+        """
+        Get the configuration that shapes this widget's output.
+        
+        Part of the render cache fingerprint along with the class and
+        ``version``. Defaults to the public instance attributes; override
+        it when those include state that doesn't affect rendering.
+        
+        Returns:
+            Dictionary of configuration values
+        """
+        return {key: value for key, value in vars(self).items() if not key.startswith('_')}
+    
     def validate_data(self, data: Dict[str, Any]) -> bool:
         """
         Validate that the data contains required fields.
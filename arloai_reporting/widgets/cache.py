@@ -0,0 +1,343 @@
+"""
+Cache of rendered widget HTML.
+
+Entries are keyed by the widget's fingerprint (class, version and
+configuration) plus a digest of the data slice the widget consumes: the
+columns it declares (every column if it declares none), the values of the
+datasets it declares and the report options that change them. The summary
+metrics and dimensions, the source metadata and time series not backed by
+a table are always included, since any widget may read them. Re-running
+a report over unchanged data serves each unchanged widget from an
+in-process LRU, falling back to HTML files on disk that survive restarts.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Metadata that differs between runs over the same data
+VOLATILE_METADATA = ('source_timings', 'memory', 'elapsed')
+
+
+def _update_column(digest: Any, values: Any) -> None:
+    """Feed a column's dtype and content into a digest."""
+    if isinstance(values, pd.Categorical):
+        digest.update(b'categorical')
+        digest.update(pd.util.hash_array(np.asarray(values.categories, dtype=object)).tobytes())
+        values = values.codes
+    values = np.asarray(values)
+    digest.update(str(values.dtype).encode())
+    if values.dtype == object:
+        digest.update(pd.util.hash_array(values).tobytes())
+    else:
+        digest.update(np.ascontiguousarray(values).view(np.uint8).data)
+
+
+def _update_value(digest: Any, value: Any) -> None:
+    """Feed a dataset value (DataFrame, Series, array or plain object) into a digest."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        frame = value.to_frame() if isinstance(value, pd.Series) else value
+        digest.update(repr([(str(col), str(dtype)) for col, dtype in frame.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    elif isinstance(value, (np.ndarray, pd.Categorical)):
+        _update_column(digest, value)
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _stable(value: Any) -> Any:
+    """Drop run-specific timings and memory statistics from metadata."""
+    if isinstance(value, dict):
+        return {key: _stable(item) for key, item in value.items() if key not in VOLATILE_METADATA}
+    return value
+
+
+def widget_fingerprint(widget: Any) -> str:
+    """
+    Fingerprint a widget's code version and configuration.
+
+    Args:
+        widget: Widget instance
+
+    Returns:
+        Hex digest of the widget's class, ``version`` and ``get_config()``
+    """
+    config = sorted((str(key), repr(value)) for key, value in widget.get_config().items())
+    source = f"{type(widget).__module__}.{type(widget).__qualname__}|{widget.version}|{config}"
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+class DataDigest:
+    """
+    Digests of the data slices widgets consume, for one report.
+
+    Column digests are memoized, so widgets sharing columns hash them once.
+    """
+
+    def __init__(self, data: Any, context: str = ""):
+        """
+        Initialize the digest.
+
+        Args:
+            data: Processed report data (a FactStore)
+            context: Report options that change rendered output, such as
+                the timezone and derived metric definitions
+        """
+        self.data = data
+        self.context = context
+        self._columns: Dict[Tuple[str, Any], bytes] = {}
+        self._summary: Optional[bytes] = None
+
+    def _column(self, table_name: str, table: Any, column: Any) -> bytes:
+        key = (table_name, column)
+        if key not in self._columns:
+            digest = hashlib.blake2b(digest_size=16)
+            _update_column(digest, table.columns[column])
+            self._columns[key] = digest.digest()
+        return self._columns[key]
+
+    def _summaries(self) -> bytes:
+        """Digest the summary sections, metadata and non-table time series once per report."""
+        if self._summary is None:
+            digest = hashlib.blake2b(digest_size=16)
+            if isinstance(self.data, dict):
+                for key in ('metrics', 'dimensions', 'metadata'):
+                    digest.update(f"section:{key}".encode())
+                    section = self.data.get(key)
+                    try:
+                        digest.update(pickle.dumps(_stable(section), protocol=pickle.HIGHEST_PROTOCOL))
+                    except Exception:
+                        digest.update(repr(section).encode())
+                extra = getattr(self.data.get('time_series'), 'extra', None) or {}
+                for name in sorted(extra):
+                    entry = extra[name]
+                    digest.update(f"time_series:{name}".encode())
+                    if hasattr(entry, 'columns') and hasattr(entry, 'column_names'):
+                        for column in entry.column_names:
+                            digest.update(f"column:{column}".encode())
+                            _update_column(digest, entry.columns[column])
+                    else:
+                        _update_value(digest, entry)
+            self._summary = digest.digest()
+        return self._summary
+
+    def digest(self, columns: Optional[Iterable[Any]], datasets: Dict[str, Any]) -> str:
+        """
+        Digest the data a widget consumes.
+
+        Args:
+            columns: Declared source columns (matched case-insensitively);
+                None for every column
+            datasets: Values of the widget's declared datasets
+
+        Returns:
+            Hex digest
+        """
+        digest = hashlib.blake2b(digest_size=32)
+        digest.update(self.context.encode())
+        wanted = None if columns is None else {str(col).strip().lower() for col in columns}
+
+        for table_name in sorted(getattr(self.data, 'tables', {})):
+            table = self.data.tables[table_name]
+            digest.update(f"table:{table_name}:{table.num_rows}".encode())
+            for column in table.column_names:
+                if wanted is None or str(column).strip().lower() in wanted:
+                    digest.update(f"column:{column}".encode())
+                    digest.update(self._column(table_name, table, column))
+
+        digest.update(self._summaries())
+
+        for name in sorted(datasets):
+            digest.update(f"dataset:{name}".encode())
+            _update_value(digest, datasets[name])
+        return digest.hexdigest()
+
+
+class RenderCache:
+    """
+    Two-tier cache of rendered widget HTML: an in-process LRU backed by an
+    optional directory of HTML files with LRU eviction by size.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the on-disk tier (None keeps entries
+                in memory only)
+            max_entries: Entries kept in the in-process tier
+            max_bytes: Size cap of the on-disk tier
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(widget: Any, data_digest: str) -> str:
+        """
+        Build the cache key of a widget rendering.
+
+        Args:
+            widget: Widget instance
+            data_digest: Digest of the data slice it consumes
+
+        Returns:
+            Cache key
+        """
+        return f"{widget_fingerprint(widget)[:32]}-{data_digest[:32]}"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up rendered HTML.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            HTML or None on a miss
+        """
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return html
+
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{key}.html"
+            try:
+                html = path.read_text(encoding='utf-8')
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Discarding unreadable render cache entry {key}: {e}")
+                path.unlink(missing_ok=True)
+            else:
+                # Refresh the access time LRU eviction goes by
+                os.utime(path)
+                with self._lock:
+                    self._remember(key, html)
+                    self.disk_hits += 1
+                return html
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, html: str) -> None:
+        """
+        Store rendered HTML.
+
+        Args:
+            key: Cache key
+            html: Rendered widget HTML
+        """
+        with self._lock:
+            self._remember(key, html)
+        if self.cache_dir is None:
+            return
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_name, self.cache_dir / f"{key}.html")
+        except Exception as e:
+            logger.warning(f"Could not cache rendered widget {key}: {e}")
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            return
+        with self._lock:
+            self._evict_files()
+
+    def _remember(self, key: str, html: str) -> None:
+        self._entries[key] = html
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _evict_files(self) -> None:
+        """Evict least recently used files until the directory fits in max_bytes."""
+        files = []
+        for path in self.cache_dir.glob("*.html"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics since the cache was created.
+
+        Returns:
+            Dictionary with memory and disk hits, misses, hit rate,
+            evictions and in-process entries
+        """
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries)
+            }
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self.cache_dir is not None:
+                for path in self.cache_dir.glob("*.html"):
+                    path.unlink(missing_ok=True)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"RenderCache(entries={len(self._entries)}, cache_dir={self.cache_dir})"
@@ -0,0 +1,260 @@
+"""
+Named intermediate datasets shared between widgets.
+
+Widgets declare the datasets they read (``get_required_datasets``), e.g.
+``daily_totals`` for every chart over time. The engine builds a
+RenderGraph from the widgets of a report: each dataset, and the datasets
+it is derived from, is computed once on first use, memoized, and released
+as soon as its last consuming widget or dataset is done with it.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from collections import Counter
+import logging
+import threading
+
+from .base import BaseWidget
+
+logger = logging.getLogger(__name__)
+
+# Computes a dataset from the report data and its input datasets
+DatasetFunction = Callable[[Any, Dict[str, Any]], Any]
+
+
+class Dataset:
+    """
+    Definition of a named intermediate dataset.
+    """
+
+    def __init__(self, name: str, compute: DatasetFunction, depends: Iterable[str] = ()):
+        """
+        Initialize the dataset.
+
+        Args:
+            name: Unique dataset name
+            compute: Called with the report data and a mapping of the
+                input datasets' values
+            depends: Names of the datasets this one is derived from
+        """
+        self.name = name
+        self.compute = compute
+        self.depends = list(depends)
+
+    def __repr__(self) -> str:
+        return f"Dataset(name='{self.name}', depends={self.depends})"
+
+
+def _rollup(by: List[str]) -> DatasetFunction:
+    def compute(data: Any, inputs: Dict[str, Any]) -> Any:
+        cube = getattr(data, 'cube', None)
+        if cube is None or not all(cube.has_dimension(name) for name in by):
+            return None
+        return cube.rollup(by)
+    return compute
+
+
+def _time_grain(grain: str) -> DatasetFunction:
+    def compute(data: Any, inputs: Dict[str, Any]) -> Any:
+        time_index = data.time_index() if hasattr(data, 'time_index') else None
+        return time_index.grain(grain) if time_index is not None else None
+    return compute
+
+
+def _daily_ratios(data: Any, inputs: Dict[str, Any]) -> Any:
+    daily = inputs['daily_totals']
+    derived = getattr(data, 'derived', None)
+    if daily is None or derived is None:
+        return None
+    # Metric values are aligned with the rows of the Date rollup
+    metrics = [name for name in ('ctr', 'cpm', 'cpc') if derived.available(name, by=['Date'])]
+    return daily.assign(**{name: derived.compute(name, by=['Date']) for name in metrics})
+
+
+def _totals(data: Any, inputs: Dict[str, Any]) -> Any:
+    cube = getattr(data, 'cube', None)
+    return cube.totals() if cube is not None else None
+
+
+class DatasetRegistry:
+    """
+    Registry of the intermediate datasets widgets can declare.
+    """
+
+    def __init__(self):
+        """Initialize the registry with the built-in datasets."""
+        self._datasets: Dict[str, Dataset] = {}
+        self._load_default_datasets()
+
+    def register_dataset(self, dataset: Dataset) -> None:
+        """
+        Register a dataset definition.
+
+        Args:
+            dataset: Dataset to register (replaces one with the same name)
+        """
+        self._datasets[dataset.name] = dataset
+        logger.debug(f"Registered dataset: {dataset.name}")
+
+    def get_dataset(self, name: str) -> Optional[Dataset]:
+        """
+        Get a dataset definition by name.
+
+        Args:
+            name: Dataset name
+
+        Returns:
+            Dataset or None if not found
+        """
+        return self._datasets.get(name)
+
+    def list_datasets(self) -> List[str]:
+        """
+        Get list of all registered dataset names.
+
+        Returns:
+            List of dataset names
+        """
+        return list(self._datasets.keys())
+
+    def _load_default_datasets(self) -> None:
+        """Register the datasets derived from the report cube and time index."""
+        default_datasets = [
+            Dataset('totals', _totals),
+            Dataset('daily_totals', _rollup(['Date'])),
+            Dataset('daily_ratios', _daily_ratios, depends=['daily_totals']),
+            Dataset('creative_totals', _rollup(['Creative'])),
+            Dataset('placement_totals', _rollup(['Placement'])),
+            Dataset('weekly_totals', _time_grain('week')),
+            Dataset('monthly_totals', _time_grain('month')),
+            Dataset('day_of_week_totals', _time_grain('day_of_week')),
+            Dataset('hour_of_day_totals', _time_grain('hour_of_day'))
+        ]
+        for dataset in default_datasets:
+            self.register_dataset(dataset)
+
+
+class RenderGraph:
+    """
+    Dependency graph of the datasets consumed by a report's widgets.
+
+    Values are computed on first access and dropped once every widget and
+    dataset that consumes them has finished.
+    """
+
+    def __init__(self, registry: DatasetRegistry, widgets: Iterable[BaseWidget]):
+        """
+        Plan the datasets of a report.
+
+        Args:
+            registry: Dataset definitions
+            widgets: Widgets to be rendered
+
+        Raises:
+            ValueError: If a widget needs an unknown dataset or the
+                datasets depend on each other in a cycle
+        """
+        self.registry = registry
+        self.data = None
+        # One list of datasets per widget occurrence, so a widget listed
+        # twice releases its datasets once per finished render
+        self.needs: Dict[str, List[List[str]]] = {}
+        self.order: List[str] = []
+        self.computed: Counter = Counter()
+        self._remaining: Counter = Counter()
+        self._values: Dict[str, Any] = {}
+        # Widgets may render on several threads
+        self._lock = threading.RLock()
+
+        for widget in widgets:
+            needs = list(widget.get_required_datasets())
+            self.needs.setdefault(widget.name, []).append(needs)
+            for name in needs:
+                self._remaining[name] += 1
+                self._visit(name, ())
+
+    def _visit(self, name: str, path: tuple) -> None:
+        """Add a dataset and its inputs to the plan in dependency order."""
+        if name in path:
+            raise ValueError(f"Datasets depend on each other in a cycle: {' -> '.join(path + (name,))}")
+        if name in self.order:
+            return
+        dataset = self.registry.get_dataset(name)
+        if dataset is None:
+            raise ValueError(f"Unknown dataset: {name}")
+        for dependency in dataset.depends:
+            self._remaining[dependency] += 1
+            self._visit(dependency, path + (name,))
+        self.order.append(name)
+
+    def bind(self, data: Any) -> "RenderGraph":
+        """
+        Attach the report data datasets are computed from.
+
+        Args:
+            data: Processed report data
+
+        Returns:
+            The graph itself
+        """
+        self.data = data
+        return self
+
+    def __getitem__(self, name: str) -> Any:
+        with self._lock:
+            return self._get(name)
+
+    def _get(self, name: str) -> Any:
+        if name in self._values:
+            return self._values[name]
+
+        dataset = self.registry.get_dataset(name)
+        if dataset is None:
+            raise KeyError(name)
+        inputs = {dependency: self._get(dependency) for dependency in dataset.depends}
+        value = dataset.compute(self.data, inputs)
+        self.computed[name] += 1
+        logger.debug(f"Computed dataset: {name}")
+
+        # Datasets nobody declared (or already released) are not memoized
+        if self._remaining[name] > 0:
+            self._values[name] = value
+            for dependency in dataset.depends:
+                self._release(dependency)
+        return value
+
+    def _release(self, name: str) -> None:
+        if self._remaining[name] <= 0:
+            return
+        self._remaining[name] -= 1
+        if self._remaining[name] == 0:
+            self._values.pop(name, None)
+            logger.debug(f"Released dataset: {name}")
+            if not self.computed[name]:
+                # Never needed after all, so neither are its inputs
+                for dependency in self.registry.get_dataset(name).depends:
+                    self._release(dependency)
+
+    def is_loaded(self, name: str) -> bool:
+        """Check whether a dataset's value is currently held."""
+        return name in self._values
+
+    def finish(self, widget_name: str) -> None:
+        """
+        Release the datasets of a widget that has rendered (or was skipped).
+
+        Called once per occurrence of the widget in the report.
+
+        Args:
+            widget_name: Name of the widget
+        """
+        with self._lock:
+            occurrences = self.needs.get(widget_name)
+            if not occurrences:
+                return
+            for name in occurrences.pop():
+                self._release(name)
+            if not occurrences:
+                del self.needs[widget_name]
+
+    def __repr__(self) -> str:
+        return f"RenderGraph(datasets={self.order}, loaded={list(self._values)})"
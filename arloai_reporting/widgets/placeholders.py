@@ -3,6 +3,7 @@ Placeholder widgets for development and testing.
 """
 
 from typing import Dict, Any
+from html import escape
 from .base import BaseWidget
 
 
@@ -94,4 +95,28 @@ class PlaceholderWidget(BaseWidget):
         Returns:
             Always True for placeholders
         """
-        return True
\ No newline at end of file
+        return True
+
+
+def render_fallback_card(name: str, reason: str) -> str:
+    """
+    Render the card shown in place of a widget that failed or timed out.
+    
+    Args:
+        name: Name of the widget
+        reason: Short explanation shown in the card
+        
+    Returns:
+        HTML string
+    """
+    return f"""
+        <div class="widget-placeholder widget-unavailable" id="{escape(name)}">
+            <div class="placeholder-header">
+                <h3>{escape(name.replace('_', ' ').title())}</h3>
+                <span class="placeholder-badge">Unavailable</span>
+            </div>
+            <div class="placeholder-content">
+                <p>This widget could not be rendered: {escape(reason)}</p>
+            </div>
+        </div>
+        """
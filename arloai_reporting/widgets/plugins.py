@@ -0,0 +1,200 @@
+"""
+Lazy widget discovery.
+
+The registry holds a WidgetDescriptor for every known widget instead of an
+instance, so no widget module (and none of the charting libraries they
+pull in) is imported until a report asks for the widget. Descriptors come
+from the built-in manifest, JSON manifest files and the
+``arloai_reporting.widgets`` entry point group of installed packages,
+whose entry point names are widget names and whose values are the widget
+classes, e.g. in a plugin's setup.py::
+
+    entry_points={
+        "arloai_reporting.widgets": [
+            "day_of_week = acme_widgets.time:DayOfWeekChart",
+        ],
+    }
+
+Descriptors may repeat the widget's data requirements (measures,
+dimensions, grains) so the registry can select it for a report without
+importing it.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+from pathlib import Path
+import importlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "arloai_reporting.widgets"
+
+
+class WidgetDescriptor:
+    """
+    Lightweight description of a widget that is imported on first use.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target: str,
+        description: str = "",
+        options: Optional[Dict[str, Any]] = None,
+        measures: Iterable[str] = (),
+        dimensions: Iterable[str] = (),
+        grains: Iterable[str] = ()
+    ):
+        """
+        Initialize the descriptor.
+
+        Args:
+            name: Widget name
+            target: ``module:attribute`` of the widget class or a factory
+                returning the widget
+            description: Human-readable description
+            options: Keyword arguments for the class or factory
+            measures: Measures the widget requires
+            dimensions: Dimensions the widget requires
+            grains: Time grains the widget requires
+        """
+        self.name = name
+        self.target = target
+        self.description = description
+        self.options = dict(options or {})
+        self.measures = list(measures)
+        self.dimensions = list(dimensions)
+        self.grains = list(grains)
+
+    @classmethod
+    def from_dict(cls, entry: Dict[str, Any]) -> "WidgetDescriptor":
+        """
+        Build a descriptor from a manifest entry.
+
+        Args:
+            entry: Dictionary with ``name`` and ``target`` plus the other
+                constructor arguments
+
+        Returns:
+            WidgetDescriptor
+
+        Raises:
+            ValueError: If the entry lacks a name or target
+        """
+        if not entry.get('name') or not entry.get('target'):
+            raise ValueError(f"Widget manifest entry needs a name and a target: {entry}")
+        return cls(
+            entry['name'],
+            entry['target'],
+            description=entry.get('description', ""),
+            options=entry.get('options'),
+            measures=entry.get('measures', ()),
+            dimensions=entry.get('dimensions', ()),
+            grains=entry.get('grains', ())
+        )
+
+    def load(self) -> Any:
+        """
+        Import and instantiate the widget.
+
+        Returns:
+            Widget instance
+
+        Raises:
+            ImportError: If the widget's module can't be imported
+            AttributeError: If the module has no such attribute
+        """
+        module_name, _, attribute = self.target.partition(':')
+        factory = importlib.import_module(module_name)
+        for part in attribute.split('.') if attribute else ():
+            factory = getattr(factory, part)
+        widget = factory(**self.options)
+        if widget.name != self.name:
+            logger.warning(f"Widget {self.target} is named {widget.name}; registering it as {self.name}")
+            widget.name = self.name
+        logger.debug(f"Loaded widget {self.name} from {self.target}")
+        return widget
+
+    def __repr__(self) -> str:
+        return f"WidgetDescriptor(name='{self.name}', target='{self.target}')"
+
+
+def _placeholder(name: str) -> WidgetDescriptor:
+    return WidgetDescriptor(name, 'arloai_reporting.widgets.placeholders:PlaceholderWidget', options={'name': name})
+
+
+# Built-in manifest; widgets whose modules are missing load as placeholders.
+# Their declared requirements let the registry select them from the report
+# schema without importing them
+_DELIVERY = ('Impressions', 'Clicks')
+
+DEFAULT_WIDGETS = [
+    WidgetDescriptor(
+        'topline_kpi_grid', 'arloai_reporting.widgets.kpi_widgets:ToplineKPIGrid', measures=_DELIVERY
+    ),
+    WidgetDescriptor(
+        'budget_pacing_meter', 'arloai_reporting.widgets.kpi_widgets:BudgetPacingMeter',
+        measures=['Spend'], grains=['day']
+    ),
+    WidgetDescriptor(
+        'ctr_over_time', 'arloai_reporting.widgets.chart_widgets:CTROverTime', measures=_DELIVERY, grains=['day']
+    ),
+    WidgetDescriptor(
+        'imps_clicks_over_time', 'arloai_reporting.widgets.chart_widgets:ImpsClicksOverTime',
+        measures=_DELIVERY, grains=['day']
+    ),
+    WidgetDescriptor(
+        'daily_spend_chart', 'arloai_reporting.widgets.chart_widgets:DailySpendChart',
+        measures=['Spend'], grains=['day']
+    ),
+    WidgetDescriptor(
+        'placement_performance_table', 'arloai_reporting.widgets.table_widgets:PlacementPerformanceTable',
+        measures=_DELIVERY, dimensions=['Placement']
+    ),
+    WidgetDescriptor(
+        'creative_comparison', 'arloai_reporting.widgets.comparison_widgets:CreativeComparison',
+        measures=_DELIVERY, dimensions=['Creative']
+    ),
+    _placeholder('session_engagement_chart')
+]
+
+
+def load_manifest(manifest_path: Union[str, Path]) -> List[WidgetDescriptor]:
+    """
+    Read widget descriptors from a JSON manifest.
+
+    The manifest is a list of entries (or an object with a ``widgets``
+    list) such as ``{"name": "day_of_week", "target":
+    "acme_widgets.time:DayOfWeekChart", "grains": ["day_of_week"]}``.
+
+    Args:
+        manifest_path: Path to the manifest file
+
+    Returns:
+        List of descriptors
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    entries = manifest.get('widgets', []) if isinstance(manifest, dict) else manifest
+    return [WidgetDescriptor.from_dict(entry) for entry in entries]
+
+
+def discover_entry_points(group: str = ENTRY_POINT_GROUP) -> List[WidgetDescriptor]:
+    """
+    Find widgets advertised by installed packages, without importing them.
+
+    Args:
+        group: Entry point group
+
+    Returns:
+        List of descriptors
+    """
+    from importlib.metadata import entry_points
+
+    try:
+        found = entry_points(group=group)
+    except TypeError:
+        # Python < 3.10 returns a dict of groups
+        found = entry_points().get(group, [])
+    return [WidgetDescriptor(entry_point.name, entry_point.value) for entry_point in found]
@@ -1,24 +1,126 @@
 """
 Widget registry for managing available widgets.
+
+Widgets that declare structured data requirements (measures, dimensions,
+grains) are indexed by capability: for each capability the registry keeps
+the widgets needing it, so the widgets a report schema can render follow
+from counting how many of each widget's requirements the schema offers.
+The result is cached per schema until the set of widgets changes.
+
+Widgets are registered as lightweight descriptors (see ``plugins``) and
+imported the first time they are requested.
 """
 
-from typing import Dict, Optional, List
+from typing import Any, Dict, FrozenSet, Iterable, Optional, List, Set, Tuple, Union
+from collections import Counter
+from pathlib import Path
 import logging
 
 from .base import BaseWidget
+from .plugins import DEFAULT_WIDGETS, WidgetDescriptor, discover_entry_points, load_manifest
 
 logger = logging.getLogger(__name__)
 
+# A data capability, e.g. ('measure', 'clicks') or ('grain', 'week')
+Capability = Tuple[str, str]
+
+# Grains that need timestamps with a time of day
+_INTRADAY_GRAINS = ('hour', 'hour_of_day')
+
+
+def _normalize(name: Any) -> str:
+    return str(name).strip().lower()
+
+
+def widget_requirements(widget: Union[BaseWidget, WidgetDescriptor]) -> FrozenSet[Capability]:
+    """
+    Get the capabilities a widget requires.
+
+    Args:
+        widget: Widget instance or descriptor
+
+    Returns:
+        Set of (kind, name) capabilities; empty if the widget declares none
+    """
+    if isinstance(widget, WidgetDescriptor):
+        measures, dimensions, grains = widget.measures, widget.dimensions, widget.grains
+    else:
+        measures = widget.get_required_measures()
+        dimensions = widget.get_required_dimensions()
+        grains = widget.get_required_grains()
+    return frozenset(
+        [('measure', _normalize(name)) for name in measures]
+        + [('dimension', _normalize(name)) for name in dimensions]
+        + [('grain', _normalize(name)) for name in grains]
+    )
+
+
+def data_capabilities(data: Any) -> FrozenSet[Capability]:
+    """
+    Describe the schema of processed report data as capabilities.
+
+    Measures are the additive numeric columns of the fact tables,
+    dimensions the other columns, and grains those the time indexes can
+    answer (hourly grains only when timestamps carry a time of day).
+
+    Args:
+        data: Processed report data (a FactStore)
+
+    Returns:
+        Set of (kind, name) capabilities
+    """
+    # The data layer is only needed once a report's data exists
+    from ..data.store import PROVENANCE_COLUMN, is_additive_measure
+    from ..data.timeindex import GRAINS
+
+    capabilities: Set[Capability] = set()
+    for table in getattr(data, 'tables', {}).values():
+        for col in table.column_names:
+            if col == PROVENANCE_COLUMN:
+                continue
+            if col not in table.date_columns and is_additive_measure(col, table.column(col)):
+                capabilities.add(('measure', _normalize(col)))
+            else:
+                capabilities.add(('dimension', _normalize(col)))
+
+    for time_index in getattr(data, 'time_indexes', {}).values():
+        if not len(time_index.times):
+            continue
+        capabilities.update(
+            ('grain', grain) for grain in GRAINS if time_index.intraday or grain not in _INTRADAY_GRAINS
+        )
+    return frozenset(capabilities)
+
 
 class WidgetRegistry:
     """
     Registry for managing and accessing available widgets.
     """
     
-    def __init__(self):
-        """Initialize the widget registry."""
-        self._widgets: Dict[str, BaseWidget] = {}
+    def __init__(
+        self,
+        manifest: Optional[Union[str, Path]] = None,
+        entry_points: bool = True
+    ):
+        """
+        Initialize the widget registry.
+        
+        Args:
+            manifest: JSON manifest of additional widgets
+            entry_points: Discover widgets advertised by installed packages
+                (looked up the first time an unknown widget or the full
+                catalogue is requested)
+        """
+        # Widget instances, or descriptors of widgets not imported yet
+        self._widgets: Dict[str, Union[BaseWidget, WidgetDescriptor]] = {}
+        self._requirements: Dict[str, FrozenSet[Capability]] = {}
+        self._index: Dict[Capability, Set[str]] = {}
+        self._selections: Dict[FrozenSet[Capability], Set[str]] = {}
+        self._discovered = not entry_points
         self._load_default_widgets()
+        if manifest is not None:
+            for descriptor in load_manifest(manifest):
+                self.register_descriptor(descriptor)
     
     def register_widget(self, widget: BaseWidget) -> None:
         """
@@ -27,9 +129,37 @@ class WidgetRegistry:
         Args:
             widget: Widget instance to register
         """
-        self._widgets[widget.name] = widget
+        self._add(widget.name, widget)
         logger.debug(f"Registered widget: {widget.name}")
     
+    def register_descriptor(self, descriptor: WidgetDescriptor) -> None:
+        """
+        Register a widget to be imported when first requested.
+        
+        Args:
+            descriptor: Widget descriptor (replaces a widget of the same name)
+        """
+        self._add(descriptor.name, descriptor)
+        logger.debug(f"Registered widget descriptor: {descriptor.name} -> {descriptor.target}")
+    
+    def _add(self, name: str, widget: Union[BaseWidget, WidgetDescriptor]) -> None:
+        """Store a widget or descriptor and index its requirements."""
+        self._unindex(name)
+        self._widgets[name] = widget
+        requirements = widget_requirements(widget)
+        if requirements:
+            self._requirements[name] = requirements
+            for capability in requirements:
+                self._index.setdefault(capability, set()).add(name)
+        self._selections.clear()
+    
+    def _unindex(self, name: str) -> None:
+        """Drop a widget's entries from the capability index."""
+        for capability in self._requirements.pop(name, ()):
+            self._index[capability].discard(name)
+            if not self._index[capability]:
+                del self._index[capability]
+    
     def get_widget(self, name: str) -> Optional[BaseWidget]:
         """
         Get a widget by name.
@@ -38,82 +168,116 @@ class WidgetRegistry:
             name: Name of the widget
             
         Returns:
-            Widget instance or None if not found
+            Widget instance (imported now if it was only described) or
+            None if not found or it failed to load
         """
-        return self._widgets.get(name)
+        if name not in self._widgets:
+            self._discover()
+        widget = self._widgets.get(name)
+        if not isinstance(widget, WidgetDescriptor):
+            return widget
+        
+        try:
+            loaded = widget.load()
+        except ImportError as e:
+            logger.warning(f"Could not load widget {name} ({e}); using a placeholder")
+            from .placeholders import PlaceholderWidget
+            loaded = PlaceholderWidget(name)
+        except Exception as e:
+            logger.error(f"Error loading widget {name} from {widget.target}: {e}")
+            return None
+        self.register_widget(loaded)
+        return loaded
+    
+    def is_loaded(self, name: str) -> bool:
+        """
+        Check whether a widget has been imported.
+        
+        Args:
+            name: Name of the widget
+            
+        Returns:
+            True if the registry holds an instance of the widget
+        """
+        return isinstance(self._widgets.get(name), BaseWidget)
     
     def list_widgets(self) -> List[str]:
         """
-        Get list of all registered widget names.
+        Get list of all registered widget names, without importing them.
         
         Returns:
             List of widget names
         """
+        self._discover()
         return list(self._widgets.keys())
     
-    def get_widgets_for_data(self, data: Dict) -> List[str]:
+    def _discover(self) -> None:
+        """Add the widgets of installed plugins, once."""
+        if self._discovered:
+            return
+        self._discovered = True
+        try:
+            descriptors = discover_entry_points()
+        except Exception as e:
+            logger.warning(f"Could not discover widget plugins: {e}")
+            return
+        for descriptor in descriptors:
+            # Widgets registered explicitly take precedence over plugins
+            if descriptor.name not in self._widgets:
+                self.register_descriptor(descriptor)
+    
+    def get_widgets_for_data(self, data: Dict, names: Optional[Iterable[str]] = None) -> List[str]:
         """
         Get list of widgets that can render with the provided data.
         
+        Widgets with declared requirements are matched against the data's
+        capabilities; the others are probed with can_render().
+        
         Args:
             data: Data dictionary
+            names: Only consider these widgets (None for all registered)
             
         Returns:
-            List of widget names that can render
+            List of widget names that can render, in registration order
+            (or the order of ``names``)
         """
+        indexed = self.get_widgets_for_schema(data_capabilities(data)) if hasattr(data, 'tables') else None
+        candidates = self.list_widgets() if names is None else names
         compatible_widgets = []
-        for name, widget in self._widgets.items():
-            if widget.can_render(data):
+        for name in candidates:
+            if indexed is not None and name in self._requirements:
+                if name in indexed:
+                    compatible_widgets.append(name)
+                continue
+            widget = self.get_widget(name)
+            if widget is not None and widget.can_render(data):
                 compatible_widgets.append(name)
         return compatible_widgets
     
-    def _load_default_widgets(self) -> None:
-        """Load default widgets into the registry."""
-        # Import and register default widgets
-        try:
-            from .kpi_widgets import ToplineKPIGrid, BudgetPacingMeter
-            from .chart_widgets import CTROverTime, ImpsClicksOverTime, DailySpendChart
-            from .table_widgets import PlacementPerformanceTable
-            from .comparison_widgets import CreativeComparison
-            
-            # Register all default widgets
-            default_widgets = [
-                ToplineKPIGrid(),
-                BudgetPacingMeter(),
-                CTROverTime(),
-                ImpsClicksOverTime(),
-                DailySpendChart(),
-                PlacementPerformanceTable(),
-                CreativeComparison()
-            ]
-            
-            for widget in default_widgets:
-                self.register_widget(widget)
-                
-            logger.info(f"Loaded {len(default_widgets)} default widgets")
+    def get_widgets_for_schema(self, capabilities: FrozenSet[Capability]) -> Set[str]:
+        """
+        Get the widgets with declared requirements a schema satisfies.
+        
+        Args:
+            capabilities: Capabilities of the data (see data_capabilities)
             
-        except ImportError as e:
-            logger.warning(f"Could not load some default widgets: {e}")
-            # Create placeholder widgets for now
-            self._create_placeholder_widgets()
+        Returns:
+            Names of the widgets whose requirements are all met
+        """
+        selection = self._selections.get(capabilities)
+        if selection is None:
+            # Count, per widget, how many of its requirements the schema offers
+            matched: Counter = Counter()
+            for capability in capabilities:
+                matched.update(self._index.get(capability, ()))
+            selection = {
+                name for name, count in matched.items() if count == len(self._requirements[name])
+            }
+            self._selections[capabilities] = selection
+        return selection
     
-    def _create_placeholder_widgets(self) -> None:
-        """Create placeholder widgets for development."""
-        from .placeholders import PlaceholderWidget
-        
-        widget_names = [
-            "topline_kpi_grid",
-            "budget_pacing_meter", 
-            "ctr_over_time",
-            "imps_clicks_over_time",
-            "daily_spend_chart",
-            "placement_performance_table",
-            "creative_comparison",
-            "session_engagement_chart"
-        ]
-        
-        for name in widget_names:
-            widget = PlaceholderWidget(name)
-            self.register_widget(widget)
-        
-        logger.info(f"Created {len(widget_names)} placeholder widgets")
\ No newline at end of file
+    def _load_default_widgets(self) -> None:
+        """Register the built-in widgets as descriptors."""
+        for descriptor in DEFAULT_WIDGETS:
+            self.register_descriptor(descriptor)
+        logger.debug(f"Registered {len(DEFAULT_WIDGETS)} default widget descriptors")
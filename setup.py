@@ -21,6 +21,7 @@ else:
         "numpy>=1.24.0",
         "openpyxl>=3.1.0",
         "PyPDF2>=3.0.0",
+        "ijson>=3.1.0",
         "plotly>=5.15.0",
         "matplotlib>=3.7.0",
         "seaborn>=0.12.0",
@@ -55,12 +56,15 @@ setup(
     install_requires=requirements,
     extras_require={
         "pdf": ["weasyprint>=59.0"],
+        "arrow": ["pyarrow>=12.0.0"],
+        "json": ["ijson>=3.2.0", "orjson>=3.9.0"],
         "dev": [
             "pytest>=7.4.0",
             "pytest-cov>=4.1.0",
             "black>=23.7.0",
             "flake8>=6.0.0",
             "mypy>=1.5.0",
+            "pyarrow>=12.0.0",
         ],
         "docs": [
             "sphinx>=7.1.0",
@@ -0,0 +1,109 @@
+"""
+Shared fixtures for the test suite.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class MockApiState:
+    """Request log and knobs of the mock ad-platform API."""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failures = {}
+        self.delay = 0.0
+        self.next_base = ''
+    
+    def fail(self, path, times, status=503):
+        """Make the next ``times`` requests to a path fail with ``status``."""
+        self.failures[path] = [status] * times
+
+
+def _campaign_page(campaign, page, pages=3, per_page=4, next_base=''):
+    start = (page - 1) * per_page
+    body = {
+        'data': [
+            {'Date': f'2025-07-{day + 1:02d}', 'Campaign': campaign, 'Clicks': day, 'Impressions': day * 100}
+            for day in range(start, start + per_page)
+        ]
+    }
+    if page < pages:
+        body['next'] = f'{next_base}/campaigns/{campaign}/stats?page={page + 1}'
+    return body
+
+
+class MockApiHandler(BaseHTTPRequestHandler):
+    """
+    Serves ``/campaigns/<id>/stats?page=N`` as three pages of four daily
+    records, with a stable ETag per page.
+    """
+    
+    state = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_GET(self):
+        state = self.state
+        path, _, query = self.path.partition('?')
+        with state.lock:
+            state.requests.append((self.path, self.headers.get('If-None-Match')))
+            state.in_flight += 1
+            state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            pending = state.failures.get(path)
+            failure = pending.pop(0) if pending else None
+        
+        try:
+            time.sleep(state.delay)
+            if failure is not None:
+                self.send_response(failure)
+                self.end_headers()
+                return
+            
+            parts = path.strip('/').split('/')
+            if len(parts) != 3 or parts[0] != 'campaigns' or parts[2] != 'stats':
+                self.send_response(404)
+                self.end_headers()
+                return
+            
+            page = int(dict(item.split('=') for item in query.split('&') if item).get('page', 1))
+            etag = f'"{parts[1]}-{page}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            
+            body = json.dumps(_campaign_page(parts[1], page, next_base=state.next_base)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with state.lock:
+                state.in_flight -= 1
+
+
+@pytest.fixture
+def mock_api():
+    """Run the mock API on a local port; yields (base URL, state)."""
+    state = MockApiState()
+    handler = type('Handler', (MockApiHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}', state
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,1324 @@
+"""
+Tests for the DataProcessor class and the columnar fact store.
+"""
+
+import pytest
+from pathlib import Path
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from arloai_reporting.data.ga4 import is_ga4_export
+from arloai_reporting.data import DataProcessor, FactStore, FactTable
+
+
+def _campaign_frame() -> pd.DataFrame:
+    """Build a small campaign delivery frame."""
+    return pd.DataFrame({
+        'Date': pd.to_datetime(['2025-07-07', '2025-07-07', '2025-07-08', '2025-07-08']),
+        'Creative': ['Banner A', 'Banner B', 'Banner A', 'Banner B'],
+        'Impressions': [1000, 2000, 1500, 2500],
+        'Clicks': [10, 15, 12, 30],
+        'Spend': [6.5, 13.0, 9.75, 16.25]
+    })
+
+
+@pytest.fixture
+def campaign_csv(tmp_path):
+    """Write the campaign frame to a CSV file."""
+    path = tmp_path / "campaign.csv"
+    _campaign_frame().to_csv(path, index=False)
+    return path
+
+
+class TestFactStore:
+    """Test cases for the columnar fact store."""
+    
+    def test_process_sources_returns_fact_store(self, campaign_csv):
+        """Test that processed sources are held as typed columns."""
+        data = DataProcessor().process_sources([campaign_csv])
+        
+        assert isinstance(data, FactStore)
+        table = data.table("campaign")
+        assert isinstance(table, FactTable)
+        assert table.num_rows == 4
+        assert np.issubdtype(table.column("Impressions").dtype, np.integer)
+        assert isinstance(table.column("Creative"), pd.Categorical)
+        assert table.date_columns == ["Date"]
+    
+    def test_column_access_does_not_copy(self):
+        """Test that column slices share memory with the table."""
+        table = FactTable.from_dataframe(_campaign_frame(), "campaign")
+        store = FactStore(tables={"campaign": table})
+        
+        assert store.column("campaign", "Clicks") is table.column("Clicks")
+        assert np.shares_memory(table.to_frame(["Clicks"])["Clicks"].to_numpy(), table.column("Clicks"))
+    
+    def test_time_series_compatibility_view(self, campaign_csv):
+        """Test that the legacy time_series shape is still available."""
+        data = DataProcessor().process_sources([campaign_csv])
+        
+        assert list(data['time_series']) == ["campaign_Date"]
+        series = data['time_series']["campaign_Date"]
+        assert len(series['dates']) == 4
+        assert series['data'][0] == {
+            'Creative': 'Banner A', 'Impressions': 1000, 'Clicks': 10, 'Spend': 6.5
+        }
+        assert data['metrics']["campaign"]['Clicks']['count'] == 4
+        assert data['dimensions']["campaign_Creative"] == {'Banner A': 2, 'Banner B': 2}
+
+
+class TestParallelIngestion:
+    """Test cases for process-pool ingestion."""
+    
+    def test_parallel_matches_serial(self, tmp_path):
+        """Test that parallel ingestion merges sources in input order."""
+        sources = []
+        for index in range(3):
+            path = tmp_path / f"flight_{index}.csv"
+            _campaign_frame().assign(Clicks=index).to_csv(path, index=False)
+            sources.append(path)
+        
+        serial = DataProcessor().process_sources(sources)
+        parallel = DataProcessor(max_workers=2, source_timeout=60).process_sources(sources)
+        
+        assert list(parallel.tables) == list(serial.tables)
+        assert parallel['metrics'] == serial['metrics']
+        assert list(parallel['metadata']['source_timings']) == [str(path) for path in sources]
+        assert all(elapsed is not None for elapsed in parallel['metadata']['source_timings'].values())
+
+
+class TestSourceCache:
+    """Test cases for the parsed-source cache."""
+    
+    def test_unchanged_source_is_served_from_cache(self, campaign_csv, tmp_path):
+        """Test that a second run loads the source from the cache."""
+        processor = DataProcessor(cache_dir=tmp_path / "cache")
+        first = processor.process_sources([campaign_csv])
+        index = (tmp_path / "cache" / "index.json").read_text()
+        second = processor.process_sources([campaign_csv])
+        
+        # Hits don't rewrite the index
+        assert (tmp_path / "cache" / "index.json").read_text() == index
+        assert processor.cache.stats()['misses'] == 1
+        assert processor.cache.stats()['hits'] == 1
+        assert second['metrics'] == first['metrics']
+        assert np.array_equal(second.column("campaign", "Clicks"), first.column("campaign", "Clicks"))
+    
+    def test_changed_source_misses(self, campaign_csv, tmp_path):
+        """Test that editing a source invalidates its entry."""
+        processor = DataProcessor(cache_dir=tmp_path / "cache")
+        processor.process_sources([campaign_csv])
+        
+        _campaign_frame().assign(Clicks=0).to_csv(campaign_csv, index=False)
+        data = processor.process_sources([campaign_csv])
+        
+        assert processor.cache.stats()['hits'] == 0
+        assert data.column("campaign", "Clicks").sum() == 0
+    
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used entry is evicted over the size cap."""
+        sources = []
+        for index in range(3):
+            path = tmp_path / f"flight_{index}.csv"
+            _campaign_frame().assign(Clicks=index).to_csv(path, index=False)
+            sources.append(path)
+        
+        processor = DataProcessor(cache_dir=tmp_path / "cache")
+        processor.process_sources(sources[:1])
+        entry_size = processor.cache.stats()['bytes']
+        processor.cache.max_bytes = entry_size * 2
+        processor.process_sources(sources[1:])
+        
+        stats = processor.cache.stats()
+        assert stats['evictions'] == 1
+        assert stats['entries'] == 2
+    
+    def test_engine_exposes_cache_stats(self, campaign_csv, tmp_path):
+        """Test that the engine reports cache statistics."""
+        from arloai_reporting import ReportEngine
+        
+        engine = ReportEngine(cache_dir=tmp_path / "cache")
+        engine.generate_report("mid_campaign", [campaign_csv])
+        engine.generate_report("mid_campaign", [campaign_csv])
+        
+        assert engine.cache_stats['hits'] == 1
+        assert ReportEngine().cache_stats == {}
+    
+    def test_entries_load_without_pickle(self, campaign_csv, tmp_path, monkeypatch):
+        """Test that entries are stored as column files and load without unpickling."""
+        import pickle
+        
+        first = DataProcessor(cache_dir=tmp_path / "cache").process_sources([campaign_csv])
+        assert list((tmp_path / "cache").glob("*/*.npy"))
+        assert not list((tmp_path / "cache").glob("**/*.pkl"))
+        
+        monkeypatch.setattr(pickle, "load", None)
+        monkeypatch.setattr(pickle, "loads", None)
+        processor = DataProcessor(cache_dir=tmp_path / "cache")
+        second = processor.process_sources([campaign_csv])
+        
+        assert processor.cache.stats()['hits'] == 1
+        assert second['metrics'] == first['metrics']
+        assert second['dimensions'] == first['dimensions']
+        assert list(second.tables) == list(first.tables)
+        for col in first.tables["campaign"].columns:
+            assert np.array_equal(np.asarray(second.column("campaign", col)),
+                                  np.asarray(first.column("campaign", col)))
+    
+    def test_shared_cache_dir_keeps_entries_of_both_instances(self, tmp_path):
+        """Test that caches sharing a directory merge rather than overwrite the index."""
+        from arloai_reporting.data.cache import SourceCache
+        
+        sources = []
+        for index in range(2):
+            path = tmp_path / f"flight_{index}.csv"
+            _campaign_frame().assign(Clicks=index).to_csv(path, index=False)
+            sources.append(path)
+        
+        first, second = SourceCache(tmp_path / "cache"), SourceCache(tmp_path / "cache")
+        first.put(sources[0], {'metrics': {'Clicks': 0}})
+        second.put(sources[1], {'metrics': {'Clicks': 1}})
+        
+        reopened = SourceCache(tmp_path / "cache")
+        assert reopened.stats()['entries'] == 2
+        assert reopened.get(sources[0]) == {'metrics': {'Clicks': 0}}
+    
+    def test_file_records_of_deleted_sources_are_pruned(self, tmp_path):
+        """Test that the digest memo doesn't keep sources that no longer exist."""
+        from arloai_reporting.data.cache import SourceCache
+        
+        gone, kept = tmp_path / "gone.csv", tmp_path / "kept.csv"
+        _campaign_frame().to_csv(gone, index=False)
+        _campaign_frame().assign(Clicks=0).to_csv(kept, index=False)
+        
+        cache = SourceCache(tmp_path / "cache")
+        cache.put(gone, {'metrics': {}})
+        gone.unlink()
+        cache.put(kept, {'metrics': {}})
+        
+        assert list(SourceCache(tmp_path / "cache")._index['files']) == [str(kept.resolve())]
+
+
+class TestStreamingIngestion:
+    """Test cases for batched Excel and CSV ingestion."""
+    
+    @pytest.fixture
+    def campaign_xlsx(self, tmp_path):
+        """Write the campaign frame to a two-sheet workbook."""
+        path = tmp_path / "campaign.xlsx"
+        with pd.ExcelWriter(path) as writer:
+            _campaign_frame().to_excel(writer, sheet_name="Data", index=False)
+            _campaign_frame().drop(columns=["Date"]).to_excel(writer, sheet_name="Totals", index=False)
+        return path
+    
+    def test_streaming_matches_full_read(self, campaign_xlsx):
+        """Test that batched summaries match the whole-workbook path."""
+        full = DataProcessor().process_sources([campaign_xlsx])
+        streamed = DataProcessor(streaming=True, batch_size=3).process_sources([campaign_xlsx])
+        
+        assert list(streamed.tables) == ["Data", "Totals"]
+        assert streamed['dimensions'] == full['dimensions']
+        for col, summary in streamed['metrics']["Data"].items():
+            for stat in ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']:
+                assert summary[stat] == pytest.approx(full['metrics']["Data"][col][stat])
+        
+        table = streamed.table("Data")
+        assert table.num_rows == 4
+        assert list(table.column("Creative")) == list(full.table("Data").column("Creative"))
+        assert np.array_equal(table.column("Spend"), full.table("Data").column("Spend"))
+    
+    def test_streaming_without_rows_keeps_summaries(self, campaign_xlsx):
+        """Test that summary-only streaming drops row-level tables."""
+        data = DataProcessor(streaming=True, batch_size=2, retain_rows=False).process_sources([campaign_xlsx])
+        
+        assert data.tables == {}
+        assert data['metrics']["Totals"]['Impressions']['count'] == 4
+        assert data['dimensions']["Totals_Creative"] == {'Banner A': 2, 'Banner B': 2}
+    
+    def test_chunked_csv_matches_full_read(self, campaign_csv):
+        """Test that chunked CSV statistics match describe()/value_counts()."""
+        full = DataProcessor().process_sources([campaign_csv])
+        streamed = DataProcessor(streaming=True, batch_size=3).process_sources([campaign_csv])
+        
+        assert streamed['dimensions'] == full['dimensions']
+        for col, summary in streamed['metrics']["campaign"].items():
+            for stat in ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']:
+                assert summary[stat] == pytest.approx(full['metrics']["campaign"][col][stat])
+        assert streamed.table("campaign").num_rows == 4
+    
+    def test_running_stats_merge(self):
+        """Test that merged Welford accumulators match a single pass."""
+        from arloai_reporting.data.streaming import RunningStats
+        
+        values = np.random.default_rng(7).normal(1e6, 250.0, size=10_001)
+        left, right = RunningStats(), RunningStats()
+        left.update(values[:3_000])
+        right.update(values[3_000:])
+        left.merge(right)
+        
+        summary = left.to_dict()
+        assert summary['count'] == values.size
+        assert summary['mean'] == pytest.approx(values.mean())
+        assert summary['std'] == pytest.approx(values.std(ddof=1))
+        assert summary['max'] == values.max()
+        # More values than the quartile sample holds
+        assert summary['50%'] == pytest.approx(np.median(values), abs=10.0)
+        assert summary['25%'] < summary['50%'] < summary['75%']
+
+
+class TestColumnProjection:
+    """Test cases for column projection pushdown."""
+    
+    def test_projection_limits_columns(self, campaign_csv):
+        """Test that only projected columns are read."""
+        data = DataProcessor().process_sources([campaign_csv], columns=["date", "Clicks"])
+        
+        assert data.table("campaign").column_names == ["Date", "Clicks", "_source"]
+        assert list(data['metrics']["campaign"]) == ["Clicks"]
+        assert data['dimensions'] == {}
+    
+    def test_streaming_projection_skips_unused_sheets(self, tmp_path):
+        """Test that sheets without projected columns are skipped."""
+        path = tmp_path / "campaign.xlsx"
+        with pd.ExcelWriter(path) as writer:
+            _campaign_frame().to_excel(writer, sheet_name="Data", index=False)
+            pd.DataFrame({'Note': ['n/a']}).to_excel(writer, sheet_name="Info", index=False)
+        
+        for processor in [DataProcessor(), DataProcessor(streaming=True)]:
+            data = processor.process_sources([path], columns=["Date", "Impressions", "Spend"])
+            assert list(data.tables) == ["Data"]
+            assert data.table("Data").column_names == ["Date", "Impressions", "Spend", "_source"]
+
+
+class TestIncrementalIngestion:
+    """Test cases for incremental daily ingestion."""
+    
+    def test_cumulative_files_are_not_double_counted(self, tmp_path):
+        """Test that overlapping (Date, Creative) keys replace stored values."""
+        frame = _campaign_frame()
+        day_one = tmp_path / "sample-data-20250707.csv"
+        frame.iloc[:2].to_csv(day_one, index=False)
+        
+        # The next export restates 07-07 for Banner B and adds 07-08
+        restated = frame.copy()
+        restated.loc[1, 'Clicks'] = 20
+        day_two = tmp_path / "sample-data-20250708.csv"
+        restated.to_csv(day_two, index=False)
+        
+        processor = DataProcessor(state_dir=tmp_path / "state")
+        processor.process_sources([day_one], campaign_id="superflash")
+        data = processor.process_sources([day_one, day_two], campaign_id="superflash")
+        
+        assert data['metadata']['incremental']['folded_rows'] == 4
+        assert data['metrics']["superflash_totals"]['Clicks']['sum'] == 10 + 20 + 12 + 30
+        assert data['metrics']["superflash_totals"]['Impressions']['sum'] == frame['Impressions'].sum()
+        daily = data.table("superflash_daily")
+        assert list(daily.column("Clicks")) == [30, 42]
+        by_creative = data.table("superflash_by_creative")
+        assert list(by_creative.column("Creative")) == ['Banner A', 'Banner B']
+    
+    def test_overlapping_exports_in_one_run_are_not_double_counted(self, tmp_path):
+        """Test that cumulative exports folded in one run match folding them run by run."""
+        frame = _campaign_frame()
+        day_one = tmp_path / "sample-data-20250707.csv"
+        frame.iloc[:2].to_csv(day_one, index=False)
+        restated = frame.copy()
+        restated.loc[1, 'Clicks'] = 20
+        day_two = tmp_path / "sample-data-20250708.csv"
+        restated.to_csv(day_two, index=False)
+        
+        together = DataProcessor(state_dir=tmp_path / "together").process_sources(
+            [day_one, day_two], campaign_id="superflash"
+        )
+        sequential = DataProcessor(state_dir=tmp_path / "sequential")
+        sequential.process_sources([day_one], campaign_id="superflash")
+        separate = sequential.process_sources([day_two], campaign_id="superflash")
+        
+        totals = together['metrics']["superflash_totals"]
+        assert totals == separate['metrics']["superflash_totals"]
+        assert totals['Clicks'] == {'sum': 10 + 20 + 12 + 30, 'count': 4}
+        assert list(together.table("superflash_daily").column("Clicks")) == [30, 42]
+    
+    def test_rows_before_watermark_are_skipped(self, tmp_path):
+        """Test that only rows inside the restatement window are folded."""
+        source = tmp_path / "campaign.csv"
+        _campaign_frame().to_csv(source, index=False)
+        processor = DataProcessor(state_dir=tmp_path / "state", restate_days=0)
+        processor.process_sources([source], campaign_id="superflash")
+        
+        _campaign_frame().assign(Clicks=1).to_csv(source, index=False)
+        data = processor.process_sources([source], campaign_id="superflash")
+        
+        assert data['metadata']['incremental']['folded_rows'] == 2
+        assert data['metrics']["superflash_totals"]['Clicks']['sum'] == 10 + 15 + 1 + 1
+    
+    def test_failed_sources_are_retried(self, tmp_path):
+        """Test that a source that failed to parse isn't marked folded."""
+        from arloai_reporting.data.incremental import CampaignState
+        
+        broken = tmp_path / "delivery.xlsx"
+        broken.write_bytes(b"not a workbook")
+        DataProcessor(state_dir=tmp_path / "state").process_sources([broken], campaign_id="superflash")
+        
+        assert not CampaignState.load(tmp_path / "state", "superflash").has_folded(broken)
+    
+    def test_quarantined_rows_are_not_folded(self, tmp_path):
+        """Test that rows failing validation stay out of the campaign aggregates."""
+        source = tmp_path / "campaign.csv"
+        _campaign_frame().assign(Spend=[6.5, -13.0, 9.75, 16.25]).to_csv(source, index=False)
+        
+        data = DataProcessor(state_dir=tmp_path / "state", quarantine=True).process_sources(
+            [source], campaign_id="superflash"
+        )
+        
+        assert data['metadata']['incremental']['folded_rows'] == 3
+        assert data['metrics']["superflash_totals"]['Clicks']['sum'] == 10 + 12 + 30
+    
+    def test_summary_sheet_is_not_double_counted(self, tmp_path):
+        """Test that only a workbook's detail sheet is folded, not its daily summary."""
+        frame = _campaign_frame()
+        source = tmp_path / "campaign.xlsx"
+        with pd.ExcelWriter(source) as writer:
+            frame.groupby('Date', as_index=False)[['Impressions', 'Clicks']].sum().to_excel(
+                writer, sheet_name="Summary", index=False
+            )
+            frame.to_excel(writer, sheet_name="Detail", index=False)
+        
+        data = DataProcessor(state_dir=tmp_path / "state").process_sources([source], campaign_id="superflash")
+        
+        assert data['metrics']["superflash_totals"]['Clicks']['sum'] == frame['Clicks'].sum()
+
+
+class TestCompaction:
+    """Test cases for dtype compaction."""
+    
+    def test_compaction_downcasts_and_reports_savings(self, campaign_csv):
+        """Test that counters shrink and savings are reported per source."""
+        frame = _campaign_frame()
+        frame['CTR'] = frame['Clicks'] / frame['Impressions'] * 100
+        frame.to_csv(campaign_csv, index=False)
+        
+        data = DataProcessor().process_sources([campaign_csv])
+        table = data.table("campaign")
+        
+        assert table.column("Impressions").dtype == np.int16
+        assert table.column("Clicks").dtype == np.int8
+        assert table.column("CTR").dtype == np.float32
+        assert table.column("Spend").dtype == np.float64
+        summary = data['metadata']['compaction'][str(campaign_csv)]
+        assert summary['bytes_saved'] > 0
+        assert summary['bytes_after'] == summary['bytes_before'] - summary['bytes_saved']
+    
+    def test_compaction_can_be_disabled(self, campaign_csv):
+        """Test that disabling compaction keeps reader dtypes."""
+        data = DataProcessor(compact=False).process_sources([campaign_csv])
+        
+        assert data.table("campaign").column("Impressions").dtype == np.int64
+        assert data['metadata']['compaction'] == {}
+
+
+class TestGA4Export:
+    """Test cases for the GA4 traffic-acquisition reader."""
+    
+    SAMPLE = Path(__file__).parent.parent / "examples" / "sample_data" / "sample-external-data.csv"
+    
+    def test_banner_and_grand_total_are_separated(self):
+        """Test that the banner becomes metadata and the total isn't data."""
+        data = DataProcessor().process_sources([self.SAMPLE])
+        
+        metadata = data['metadata']
+        assert metadata['source_type'] == 'ga4'
+        assert metadata['property'] == 'Frequensei.org'
+        assert metadata['date_range'] == {'start': '2025-07-07', 'end': '2025-07-10'}
+        assert metadata['grand_total']['Sessions'] == 529
+        
+        table = data.table("sample-external-data")
+        assert table.num_rows == 4
+        assert table.column("Sessions").sum() == 534
+        assert data['metrics']["sample-external-data_grand_total"]['Event count'] == {'total': 2088}
+        channel = "sample-external-data_Session primary channel group (Default channel group)"
+        assert data['dimensions'][channel]['Direct'] == 1
+    
+    def test_multi_dimension_export(self, tmp_path):
+        """Test that date and text dimensions aren't read as metrics."""
+        path = tmp_path / "ga4.csv"
+        path.write_text(
+            "# ----------------------------------------\n"
+            "# Frequensei.org\n"
+            "# Start date: 20250707\n"
+            "# End date: 20250708\n"
+            "# ----------------------------------------\n"
+            "\n"
+            "Date,Session default channel group,Sessions,Engagement rate\n"
+            ",,30,0.5,Grand total\n"
+            "20250707,Direct,10,0.4\n"
+            "20250707,Referral,5,0.6\n"
+            "20250708,Direct,15,0.5\n"
+        )
+        
+        data = DataProcessor().process_sources([path])
+        
+        assert data['metadata']['source_type'] == 'ga4'
+        assert data['metadata']['date_range'] == {'start': '2025-07-07', 'end': '2025-07-08'}
+        assert data['metadata']['grand_total'] == {'Sessions': 30, 'Engagement rate': 0.5}
+        table = data.table("ga4")
+        assert table.num_rows == 3
+        assert table.column("Sessions").sum() == 30
+        assert "Date" in table.date_columns
+        assert data['dimensions']["ga4_Session default channel group"]['Direct'] == 2
+    
+    def test_commented_csv_is_not_ga4(self, tmp_path):
+        """Test that a CSV starting with an ordinary comment is read as plain CSV."""
+        path = tmp_path / "notes.csv"
+        path.write_text("# exported by hand\nClicks,Impressions\n1,10\n")
+        
+        assert not is_ga4_export(path)
+    
+    def test_unreadable_csv_is_a_failed_source(self, tmp_path):
+        """Test that a CSV that can't be decoded yields an empty result."""
+        path = tmp_path / "binary.csv"
+        path.write_bytes(b"\xff\xfe\x00\x81" * 16)
+        
+        data = DataProcessor().process_sources([path])
+        
+        assert data.tables == {}
+
+
+class TestSourceMerge:
+    """Test cases for the key-aware merge of overlapping sources."""
+    
+    def test_overlapping_sources_are_deduplicated(self, tmp_path):
+        """Test that same-named tables are concatenated and deduplicated."""
+        first, second = tmp_path / "day_one", tmp_path / "day_two"
+        first.mkdir()
+        second.mkdir()
+        frame = _campaign_frame()
+        frame.iloc[:3].to_csv(first / "campaign.csv", index=False)
+        restated = frame.copy()
+        restated.loc[2, 'Clicks'] = 99
+        restated.iloc[2:].to_csv(second / "campaign.csv", index=False)
+        
+        data = DataProcessor().process_sources([first / "campaign.csv", second / "campaign.csv"])
+        
+        table = data.table("campaign")
+        assert table.num_rows == 4
+        assert list(table.column("Clicks")) == [10, 15, 99, 30]
+        assert list(table.column("_source")) == [str(first / "campaign.csv")] * 2 + [str(second / "campaign.csv")] * 2
+        assert data['metrics']["campaign"]['Clicks']['count'] == 4
+        assert data['dimensions']["campaign_Creative"] == {'Banner A': 2, 'Banner B': 2}
+        assert data['metadata']['merge']["campaign"]['duplicates_dropped'] == 1
+        assert data['metadata']['merge']["campaign"]['keys'] == ['Date', 'Creative']
+        assert '_source' not in data['time_series']["campaign_Date"]['data'][0]
+
+
+class TestArrowSources:
+    """Test cases for Arrow IPC/Feather and Parquet inputs."""
+    
+    def test_arrow_ipc_is_memory_mapped(self, tmp_path):
+        """Test that numeric columns view the mapped file without copying."""
+        pytest.importorskip("pyarrow")
+        import pyarrow.feather as feather
+        
+        path = tmp_path / "extract.arrow"
+        feather.write_feather(_campaign_frame(), path, compression="uncompressed")
+        
+        data = DataProcessor().process_sources([path])
+        clicks = data.column("extract", "Clicks")
+        
+        assert not clicks.flags.owndata
+        assert list(clicks) == [10, 15, 12, 30]
+        assert isinstance(data.column("extract", "Creative"), pd.Categorical)
+        assert data['metrics']["extract"]['Impressions']['max'] == 2500
+        assert data['dimensions']["extract_Creative"] == {'Banner A': 2, 'Banner B': 2}
+    
+    def test_parquet_prunes_columns_and_row_groups(self, tmp_path):
+        """Test that projection and filters limit what is read."""
+        pytest.importorskip("pyarrow")
+        
+        path = tmp_path / "extract.parquet"
+        _campaign_frame().to_parquet(path, row_group_size=2, index=False)
+        processor = DataProcessor(parquet_filters=[('Date', '>=', pd.Timestamp('2025-07-08'))])
+        
+        data = processor.process_sources([path], columns=["Date", "Clicks"])
+        
+        table = data.table("extract")
+        assert table.column_names == ["Date", "Clicks", "_source"]
+        assert list(table.column("Clicks")) == [12, 30]
+    
+    def test_dictionary_chunks_with_different_dictionaries(self):
+        """Test that a dictionary column split across chunks decodes to one Categorical."""
+        pa = pytest.importorskip("pyarrow")
+        from arloai_reporting.data.arrow import arrow_to_fact_table
+        
+        creative = pa.chunked_array([
+            pa.array(["Banner A", "Banner B"]).dictionary_encode(),
+            pa.array(["Banner C", "Banner A"]).dictionary_encode()
+        ])
+        table = arrow_to_fact_table(pa.table({"Creative": creative}), "extract")
+        
+        assert list(table.column("Creative")) == ["Banner A", "Banner B", "Banner C", "Banner A"]
+    
+    def test_timezone_aware_timestamps_keep_their_zone(self):
+        """Test that tz-aware timestamps aren't read as naive UTC."""
+        pa = pytest.importorskip("pyarrow")
+        from arloai_reporting.data.arrow import arrow_to_fact_table
+        
+        stamps = pd.date_range("2025-07-07 09:00", periods=2, freq="h", tz="America/New_York")
+        table = arrow_to_fact_table(pa.table({"Date": pa.array(stamps)}), "extract")
+        
+        assert list(pd.DatetimeIndex(table.column("Date"))) == list(stamps)
+
+
+class TestPdfExtraction:
+    """Test cases for KPI extraction from insight-report PDFs."""
+    
+    SAMPLE = Path(__file__).parent.parent / "examples" / "sample_data" / "sample-overview.pdf"
+    
+    def test_page_range_parsing(self):
+        """Test one-based, inclusive page ranges."""
+        from arloai_reporting.data.pdf import parse_page_range
+        
+        assert parse_page_range(None, 3) == [0, 1, 2]
+        assert parse_page_range("1-2,5,7-", 8) == [0, 1, 4, 6, 7]
+        assert parse_page_range((2, None), 4) == [1, 2, 3]
+        assert parse_page_range([1, 9], 4) == [0]
+    
+    def test_kpis_and_breakdown_rows(self):
+        """Test that headline figures and daily rows are extracted."""
+        pytest.importorskip("PyPDF2")
+        
+        data = DataProcessor(pdf_pages="1-3").process_sources([self.SAMPLE])
+        
+        kpis = data['metrics']["sample-overview_kpis"]
+        assert kpis["Total Impressions Delivered"] == {'value': 74638.0}
+        assert kpis["Overall CTR"] == {'value': 3.95}
+        
+        rows = data.table("sample-overview").to_frame()
+        assert len(rows) == 6
+        assert rows["Impressions"].sum() == 74638
+        assert rows["Date"].min() == pd.Timestamp("2025-07-07")
+        assert data['metadata']['pages'] == [1, 2, 3]
+    
+    def test_pages_are_cached_by_document(self, tmp_path, monkeypatch):
+        """Test that pages read before are not extracted again."""
+        pytest.importorskip("PyPDF2")
+        from arloai_reporting.data import pdf
+        
+        DataProcessor(cache_dir=tmp_path, pdf_pages="1-3").process_sources([self.SAMPLE])
+        
+        extracted = []
+        original = pdf.extract_page_texts
+        monkeypatch.setattr(
+            pdf, "extract_page_texts",
+            lambda path, indices: extracted.extend(indices) or original(path, indices)
+        )
+        processor = DataProcessor(cache_dir=tmp_path)
+        result = processor.process_pdf(str(self.SAMPLE), page_range="2-4")
+        
+        assert [page['page_number'] for page in result['pages']] == [2, 3, 4]
+        assert extracted == [3]
+        # One entry per document, and page lookups aren't source hits or misses
+        assert processor.cache.stats()['entries'] == 2
+        assert processor.cache.stats()['hits'] == processor.cache.stats()['misses'] == 0
+    
+    def test_cached_page_range_does_not_open_the_document(self, tmp_path, monkeypatch):
+        """Test that a page range read before is served without parsing the PDF."""
+        pytest.importorskip("PyPDF2")
+        from arloai_reporting.data import pdf
+        
+        processor = DataProcessor(cache_dir=tmp_path, pdf_pages="1-2")
+        processor.process_sources([self.SAMPLE])
+        
+        def fail(*args):
+            raise AssertionError("PDF opened")
+        
+        monkeypatch.setattr(pdf, "count_pages", fail)
+        monkeypatch.setattr(pdf, "extract_page_texts", fail)
+        page_indices, texts = pdf.extract_pages(self.SAMPLE, "1-2", cache=processor.cache)
+        
+        assert page_indices == [0, 1]
+        assert sorted(texts) == [0, 1]
+    
+    def test_pages_from_workers_are_cached_by_the_parent(self, tmp_path):
+        """Test that pages extracted in ingestion workers land in the parent's cache index."""
+        pytest.importorskip("PyPDF2")
+        from arloai_reporting.data.pdf import PAGES_VARIANT
+        
+        sources = [self.SAMPLE, self.SAMPLE.parent / "muzit-ui-sample-02.pdf"]
+        processor = DataProcessor(cache_dir=tmp_path, max_workers=2, pdf_pages="1-2")
+        processor.process_sources(sources)
+        
+        for source in sources:
+            assert 0 in processor.cache.get(source, PAGES_VARIANT, record_stats=False)['pages']
+        # No entry file on disk is missing from the index
+        assert processor.cache.stats()['entries'] == len(list(tmp_path.glob("*/entry.json")))
+    
+    def test_kpis_need_label_value_lines(self):
+        """Test that figures inside sentences, dates and addresses aren't taken for KPIs."""
+        pytest.importorskip("PyPDF2")
+        from arloai_reporting.data.pdf import extract_kpis
+        
+        muzit = self.SAMPLE.parent / "muzit-ui-sample-02.pdf"
+        assert DataProcessor().process_sources([muzit])['metrics'].get("muzit-ui-sample-02_kpis") is None
+        
+        kpis = extract_kpis(
+            "•Address: 10101 West Innovation Drive •Budget: $10,000\n"
+            "Location: United StatesTime range: 2025-08-01 to: 2025-08-31    Daily Average: 18,660"
+        )
+        assert kpis == {'Budget': 10000.0, 'Daily Average': 18660.0}
+
+
+class TestJsonIngestion:
+    """Test cases for streaming JSON and NDJSON ingestion."""
+    
+    def test_time_series_are_read_into_columns(self, tmp_path):
+        """Test that time series records land in column batches."""
+        import json
+        
+        path = tmp_path / "dump.json"
+        path.write_text(json.dumps({
+            'metrics': {'campaign': {'Clicks': {'mean': 1.5}}},
+            'metadata': {'platform': 'dsp'},
+            'time_series': {
+                'campaign_Date': {
+                    'dates': ['2025-07-07', '2025-07-08', '2025-07-09'],
+                    'data': [
+                        {'Clicks': 1, 'Creative': 'A'},
+                        {'Clicks': 2, 'Creative': 'B', 'Targeting': {'geo': 'Boston'}},
+                        {'Clicks': 3, 'Creative': 'A'}
+                    ]
+                }
+            }
+        }))
+        
+        data = DataProcessor(batch_size=2).process_sources([path])
+        
+        table = data['time_series']._extra['campaign_Date']
+        assert isinstance(table, FactTable)
+        assert list(table.column('Clicks')) == [1, 2, 3]
+        assert isinstance(table.column('Creative'), pd.Categorical)
+        
+        legacy = data['time_series']['campaign_Date']
+        assert legacy['dates'] == ['2025-07-07', '2025-07-08', '2025-07-09']
+        assert legacy['data'][1]['Targeting'] == '{"geo": "Boston"}'
+        assert data['metrics']['campaign'] == {'Clicks': {'mean': 1.5}}
+        assert data['metadata']['platform'] == 'dsp'
+    
+    def test_time_series_are_registered_as_tables(self, tmp_path):
+        """Test that columnar time series get time indexes and keep their key."""
+        import json
+        
+        path = tmp_path / "dump.json"
+        path.write_text(json.dumps({'time_series': {'campaign_Date': {
+            'dates': ['2025-07-07', '2025-07-08'],
+            'data': [{'Clicks': 1}, {'Clicks': 2}]
+        }}}))
+        
+        data = DataProcessor().process_sources([path])
+        
+        assert list(data.tables) == ['campaign_Date']
+        assert 'campaign_Date' in data.time_indexes
+        assert list(data['time_series']) == ['campaign_Date']
+        assert data['time_series']['campaign_Date']['data'] == [{'Clicks': 1}, {'Clicks': 2}]
+    
+    def test_nested_document_is_streamed(self, tmp_path, caplog):
+        """Test that ijson streams a nested document without a whole-document load."""
+        pytest.importorskip("ijson")
+        import json
+        
+        path = tmp_path / "dump.json"
+        path.write_text(json.dumps({
+            'metadata': {'platform': 'dsp', 'account': {'id': 7, 'labels': ['a', 'b']}},
+            'time_series': {
+                'campaign_Date': {
+                    'dates': ['2025-07-07', '2025-07-08'],
+                    'data': [
+                        {'Clicks': 1, 'Targeting': {'geo': {'city': 'Boston'}, 'ages': [18, 24]}},
+                        {'Clicks': 2, 'Targeting': None}
+                    ],
+                    'notes': {'source': 'api'}
+                },
+                'legacy': [1, 2]
+            }
+        }))
+        
+        data = DataProcessor(batch_size=1).process_sources([path])
+        
+        assert 'loading all of' not in caplog.text
+        assert data['metadata']['account'] == {'id': 7, 'labels': ['a', 'b']}
+        assert data['time_series']['legacy'] == [1, 2]
+        records = data['time_series']['campaign_Date']['data']
+        assert [record['Clicks'] for record in records] == [1, 2]
+        assert json.loads(records[0]['Targeting']) == {'geo': {'city': 'Boston'}, 'ages': [18, 24]}
+    
+    def test_unknown_sections_do_not_replace_internal_data(self, tmp_path):
+        """Test that top-level keys outside the known sections are ignored."""
+        import json
+        
+        path = tmp_path / "dump.json"
+        path.write_text(json.dumps({
+            'metrics': {'campaign': {'Clicks': {'mean': 1.5}}},
+            'tables': {'campaign': {'rows': 3}},
+            'compaction': {'campaign': 'none'}
+        }))
+        
+        data = DataProcessor().process_sources([path])
+        
+        assert data['metrics']['campaign'] == {'Clicks': {'mean': 1.5}}
+        assert data.tables == {}
+        assert data['metadata']['compaction'] == {}
+    
+    def test_ndjson_rows_and_fragments(self, tmp_path):
+        """Test that NDJSON row records and document fragments are both read."""
+        import json
+        
+        path = tmp_path / "events.ndjson"
+        lines = [{'Date': f'2025-07-0{day}', 'Clicks': day, 'Creative': 'A'} for day in range(1, 6)]
+        lines += [
+            {'time_series': {'spend_Date': {'dates': ['2025-07-01'], 'data': [{'Spend': 1.0}]}}},
+            {'time_series': {'spend_Date': {'dates': ['2025-07-02'], 'data': [{'Spend': 2.5}]}}}
+        ]
+        path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+        
+        data = DataProcessor(batch_size=2).process_sources([path], columns=["Date", "Clicks", "Spend"])
+        
+        assert data.table("events").num_rows == 5
+        assert "Creative" not in data.table("events")
+        assert data['metrics']['events']['Clicks']['max'] == 5
+        assert data['time_series']['spend_Date']['data'] == [{'Spend': 1.0}, {'Spend': 2.5}]
+
+
+class TestSqlSource:
+    """Test cases for SQL sources with aggregate pushdown."""
+    
+    @pytest.fixture
+    def stats_db(self, tmp_path):
+        """SQLite database with daily delivery rows for two campaigns."""
+        import sqlite3
+        
+        path = tmp_path / "stats.db"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            'CREATE TABLE campaign_stats (campaign_id TEXT, "Date" TEXT, "Creative" TEXT, '
+            '"Impressions" INTEGER, "Clicks" INTEGER, "Spend" REAL)'
+        )
+        rows = [
+            ("c1", "2025-07-07", "Banner A", 1000, 10, 5.0),
+            ("c1", "2025-07-07", "Banner B", 1500, 15, 7.5),
+            ("c1", "2025-07-08", "Banner A", 1200, 12, 6.0),
+            ("c1", "2025-07-09", "Banner B", 2500, 30, 12.5),
+            ("c2", "2025-07-07", "Other", 9999, 99, 99.0)
+        ]
+        conn.executemany("INSERT INTO campaign_stats VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+        conn.close()
+        return str(path)
+    
+    def teardown_method(self):
+        from arloai_reporting.data.sql import close_pools
+        close_pools()
+    
+    def test_aggregates_are_pushed_down(self, stats_db):
+        """Test that per-day and per-creative rollups come from SQL."""
+        from arloai_reporting.data import SqlSource
+        
+        source = SqlSource(stats_db, "c1", start_date="2025-07-07", end_date="2025-07-08")
+        data = DataProcessor().process_sources([source])
+        
+        daily = data.table("c1_sql_daily").to_frame()
+        assert list(daily["Impressions"]) == [2500, 1200]
+        assert list(daily["rows"]) == [2, 1]
+        assert daily["Date"].iloc[0] == pd.Timestamp("2025-07-07")
+        
+        by_creative = data.table("c1_sql_by_creative").to_frame()
+        assert dict(zip(by_creative["Creative"], by_creative["Clicks"])) == {"Banner A": 22, "Banner B": 15}
+        assert data['metadata']['source_type'] == 'sql'
+    
+    def test_schema_qualified_tables_are_quoted_per_part(self, stats_db):
+        """Test that a table name with a schema is read, and names can't inject SQL."""
+        from arloai_reporting.data import SqlSource
+        
+        source = SqlSource(stats_db, "c1", table="main.campaign_stats")
+        sql, _ = source.aggregate_query("Date", ["Clicks"])
+        data = DataProcessor().process_sources([source])
+        
+        assert 'FROM "main"."campaign_stats"' in sql
+        assert list(data.table("c1_sql_daily").column("Clicks")) == [25, 12, 30]
+        with pytest.raises(ValueError, match="Invalid SQL identifier"):
+            SqlSource(stats_db, "c1", table='main."x"; DROP TABLE campaign_stats').aggregate_query("Date", [])
+    
+    def test_projection_limits_measures(self, stats_db):
+        """Test that only projected measures are summed."""
+        from arloai_reporting.data import SqlSource
+        
+        data = DataProcessor().process_sources([SqlSource(stats_db, "c1")], columns=["Date", "Clicks"])
+        
+        assert "Impressions" not in data.table("c1_sql_daily")
+        assert list(data.table("c1_sql_daily").column("Clicks")) == [25, 12, 30]
+    
+    def test_connections_are_pooled(self, stats_db):
+        """Test that repeated reads reuse one pooled connection."""
+        from arloai_reporting.data import SqlSource
+        from arloai_reporting.data.sql import get_pool
+        
+        processor = DataProcessor()
+        for _ in range(5):
+            processor.process_sources([SqlSource(stats_db, "c1")])
+        
+        assert get_pool("sqlite", stats_db).connects == 1
+    
+    def test_released_connections_are_rolled_back(self, stats_db):
+        """Test that an uncommitted transaction doesn't leak to the next borrower."""
+        from arloai_reporting.data.sql import get_pool
+        
+        pool = get_pool("sqlite", stats_db)
+        with pool.connection() as conn:
+            conn.execute("DELETE FROM campaign_stats")
+            assert conn.in_transaction
+        with pool.connection() as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT COUNT(*) FROM campaign_stats").fetchone() == (5,)
+    
+    def test_drivers_quote_identifiers(self):
+        """Test that each driver registration quotes identifiers its own way."""
+        from arloai_reporting.data import SqlSource, register_driver
+        from arloai_reporting.data.sql import _drivers, backtick_quote
+        
+        register_driver("mysql-test", lambda dsn: None, paramstyle="format", quote=backtick_quote)
+        try:
+            sql, params = SqlSource("db", "c1", driver="mysql-test").aggregate_query("Date", ["Clicks"])
+        finally:
+            _drivers.pop("mysql-test")
+        
+        assert sql == (
+            "SELECT `Date` AS `Date`, SUM(`Clicks`) AS `Clicks`, COUNT(*) AS `rows` FROM `campaign_stats` "
+            "WHERE `campaign_id` = %s GROUP BY `Date` ORDER BY `Date`"
+        )
+        assert params == ["c1"]
+        sqlite_sql, _ = SqlSource("db", "c1").aggregate_query("Date", ["Clicks"])
+        assert 'FROM "campaign_stats"' in sqlite_sql
+
+
+class TestApiIngestion:
+    """Test cases for the async API connector, against a local mock API."""
+    
+    def test_pages_are_followed_into_one_table(self, mock_api):
+        """Test that every page's records end up in the source's table."""
+        from arloai_reporting.data import ApiSource
+        
+        base_url, state = mock_api
+        source = ApiSource(f"{base_url}/campaigns/c1/stats", "c1_stats")
+        
+        data = DataProcessor(batch_size=5).process_sources([source], columns=["Date", "Clicks"])
+        
+        table = data.table("c1_stats")
+        assert table.num_rows == 12
+        assert list(table.column("Clicks")) == list(range(12))
+        assert "Impressions" not in table
+        assert data['metadata']['pages'] == 3
+        assert len(state.requests) == 3
+    
+    def test_next_pages_on_another_host_are_followed(self, mock_api):
+        """Test that pagination links to a second host get their own concurrency limit."""
+        from arloai_reporting.data import ApiSource
+        
+        base_url, state = mock_api
+        state.next_base = base_url.replace('127.0.0.1', 'localhost')
+        source = ApiSource(f"{base_url}/campaigns/c1/stats", "c1_stats")
+        
+        data = DataProcessor().process_sources([source])
+        
+        assert data.table("c1_stats").num_rows == 12
+        assert len(state.requests) == 3
+    
+    def test_collects_inside_a_running_event_loop(self, mock_api):
+        """Test that sources are fetched from async code, once per distinct source."""
+        import asyncio
+        from arloai_reporting.data import ApiSource
+        
+        base_url, state = mock_api
+        source = ApiSource(f"{base_url}/campaigns/c1/stats", "c1_stats")
+        
+        async def handler():
+            return DataProcessor().process_sources([source, source])
+        
+        data = asyncio.run(handler())
+        
+        assert data.table("c1_stats").num_rows == 12
+        assert len(state.requests) == 3
+    
+    def test_concurrency_is_capped_per_host(self, mock_api):
+        """Test that no more than max_per_host requests are in flight."""
+        from arloai_reporting.data import ApiConnector, ApiSource
+        
+        base_url, state = mock_api
+        state.delay = 0.05
+        sources = [ApiSource(f"{base_url}/campaigns/c{index}/stats", f"c{index}") for index in range(8)]
+        
+        processor = DataProcessor(api_connector=ApiConnector(max_per_host=2))
+        data = processor.process_sources(sources)
+        
+        assert all(data.table(f"c{index}").num_rows == 12 for index in range(8))
+        assert state.max_in_flight == 2
+    
+    def test_transient_errors_are_retried(self, mock_api):
+        """Test that 503s are retried with backoff and permanent errors are not."""
+        from arloai_reporting.data import ApiConnector, ApiSource
+        
+        base_url, state = mock_api
+        state.fail("/campaigns/c1/stats", times=2)
+        connector = ApiConnector(retries=3, backoff=0.01)
+        sources = [
+            ApiSource(f"{base_url}/campaigns/c1/stats", "c1"),
+            ApiSource(f"{base_url}/missing", "missing")
+        ]
+        
+        data = DataProcessor(api_connector=connector).process_sources(sources)
+        
+        assert data.table("c1").num_rows == 12
+        assert data.table("missing") is None
+        assert connector.stats()['retried'] == 2
+    
+    def test_unchanged_pages_are_revalidated(self, mock_api):
+        """Test that ETags are replayed and 304 responses reuse cached bodies."""
+        from arloai_reporting.data import ApiConnector, ApiSource
+        
+        base_url, state = mock_api
+        processor = DataProcessor(api_connector=ApiConnector())
+        source = ApiSource(f"{base_url}/campaigns/c1/stats", "c1")
+        
+        processor.process_sources([source])
+        data = processor.process_sources([source])
+        
+        assert data.table("c1").num_rows == 12
+        assert processor.api_connector.stats()['not_modified'] == 3
+        assert [etag for _, etag in state.requests[3:]] == ['"c1-1"', '"c1-2"', '"c1-3"']
+
+
+class TestRollupCube:
+    """Test cases for the shared rollup cube."""
+    
+    def _table(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2025-07-07', '2025-07-07', '2025-07-08', '2025-07-08', '2025-07-08']),
+            'Creative': ['A', 'B', 'A', 'B', 'B'],
+            'Device': ['Mobile', 'Mobile', 'Desktop', 'Mobile', 'Desktop'],
+            'Impressions': [100, 200, 300, 400, 500],
+            'Clicks': [1, 2, 3, 4, 5],
+            'CTR': [1.0, 1.0, 1.0, 1.0, 1.0]
+        })
+        return FactTable.from_dataframe(df, "campaign")
+    
+    def test_rollups_match_groupby(self):
+        """Test that rollups equal direct groupbys over the raw rows."""
+        from arloai_reporting.data.cube import RollupCube
+        
+        cube = RollupCube(self._table())
+        
+        assert cube.dimensions == ['Date', 'Creative', 'Device']
+        assert cube.measures == ['Impressions', 'Clicks']
+        by_creative = cube.rollup(['creative'])
+        assert list(by_creative['Creative']) == ['A', 'B']
+        assert list(by_creative['Impressions']) == [400, 1100]
+        assert list(by_creative['rows']) == [2, 3]
+        assert cube.totals()['Clicks'] == 15
+    
+    def test_levels_are_memoized_and_rolled_up(self):
+        """Test that raw rows are scanned once and levels are reused."""
+        from arloai_reporting.data.cube import RollupCube
+        
+        cube = RollupCube(self._table())
+        daily_by_creative = cube.rollup(['Date', 'Creative'])
+        assert cube.rollup(['Creative', 'Date']) is daily_by_creative
+        
+        daily = cube.rollup(['Date'])
+        
+        assert list(daily['Impressions']) == [300, 1200]
+        assert cube.scans == 1
+        assert cube.rollups == 2
+        with pytest.raises(ValueError):
+            cube.rollup(['Placement'])
+    
+    def test_concurrent_rollups_compute_each_level_once(self):
+        """Test that rollups requested from many threads share one computed level each."""
+        from concurrent.futures import ThreadPoolExecutor
+        from arloai_reporting.data.cube import RollupCube
+        
+        cube = RollupCube(self._table())
+        requests = [['Date'], ['Creative'], ['Device'], ['Date', 'Device'], []] * 20
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            levels = list(executor.map(cube.rollup, requests))
+        
+        assert cube.rollups == 5
+        assert all(level is cube.rollup(by) for level, by in zip(levels, requests))
+
+
+class TestTimeIndex:
+    """Test cases for the multi-grain time index."""
+    
+    def _table(self):
+        df = pd.DataFrame({
+            'Date': pd.to_datetime([
+                '2025-07-08 09:30', '2025-07-06 23:10', '2025-07-07 09:05', '2025-08-01 12:00', None
+            ]),
+            'Impressions': [300, 100, 200, 400, 999],
+            'Clicks': [3, 1, 2, 4, 9]
+        })
+        return FactTable.from_dataframe(df, "campaign")
+    
+    def test_grains_match_resampling(self):
+        """Test that every grain equals bucketing the raw rows directly."""
+        from arloai_reporting.data.timeindex import TimeIndex
+        
+        index = TimeIndex(self._table())
+        
+        assert index.dropped == 1
+        daily = index.grain('day')
+        assert list(daily['bucket'].dt.strftime('%Y-%m-%d')) == ['2025-07-06', '2025-07-07', '2025-07-08', '2025-08-01']
+        assert list(daily['Impressions']) == [100, 200, 300, 400]
+        weekly = index.grain('week')
+        assert list(weekly['bucket'].dt.strftime('%Y-%m-%d')) == ['2025-06-30', '2025-07-07', '2025-07-28']
+        assert list(weekly['Clicks']) == [1, 5, 4]
+        assert list(index.grain('month')['rows']) == [3, 1]
+        assert list(index.grain('day_of_week')['Clicks']) == [2, 3, 0, 0, 4, 0, 1]
+        assert index.grain('hour_of_day')['Impressions'][9] == 500
+        assert list(index.grain('day', '2025-07-07', '2025-07-08')['Clicks']) == [2, 3]
+        assert list(index.rows_between('2025-07-07', '2025-07-31')) == [2, 0]
+    
+    def test_timezone_conversion(self):
+        """Test that naive UTC timestamps are bucketed in the report timezone."""
+        from arloai_reporting.data.timeindex import TimeIndex
+        
+        index = TimeIndex(self._table(), timezone='America/New_York', source_timezone='UTC')
+        
+        # 2025-07-06 23:10 UTC is 19:10 in New York, 09:05 UTC is 05:05
+        assert list(index.grain('day')['Clicks']) == [1, 2, 3, 4]
+        assert index.grain('hour_of_day')['Clicks'][5] == 5
+    
+    def test_dst_fall_back_hour_is_kept(self):
+        """Test that naive local times in the repeated DST hour aren't dropped."""
+        from arloai_reporting.data.timeindex import TimeIndex
+        
+        for times in [
+            ['2025-11-02 00:30', '2025-11-02 01:15', '2025-11-02 01:45', '2025-11-02 01:15', '2025-11-02 02:15'],
+            ['2025-11-02 00:30', '2025-11-02 01:15', '2025-11-02 01:45', '2025-11-02 01:50', '2025-11-02 02:15']
+        ]:
+            table = FactTable.from_dataframe(pd.DataFrame({
+                'Date': pd.to_datetime(times),
+                'Clicks': [1, 2, 3, 4, 5]
+            }), "campaign")
+            
+            index = TimeIndex(table, timezone='America/New_York', source_timezone='America/New_York')
+            
+            assert index.dropped == 0
+            assert list(index.grain('hour')['Clicks']) == [1, 9, 5]
+    
+    def test_built_at_ingestion(self, tmp_path):
+        """Test that processed sources expose a time index per dated table."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-14,50,2\n2025-07-08,10,1\n")
+        
+        result = DataProcessor().process_sources([source])
+        
+        index = result.time_index()
+        assert index is result.time_index("campaign")
+        assert list(index.grain('week')['Clicks']) == [4, 2]
+
+
+class TestMemoryBudget:
+    """Test cases for memory-budgeted ingestion."""
+    
+    def _sources(self, tmp_path):
+        paths = []
+        for index in range(2):
+            path = tmp_path / f"part{index}.csv"
+            pd.DataFrame({
+                'Date': pd.date_range('2025-07-01', periods=500, freq='h').strftime('%Y-%m-%d'),
+                'Impressions': np.arange(500) + index,
+                'Spend': np.linspace(0, 1, 500)
+            }).to_csv(path, index=False)
+            paths.append(path)
+        return paths
+    
+    def test_columns_spill_over_budget(self, tmp_path):
+        """Test that columns beyond the budget are memory-mapped with the same values."""
+        from arloai_reporting.data.spill import is_spilled
+        
+        sources = self._sources(tmp_path)
+        expected = DataProcessor().process_sources(sources)
+        result = DataProcessor(memory_budget=8192, spill_dir=tmp_path / "spill").process_sources(sources)
+        
+        memory = result['metadata']['memory']
+        assert memory['resident_bytes'] <= 8192
+        assert memory['spilled_columns'] > 0
+        assert any(is_spilled(values) for values in result.tables['part0'].columns.values())
+        for name, table in expected.tables.items():
+            for col in table.column_names:
+                assert list(result.column(name, col)) == list(table.column(col))
+    
+    def test_rollups_spill_and_files_are_cleaned_up(self, tmp_path):
+        """Test that cube levels are admitted to the spill area, which is removed on cleanup."""
+        from arloai_reporting.data.cube import build_report_cube
+        
+        result = DataProcessor(memory_budget=1024, spill_dir=tmp_path / "spill").process_sources(
+            self._sources(tmp_path)
+        )
+        cube = build_report_cube(result.tables, spill=result.spill)
+        
+        assert cube.totals()['Impressions'] == sum(range(500))
+        directory = result.spill.directory
+        assert any(directory.iterdir())
+        result.spill.cleanup()
+        assert not directory.exists()
+    
+    def test_time_index_rows_spill_over_budget(self, tmp_path):
+        """Test that a time index's row order and times are admitted to the spill area."""
+        from arloai_reporting.data.spill import is_spilled
+        
+        result = DataProcessor(memory_budget=1024, spill_dir=tmp_path / "spill").process_sources(
+            self._sources(tmp_path)
+        )
+        
+        index = result.time_index("part0")
+        assert is_spilled(index.order) and is_spilled(index.times)
+        assert index.grain('day')['Impressions'].sum() == sum(range(500))
+    
+    def test_shared_categorical_is_counted_once(self, tmp_path):
+        """Test that a Categorical held by two tables counts towards the budget once."""
+        from arloai_reporting.data.spill import SpillArea, resident_nbytes
+        from arloai_reporting.data.store import FactTable
+        
+        creative = pd.Categorical(['Banner A', 'Banner B'] * 50)
+        tables = [FactTable(name, {'Creative': creative}) for name in ('source', 'merged')]
+        spill = SpillArea(10**6, tmp_path)
+        for table in tables:
+            spill.track(table)
+        
+        assert spill.resident_bytes() == resident_nbytes(creative)
+
+
+class TestValidation:
+    """Test cases for the data-quality validation pass."""
+    
+    def _source(self, tmp_path):
+        path = tmp_path / "delivery.csv"
+        path.write_text(
+            "Date,Creative,Impressions,Clicks,Spend,CTR\n"
+            "2025-07-07,A,100,5,10.0,5.0\n"
+            "2025-07-07,B,100,150,10.0,150.0\n"
+            "2025-07-08,A,200,4,-3.0,2.0\n"
+            "2025-07-08,B,400,4,8.0,9.0\n"
+            "2025-07-08,A,200,4,3.0,2.0\n"
+            "not a date,A,50,1,1.0,2.0\n"
+        )
+        return path
+    
+    def test_issues_are_summarized(self, tmp_path):
+        """Test that every failing check is counted with sample rows."""
+        result = DataProcessor().process_sources([self._source(tmp_path), tmp_path / "missing.csv"])
+        
+        validation = result['metadata']['validation']
+        issues = validation['tables']['delivery']['issues']
+        assert issues['negative_values']['count'] == 1
+        assert issues['negative_values']['columns'] == ['Spend']
+        assert issues['clicks_exceed_impressions']['sample_rows'] == [1]
+        assert issues['ctr_mismatch']['sample_rows'] == [3]
+        assert issues['duplicate_dates']['sample_rows'] == [4]
+        assert issues['invalid_dates']['sample_rows'] == [5]
+        assert validation['rows_flagged'] == 5
+        assert validation['missing_sources'] == [str(tmp_path / "missing.csv")]
+        assert result.table('delivery').num_rows == 6
+        assert result.quarantine == {}
+    
+    def test_quarantine_removes_rows(self, tmp_path):
+        """Test that offending rows move to the quarantine and summaries are recomputed."""
+        result = DataProcessor(quarantine=True).process_sources([self._source(tmp_path)])
+        
+        assert list(result.column('delivery', 'Clicks')) == [5]
+        assert result['metrics']['delivery']['Clicks']['count'] == 1
+        quarantined = result.quarantine['delivery']
+        assert list(quarantined.column('_issues')) == [
+            'clicks_exceed_impressions',
+            'negative_values',
+            'ctr_mismatch',
+            'duplicate_dates',
+            'invalid_dates'
+        ]
+        assert result['metadata']['validation']['rows_quarantined'] == 5
+    
+    def test_projected_dimensions_are_not_duplicates(self, campaign_csv):
+        """Test that rows differing only in unread columns are kept when quarantining."""
+        result = DataProcessor(quarantine=True).process_sources(
+            [campaign_csv], columns=['Date', 'Clicks', 'Impressions']
+        )
+        
+        validation = result['metadata']['validation']
+        assert validation['rows_flagged'] == 0
+        assert validation['skipped_checks'] == ['duplicate_dates']
+        assert list(result.column('campaign', 'Clicks')) == [10, 15, 12, 30]
+        assert result.quarantine == {}
+
+
+class TestDerivedMetrics:
+    """Test cases for compiled derived metrics."""
+    
+    def _metrics(self, **definitions):
+        from arloai_reporting.data.cube import RollupCube
+        from arloai_reporting.data.derived import DerivedMetrics
+        from arloai_reporting.data.timeindex import TimeIndex
+        
+        table = FactTable.from_dataframe(pd.DataFrame({
+            'Date': pd.to_datetime(['2025-07-07', '2025-07-07', '2025-07-14']),
+            'Creative': ['A', 'B', 'A'],
+            'Impressions': [1000, 10, 0],
+            'Clicks': [10, 5, 0],
+            'Media Spend': [5.0, 1.0, 2.0],
+            'CTR': [1.0, 50.0, 0.0]
+        }), "campaign")
+        return DerivedMetrics(RollupCube(table), TimeIndex(table), definitions)
+    
+    def test_ratios_are_weighted(self):
+        """Test that ratio metrics are computed from summed measures."""
+        metrics = self._metrics(cpm='sum(media_spend) / sum(impressions) * 1000')
+        
+        assert metrics.total('ctr') == pytest.approx(15 / 1010)
+        assert metrics.total('cpm') == pytest.approx(8 / 1010 * 1000)
+        by_creative = metrics.frame(['ctr', 'cpm'], by=['Creative'])
+        assert list(by_creative['ctr']) == pytest.approx([10 / 1000, 5 / 10])
+        weekly = metrics.compute('ctr', grain='week')
+        assert weekly.iloc[0] == pytest.approx(15 / 1010)
+        assert np.isnan(weekly.iloc[1])
+    
+    def test_results_are_cached_per_grain(self):
+        """Test that metrics compose and each (metric, grain) is evaluated once."""
+        metrics = self._metrics(ctr_percent='ctr * 100')
+        
+        first = metrics.compute('ctr_percent', by=['Date'])
+        assert metrics.compute('CTR_percent', by=['date']) is first
+        assert list(first) == pytest.approx([15 / 1010 * 100, np.nan], nan_ok=True)
+        assert metrics.misses == 2
+        assert metrics.hits == 1
+    
+    def test_redefinition_invalidates_dependents(self):
+        """Test that redefining a metric refreshes the metrics built on it."""
+        metrics = self._metrics(double_ctr='ctr * 2')
+        assert metrics.total('double_ctr') == pytest.approx(2 * 15 / 1010)
+        
+        metrics.define('ctr', 'sum(clicks) / rows()')
+        
+        assert metrics.total('double_ctr') == pytest.approx(2 * 15 / 3)
+    
+    def test_invalid_definitions(self):
+        """Test that unsupported syntax and missing measures are rejected."""
+        with pytest.raises(ValueError, match=r'Unsupported syntax in metric bad: __import__\("os"\)'):
+            self._metrics(bad='__import__("os")')
+        metrics = self._metrics()
+        
+        assert not metrics.available('engagement_rate')
+        with pytest.raises(ValueError, match="engagements"):
+            metrics.compute('engagement_rate')
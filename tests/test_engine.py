@@ -4,6 +4,7 @@ Tests for the ReportEngine class.
 
 import pytest
 import tempfile
+import time
 from pathlib import Path
 import sys
 
@@ -12,6 +13,104 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from arloai_reporting import ReportEngine
 from arloai_reporting.engine import Report
+from arloai_reporting.widgets.base import BaseWidget
+from arloai_reporting.widgets.datasets import Dataset
+
+
+class ClicksProbeWidget(BaseWidget):
+    """Widget that records the tables it was rendered with."""
+    
+    def __init__(self):
+        super().__init__("clicks_probe", "Records rendered columns")
+        self.seen_columns = None
+        self.daily_clicks = None
+    
+    def get_required_columns(self):
+        return ["Date", "Clicks"]
+    
+    def render(self, data):
+        self.seen_columns = {name: table.column_names for name, table in data.tables.items()}
+        if data.cube is not None:
+            self.daily_clicks = list(data.cube.rollup(["Date"])["Clicks"])
+        return "<div>clicks</div>"
+    
+    def can_render(self, data):
+        return True
+
+
+class DatasetProbeWidget(BaseWidget):
+    """Widget that reads declared datasets and records what was loaded."""
+    
+    def __init__(self, name, datasets, log):
+        super().__init__(name, "Reads shared datasets")
+        self.datasets = datasets
+        self.log = log
+    
+    def get_required_columns(self):
+        return ["Date", "Clicks"]
+    
+    def get_required_datasets(self):
+        return self.datasets
+    
+    def get_config(self):
+        return {"datasets": self.datasets}
+    
+    def render(self, data):
+        values = [data.datasets[name] for name in self.datasets]
+        self.log.append((self.name, data.datasets.is_loaded("counted_clicks")))
+        return f"<div>{values}</div>"
+    
+    def can_render(self, data):
+        return True
+
+
+class SlowWidget(BaseWidget):
+    """Widget that sleeps, fails or renders its daily clicks."""
+    
+    def __init__(self, name, delay=0.0, fail=False):
+        super().__init__(name, "Renders after a delay")
+        self.delay = delay
+        self.fail = fail
+    
+    def get_required_columns(self):
+        return ["Date", "Clicks"]
+    
+    def get_required_datasets(self):
+        return ["daily_totals"]
+    
+    def render(self, data):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("chart backend crashed")
+        return f"<div class='{self.name}'>{list(data.datasets['daily_totals']['Clicks'])}</div>"
+    
+    def can_render(self, data):
+        return True
+
+
+class RequirementsWidget(BaseWidget):
+    """Widget selected by its declared measures, dimensions and grains."""
+    
+    def __init__(self, name, measures=(), dimensions=(), grains=()):
+        super().__init__(name, "Declares its data requirements")
+        self.measures = list(measures)
+        self.dimensions = list(dimensions)
+        self.grains = list(grains)
+    
+    def get_required_measures(self):
+        return self.measures
+    
+    def get_required_dimensions(self):
+        return self.dimensions
+    
+    def get_required_grains(self):
+        return self.grains
+    
+    def render(self, data):
+        return f"<div>{self.name}</div>"
+    
+    def can_render(self, data):
+        raise AssertionError("selected by the capability index")
 
 
 class TestReportEngine:
@@ -29,6 +128,18 @@ class TestReportEngine:
         assert self.engine.html_exporter is not None
         assert self.engine.pdf_exporter is not None
     
+    def test_streaming_options_reach_the_processor(self, tmp_path):
+        """Test that streaming ingestion can be configured on the engine."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        engine = ReportEngine(streaming=True, batch_size=1, retain_rows=False)
+        
+        data = engine.data_processor.process_sources([source])
+        
+        assert data.tables == {}
+        assert data['metadata']['streamed']
+        assert data['metrics']['campaign']['Clicks']['50%'] == 2.5
+    
     def test_generate_report_with_empty_sources(self):
         """Test generating a report with no data sources."""
         report = self.engine.generate_report(
@@ -95,6 +206,243 @@ class TestReportEngine:
         
         for widget_name in expected_widgets:
             assert widget_name in widgets
+    
+    def test_widget_columns_are_pushed_down(self, tmp_path):
+        """Test that only the columns declared by widgets are ingested."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Creative,Impressions,Clicks\n2025-07-07,A,100,3\n")
+        probe = ClicksProbeWidget()
+        self.engine.widget_registry.register_widget(probe)
+        
+        self.engine.generate_report("mid_campaign", [source], widgets=["clicks_probe"])
+        
+        assert probe.seen_columns == {"campaign": ["Date", "Clicks", "_source"]}
+    
+    def test_widgets_share_the_report_cube(self, tmp_path):
+        """Test that the engine builds a rollup cube widgets can query."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Creative,Impressions,Clicks\n2025-07-07,A,100,3\n2025-07-07,B,50,2\n")
+        probe = ClicksProbeWidget()
+        self.engine.widget_registry.register_widget(probe)
+        
+        self.engine.generate_report("mid_campaign", [source], widgets=["clicks_probe"])
+        
+        assert probe.daily_clicks == [5]
+    
+    def test_shared_datasets_are_computed_once_and_released(self, tmp_path):
+        """Test that a dataset declared by several widgets is built once and dropped after its last consumer."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        calls = []
+        self.engine.dataset_registry.register_dataset(Dataset(
+            "counted_clicks",
+            lambda data, inputs: calls.append(1) or int(inputs["daily_totals"]["Clicks"].sum()),
+            depends=["daily_totals"]
+        ))
+        log = []
+        consumers = [("first", ["counted_clicks"]), ("second", ["counted_clicks", "daily_totals"]), ("third", [])]
+        for name, datasets in consumers:
+            self.engine.widget_registry.register_widget(DatasetProbeWidget(name, datasets, log))
+        
+        report = self.engine.generate_report("final", [source], widgets=["first", "second", "third"])
+        
+        assert "<div>[5, " in report.content
+        assert len(calls) == 1
+        assert log == [("first", True), ("second", True), ("third", False)]
+    
+    def test_daily_ratios_extend_daily_totals(self, tmp_path):
+        """Test that daily ratios are built on the daily_totals dataset."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        captured = {}
+        
+        class RatiosWidget(DatasetProbeWidget):
+            def get_required_columns(self):
+                return ["Date", "Impressions", "Clicks"]
+        
+            def render(self, data):
+                captured.update({name: data.datasets[name] for name in self.datasets})
+                return "<div>ratios</div>"
+        
+        self.engine.widget_registry.register_widget(RatiosWidget("ratios", ["daily_ratios", "daily_totals"], []))
+        self.engine.generate_report("final", [source], widgets=["ratios"])
+        
+        ratios, daily = captured["daily_ratios"], captured["daily_totals"]
+        assert list(ratios["Clicks"]) == list(daily["Clicks"])
+        assert list(ratios["ctr"]) == pytest.approx([0.03, 0.04])
+        assert "ctr" not in daily
+    
+    def test_widget_listed_twice_releases_its_datasets(self):
+        """Test that every occurrence of a widget releases its datasets."""
+        from arloai_reporting.widgets.datasets import RenderGraph
+        
+        self.engine.dataset_registry.register_dataset(Dataset("constant", lambda data, inputs: 1))
+        widget = DatasetProbeWidget("twice", ["constant"], [])
+        graph = RenderGraph(self.engine.dataset_registry, [widget, widget]).bind(None)
+        
+        assert graph["constant"] == 1
+        graph.finish("twice")
+        assert graph.is_loaded("constant")
+        graph.finish("twice")
+        assert not graph.is_loaded("constant")
+    
+    @pytest.mark.parametrize("executor", ["thread", "process"])
+    def test_parallel_rendering_keeps_order_and_falls_back(self, tmp_path, executor):
+        """Test that pooled rendering keeps widget order and replaces failed or slow widgets."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        engine = ReportEngine(render_executor=executor, render_workers=4, widget_timeout=3.0)
+        names = ["slow_ok", "fast_ok", "broken", "stuck"]
+        widgets = [
+            SlowWidget("slow_ok", 0.2),
+            SlowWidget("fast_ok"),
+            SlowWidget("broken", fail=True),
+            SlowWidget("stuck", 10.0)
+        ]
+        for widget in widgets:
+            engine.widget_registry.register_widget(widget)
+        
+        start = time.perf_counter()
+        report = engine.generate_report("final", [source], widgets=names)
+        
+        assert time.perf_counter() - start < 8.0
+        assert report.widgets == names
+        content = report.content
+        assert content.index("slow_ok'>[3, 2]") < content.index("fast_ok'>[3, 2]")
+        assert "could not be rendered: rendering failed" in content
+        assert "could not be rendered: rendering timed out" in content
+    
+    def test_render_cache_serves_unchanged_widgets(self, tmp_path):
+        """Test that unchanged widgets are served from memory, then disk, and re-rendered on change."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        cache_dir = tmp_path / "render-cache"
+        
+        def build_engine():
+            engine = ReportEngine(render_cache_dir=cache_dir)
+            log = []
+            engine.widget_registry.register_widget(DatasetProbeWidget("daily", ["daily_totals"], log))
+            return engine, log
+        
+        engine, log = build_engine()
+        first = engine.generate_report("final", [source], widgets=["daily"])
+        second = engine.generate_report("final", [source], widgets=["daily"])
+        assert len(log) == 1
+        assert first.render_cache_stats["misses"] == 1
+        assert second.render_cache_stats["memory_hits"] == 1
+        assert second.content == first.content
+        
+        restarted, restarted_log = build_engine()
+        assert restarted.generate_report("final", [source], widgets=["daily"]).render_cache_stats["disk_hits"] == 1
+        assert restarted_log == []
+        
+        # A new widget version or changed data renders again
+        restarted.widget_registry.get_widget("daily").version = "2"
+        restarted.generate_report("final", [source], widgets=["daily"])
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,4\n2025-07-08,50,2\n")
+        changed = restarted.generate_report("final", [source], widgets=["daily"])
+        assert len(restarted_log) == 2
+        assert changed.render_cache_stats["misses"] == 1
+        assert restarted.render_cache_stats["disk_hits"] == 1
+    
+    def test_render_cache_covers_summary_metrics(self, tmp_path):
+        """Test that a changed summary metric re-renders widgets that declare columns."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        summary = tmp_path / "summary.json"
+        summary.write_text('{"metrics": {"budget": {"Spend": {"value": 100}}}}')
+        engine = ReportEngine(render_cache=True)
+        engine.widget_registry.register_widget(DatasetProbeWidget("daily", ["daily_totals"], []))
+        
+        engine.generate_report("final", [source, summary], widgets=["daily"])
+        unchanged = engine.generate_report("final", [source, summary], widgets=["daily"])
+        assert unchanged.render_cache_stats["memory_hits"] == 1
+        summary.write_text('{"metrics": {"budget": {"Spend": {"value": 200}}}}')
+        changed = engine.generate_report("final", [source, summary], widgets=["daily"])
+        
+        assert changed.render_cache_stats["misses"] == 1
+    
+    def test_widgets_are_selected_by_declared_requirements(self, tmp_path):
+        """Test that widgets declaring requirements are matched against the report schema."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Creative,Impressions,Clicks\n2025-07-07,A,100,3\n2025-07-08,B,50,2\n")
+        engine = ReportEngine()
+        registry = engine.widget_registry
+        for widget in [
+            RequirementsWidget("daily_clicks", measures=["Clicks"], grains=["day"]),
+            RequirementsWidget("by_creative", measures=["impressions"], dimensions=["Creative"]),
+            RequirementsWidget("by_placement", dimensions=["Placement"]),
+            RequirementsWidget("hourly", measures=["Clicks"], grains=["hour_of_day"]),
+            ClicksProbeWidget()
+        ]:
+            registry.register_widget(widget)
+        names = ["daily_clicks", "by_creative", "by_placement", "hourly", "clicks_probe"]
+        
+        report = engine.generate_report("final", [source], widgets=names)
+        
+        assert report.widgets == ["daily_clicks", "by_creative", "clicks_probe"]
+        schema = frozenset({("measure", "clicks"), ("grain", "day")})
+        assert registry.get_widgets_for_schema(schema) is registry.get_widgets_for_schema(schema)
+        assert registry.get_widgets_for_schema(schema) == {"daily_clicks"}
+        registry.register_widget(RequirementsWidget("daily_clicks", measures=["Spend"]))
+        assert registry.get_widgets_for_schema(schema) == set()
+    
+    def test_default_widgets_are_selected_without_import(self, tmp_path):
+        """Test that the built-in widgets are matched by their declared requirements."""
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Creative,Impressions,Clicks\n2025-07-07,A,100,3\n2025-07-08,B,50,2\n")
+        engine = ReportEngine()
+        data = engine.data_processor.process_sources([source])
+        
+        selected = engine.widget_registry.get_widgets_for_data(data, names=[
+            "ctr_over_time", "creative_comparison", "placement_performance_table", "daily_spend_chart"
+        ])
+        
+        assert selected == ["ctr_over_time", "creative_comparison"]
+        assert not any(engine.widget_registry.is_loaded(name) for name in selected)
+        assert data.time_index().intraday is False
+    
+    def test_widgets_are_imported_on_first_use(self, tmp_path, monkeypatch):
+        """Test that manifest and entry point widgets are only imported when a report uses them."""
+        (tmp_path / "acme_widgets.py").write_text(
+            "from arloai_reporting.widgets.base import BaseWidget\n"
+            "class Chart(BaseWidget):\n"
+            "    def __init__(self, name='plugin_chart', color='red'):\n"
+            "        super().__init__(name)\n"
+            "        self.color = color\n"
+            "    def render(self, data):\n"
+            "        return f'<div>{self.name} {self.color}</div>'\n"
+            "    def can_render(self, data):\n"
+            "        return True\n"
+        )
+        dist_info = tmp_path / "acme_widgets-0.1.dist-info"
+        dist_info.mkdir()
+        (dist_info / "METADATA").write_text("Metadata-Version: 2.1\nName: acme-widgets\nVersion: 0.1\n")
+        (dist_info / "entry_points.txt").write_text("[arloai_reporting.widgets]\nplugin_chart = acme_widgets:Chart\n")
+        manifest = tmp_path / "widgets.json"
+        manifest.write_text(
+            '[{"name": "weekly_chart", "target": "acme_widgets:Chart", '
+            '"options": {"name": "weekly_chart", "color": "blue"}, "measures": ["Clicks"], "grains": ["week"]}]'
+        )
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.delitem(sys.modules, "acme_widgets", raising=False)
+        source = tmp_path / "campaign.csv"
+        source.write_text("Date,Impressions,Clicks\n2025-07-07,100,3\n2025-07-08,50,2\n")
+        
+        engine = ReportEngine(widget_manifest=manifest)
+        registry = engine.widget_registry
+        assert "weekly_chart" in registry.list_widgets()
+        assert "plugin_chart" in registry.list_widgets()
+        assert "acme_widgets" not in sys.modules
+        assert not registry.is_loaded("topline_kpi_grid")
+        
+        report = engine.generate_report("final", [source], widgets=["weekly_chart", "ctr_over_time"])
+        
+        assert report.widgets == ["weekly_chart", "ctr_over_time"]
+        assert "weekly_chart blue" in report.content
+        assert registry.is_loaded("weekly_chart") and not registry.is_loaded("plugin_chart")
+        assert not registry.is_loaded("topline_kpi_grid")
+        assert registry.get_widget("plugin_chart").render({}) == "<div>plugin_chart red</div>"
 
 
 class TestReport: